@@ -0,0 +1,31 @@
+"""
+Content hashing of arrays and frames, shared by the Chain cache and the model_building caches.
+
+This module imports nothing from the package, so any module can use it without import cycles.
+"""
+
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+
+def _update_with_data(digest, data):
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(type(data).__name__.encode())
+        digest.update(repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        return
+    array = np.asarray(data)
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    if array.dtype.hasobject:
+        digest.update(pickle.dumps(array.tolist(), protocol=pickle.HIGHEST_PROTOCOL))
+    else:
+        digest.update(memoryview(np.ascontiguousarray(array)).cast('B'))
+
+def hash_data(data):
+    """
+    Returns a hex digest of the contents of an array, DataFrame or Series.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update_with_data(digest, data)
+    return digest.hexdigest()
@@ -0,0 +1,51 @@
+"""
+Lazy re-exports for package __init__ files.
+
+A package that re-exports names from submodules with heavy dependencies (TensorFlow,
+matplotlib, aif360, qiskit) declares them with attach instead of importing them eagerly.
+The submodule is imported on first attribute access through the module-level __getattr__
+(PEP 562), and the resolved value is stored on the package so later lookups are plain
+attribute reads. Plotting functions load matplotlib and seaborn with plotting when they
+draw their first figure.
+"""
+
+import importlib
+import sys
+
+def attach(package_name, submodules):
+    """
+    Builds the module-level __getattr__, __dir__ and __all__ of a lazy package.
+
+    Parameters:
+    - package_name (str): The __name__ of the package.
+    - submodules (dict): Maps each submodule name (relative to the package) to the list of names it exports.
+
+    Returns:
+    - tuple: (__getattr__, __dir__, __all__) to assign in the package namespace.
+    """
+    owners = {name: submodule for submodule, names in submodules.items() for name in names}
+    exported = sorted(owners)
+
+    def __getattr__(name):
+        if name not in owners:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+        module = importlib.import_module(f".{owners[name]}", package_name)
+        value = getattr(module, name)
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(exported) | set(vars(sys.modules[package_name])))
+
+    return __getattr__, __dir__, exported
+
+def plotting():
+    """
+    Imports matplotlib and seaborn on first use.
+
+    Returns:
+    - tuple: (matplotlib.pyplot, seaborn).
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
@@ -1 +1,4 @@
-from .array_manipulation import filter, aggregate, summary
\ No newline at end of file
+from .array_manipulation import filter, aggregate, summary
+from .sketches import MomentSketch, QuantileSketch, DistinctSketch, SummarySketch
+from .expressions import compile_predicate
+from .windows import rolling, expanding, ewm, RollingWindow, ExpandingWindow, EWMWindow
\ No newline at end of file
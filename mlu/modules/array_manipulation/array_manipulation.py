@@ -1,79 +1,346 @@
 import numpy as np
 import logging
+from .expressions import compile_predicate
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def filter(array, condition):
+FILTER_BLOCK_BYTES = 1 << 18
+
+def _filter_blocks(array, condition, block_size):
+    if block_size is None:
+        # Rows per block so that a block of input stays around FILTER_BLOCK_BYTES (cache sized);
+        # a multiple of 8 so that packed masks of consecutive blocks concatenate cleanly.
+        row_bytes = max(array[:1].nbytes, 1)
+        block_size = max(FILTER_BLOCK_BYTES // row_bytes, 1)
+    block_size = max(-(-block_size // 8) * 8, 8)
+    for start in range(0, len(array), block_size):
+        block = array[start:start + block_size]
+        yield start, block, np.asarray(condition(block), dtype=bool)
+
+def filter(array, condition, output='values', block_size=None):
     """
     Filters elements in an array based on a condition function.
-    
+
+    A condition given as an expression string (see expressions.compile_predicate), or any
+    condition when block_size is given, is evaluated in cache-sized blocks along the first axis,
+    so intermediate masks are the size of a block rather than the size of the array.
+
     Parameters:
     - array (numpy.ndarray): The input array.
-    - condition (callable): A function that returns a boolean value.
-    
+    - condition (callable or str): A function that returns a boolean value, or an element-wise
+      predicate expression over x such as "(x > 0) & (x < 10) & ~isnan(x)".
+    - output (str): 'values' for the selected elements, 'indices' for their flat indices (row
+      indices when the condition returns one value per row), or 'mask' for the boolean mask
+      packed with np.packbits (one bit per element, row-major).
+    - block_size (int, optional): Rows per block. Callable conditions are only blocked when it is
+      given, since they may not be element-wise.
+
     Returns:
-    - numpy.ndarray: Filtered array.
+    - numpy.ndarray: Filtered array, flat indices or packed mask depending on output.
     """
     try:
-        result = array[condition(array)]
+        if output not in ('values', 'indices', 'mask'):
+            raise ValueError("Unsupported output. Choose from 'values', 'indices', 'mask'.")
+        if isinstance(condition, str):
+            condition = compile_predicate(condition)
+        elif block_size is None and output == 'values':
+            result = array[condition(array)]
+            logging.info("Array filtered successfully.")
+            return result
+        array = np.asarray(array)
+        if array.ndim == 0 or len(array) == 0:
+            mask = np.asarray(condition(array), dtype=bool)
+            parts = [(0, array, mask)]
+        else:
+            parts = _filter_blocks(array, condition, block_size)
+        pieces = []
+        row_size = int(np.prod(array.shape[1:]))
+        for start, block, mask in parts:
+            if output == 'values':
+                pieces.append(block[mask])
+            elif output == 'indices':
+                # A mask with one entry per row gives row indices; an element-wise mask gives flat ones.
+                row_mask = mask.ndim == 1 and block.ndim > 1
+                pieces.append(np.flatnonzero(mask) + (start if row_mask else start * row_size))
+            else:
+                pieces.append(np.packbits(mask.ravel()))
+        if output == 'values':
+            result = np.concatenate(pieces) if pieces else array[:0].ravel()
+        else:
+            result = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64 if output == 'indices' else np.uint8)
         logging.info("Array filtered successfully.")
         return result
     except Exception as e:
         logging.error(f"An error occurred in filter function: {str(e)}", exc_info=True)
         raise
 
-def aggregate(array, operation):
+AGGREGATE_OPERATIONS = ('sum', 'mean', 'max', 'min', 'count', 'std', 'var')
+
+def _check_operations(ops):
+    unsupported = [op for op in ops if op not in AGGREGATE_OPERATIONS]
+    if unsupported:
+        raise ValueError(f"Unsupported operation(s) {unsupported}. Choose from {', '.join(AGGREGATE_OPERATIONS)}.")
+
+def _reduce(array, ops):
+    # Shared intermediates (sum, count, mean) are computed once for all operations.
+    results = {}
+    count = len(array)
+    total = np.sum(array, axis=0) if {'sum', 'mean', 'std', 'var'} & set(ops) else None
+    for op in ops:
+        if op == 'sum':
+            results[op] = total
+        elif op == 'count':
+            results[op] = count
+        elif op == 'mean':
+            results[op] = total / count
+        elif op in ('std', 'var'):
+            if 'var' not in results:
+                results['var'] = np.mean((array - total / count) ** 2, axis=0)
+            results[op] = np.sqrt(results['var']) if op == 'std' else results['var']
+        elif op == 'max':
+            results[op] = np.max(array, axis=0)
+        elif op == 'min':
+            results[op] = np.min(array, axis=0)
+    return {op: results[op] for op in ops}
+
+def _segments(keys):
+    """
+    Sorts the keys once (unless they already are) and returns the sort order, the start of each
+    run of equal keys and the distinct keys.
+    """
+    if len(keys) > 1 and not np.all(keys[1:] >= keys[:-1]):
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+    else:
+        order = None
+    changes = keys[1:] != keys[:-1]
+    if keys.dtype.kind in 'fcmM':
+        # Missing keys sort last and are unequal to each other, so they are joined into one group here.
+        missing = np.isnat(keys) if keys.dtype.kind in 'mM' else np.isnan(keys)
+        changes &= ~(missing[1:] & missing[:-1])
+    starts = np.concatenate(([0], np.flatnonzero(changes) + 1)) if len(keys) else np.empty(0, dtype=np.int64)
+    return order, starts, keys[starts]
+
+def _reduce_groups(array, keys, ops):
+    keys = np.asarray(keys)
+    if keys.shape != array.shape[:1]:
+        raise ValueError("by must have one key per row of the array.")
+    # Sums take the dtype np.sum would give (int64 for integer and bool values), on both paths below.
+    sum_dtype = np.add.reduce(array[:0], axis=0).dtype
+    if keys.dtype.kind in 'iu' and array.ndim == 1 and set(ops) <= {'sum', 'mean', 'count'} and len(keys):
+        offset = keys.min()
+        span = int(keys.max()) - int(offset) + 1
+        if span <= 2 * len(keys):
+            # Dense integer keys: bincount needs no sort at all.
+            index = (keys - offset).astype(np.intp)
+            counts = np.bincount(index, minlength=span)
+            present = np.flatnonzero(counts)
+            if sum_dtype.kind == 'f':
+                totals = np.bincount(index, weights=array, minlength=span)[present].astype(sum_dtype, copy=False)
+            else:
+                # bincount weights are float64, which would round integer sums beyond 2 ** 53.
+                totals = np.zeros(span, dtype=sum_dtype)
+                np.add.at(totals, index, array)
+                totals = totals[present]
+            counts = counts[present]
+            results = {'key': present + offset}
+            for op in ops:
+                results[op] = {'sum': totals, 'count': counts, 'mean': totals / counts}[op]
+            return results
+    order, starts, unique = _segments(keys)
+    values = array if order is None else array[order]
+    counts = np.diff(np.append(starts, len(values)))
+    shape = (-1,) + (1,) * (values.ndim - 1)
+    results = {'key': unique}
+    totals = None
+    if {'sum', 'mean', 'std', 'var'} & set(ops):
+        # reduceat needs at least one segment; no rows give no groups, with the dtype of a sum.
+        totals = np.add.reduceat(values, starts, axis=0, dtype=sum_dtype) if len(values) else np.zeros((0,) + values.shape[1:], dtype=sum_dtype)
+    for op in ops:
+        if op == 'sum':
+            results[op] = totals
+        elif op == 'count':
+            results[op] = counts
+        elif op == 'mean':
+            results[op] = totals / counts.reshape(shape)
+        elif op in ('std', 'var'):
+            if 'var' not in results:
+                means = totals / counts.reshape(shape)
+                deviations = (values - np.repeat(means, counts, axis=0)) ** 2
+                results['var'] = np.add.reduceat(deviations, starts, axis=0) / counts.reshape(shape)
+            results[op] = np.sqrt(results['var']) if op == 'std' else results['var']
+        elif op == 'max':
+            results[op] = np.maximum.reduceat(values, starts, axis=0)
+        elif op == 'min':
+            results[op] = np.minimum.reduceat(values, starts, axis=0)
+    return {name: results[name] for name in ['key'] + list(ops)}
+
+def aggregate(array, operation=None, ops=None, by=None):
     """
     Applies an aggregation operation on an array.
-    
+
+    Several operations can be computed in one call with ops, sharing their intermediate sums, and
+    grouped by key with by. Grouping sorts the keys once and reduces every group with segmented
+    reductions (np.add.reduceat and friends, or np.bincount for dense integer keys).
+
     Parameters:
-    - array (numpy.ndarray): The input array.
+    - array (numpy.ndarray): The input array. With by, reductions run along the first axis.
     - operation (str): The aggregation operation ('sum', 'mean', 'max', 'min').
-    
+    - ops (list of str, optional): Operations to compute together, any of 'sum', 'mean', 'max',
+      'min', 'count', 'std' and 'var'.
+    - by (array-like, optional): One group key per row of the array. NaN (or NaT) keys form a
+      single group, sorted last.
+
     Returns:
-    - float: The result of the aggregation operation.
+    - float: The result of the aggregation operation, if only operation is given.
+    - dict: Otherwise one entry per operation, plus 'key' holding the sorted distinct keys when
+      grouping; grouped entries are arrays aligned with 'key'.
     """
     try:
-        if operation == 'sum':
-            result = np.sum(array)
-        elif operation == 'mean':
-            result = np.mean(array)
-        elif operation == 'max':
-            result = np.max(array)
-        elif operation == 'min':
-            result = np.min(array)
+        if ops is None and by is None:
+            if operation == 'sum':
+                result = np.sum(array)
+            elif operation == 'mean':
+                result = np.mean(array)
+            elif operation == 'max':
+                result = np.max(array)
+            elif operation == 'min':
+                result = np.min(array)
+            else:
+                raise ValueError("Unsupported operation. Choose from 'sum', 'mean', 'max', 'min'.")
+            logging.info(f"Aggregate operation '{operation}' completed successfully.")
+            return result
+        ops = list(ops) if ops is not None else [operation]
+        _check_operations(ops)
+        array = np.asarray(array)
+        if by is None:
+            result = _reduce(array.ravel(), ops)
         else:
-            raise ValueError("Unsupported operation. Choose from 'sum', 'mean', 'max', 'min'.")
-        logging.info(f"Aggregate operation '{operation}' completed successfully.")
+            result = _reduce_groups(array, by, ops)
+        logging.info(f"Aggregate operations {ops} completed successfully" + (f" over {len(result['key'])} groups." if by is not None else "."))
         return result
     except Exception as e:
         logging.error(f"An error occurred in aggregate function: {str(e)}", exc_info=True)
         raise
 
-def summary(array):
+def _order_statistics(rows, counts, percentiles):
+    """
+    Selects min, max and the requested percentiles of each row from a single partition.
+
+    rows holds one group per row with its invalid values replaced by inf; counts holds the number
+    of valid values per row. rows is partitioned in place, one call per distinct count, which
+    leaves the valid values of every row in its first counts[i] positions.
+    """
+    n_rows = rows.shape[0]
+    minimum = np.empty(n_rows, dtype=rows.dtype)
+    maximum = np.empty(n_rows, dtype=rows.dtype)
+    quantiles = np.empty((len(percentiles), n_rows))
+    for count in np.unique(counts):
+        selected = np.flatnonzero(counts == count)
+        if count == 0:
+            minimum[selected] = maximum[selected] = np.nan if rows.dtype.kind == 'f' else 0
+            quantiles[:, selected] = np.nan
+            continue
+        positions = [q / 100.0 * (count - 1) for q in percentiles]
+        kth = sorted({0, count - 1} | {int(np.floor(p)) for p in positions} | {int(np.ceil(p)) for p in positions})
+        if len(selected) < n_rows:
+            block = rows[selected]
+            block.partition(kth, axis=1)
+            rows[selected] = block
+        else:
+            block = rows
+            block.partition(kth, axis=1)
+        minimum[selected] = block[:, 0]
+        maximum[selected] = block[:, count - 1]
+        for i, p in enumerate(positions):
+            lo = block[:, int(np.floor(p))].astype(np.float64)
+            hi = block[:, int(np.ceil(p))].astype(np.float64)
+            # Rows whose NaNs are kept (skipna=False) interpolate between infs; they become NaN later.
+            with np.errstate(invalid='ignore'):
+                quantiles[i, selected] = lo + (hi - lo) * (p - np.floor(p))
+    return minimum, maximum, quantiles
+
+def summary(array, axis=None, percentiles=(25, 50, 75), skipna=False):
     """
     Generates a statistical summary of the numerical data in the array.
-    
+
+    All order statistics (min, max and percentiles) come from one in-place partition of a single
+    copy of the data, and the mean and std from one pass over that copy, shifted by the median for
+    numerical stability. Rows with different numbers of valid values are partitioned in separate
+    groups, which briefly copies the smaller groups.
+
     Parameters:
     - array (numpy.ndarray): The input array.
-    
+    - axis (int, optional): Axis to summarize along, e.g. 0 for one summary per column. If None,
+      the whole array is summarized.
+    - percentiles (sequence of float): Percentiles to compute, between 0 and 100.
+    - skipna (bool): If True, NaNs are ignored (like np.nanmean and np.nanpercentile) and count
+      is the number of non-NaN values. If False, a NaN makes every statistic of its group NaN.
+
     Returns:
-    - dict: A dictionary containing count, mean, std, min, max, 25%, 50%, 75% percentiles.
+    - dict: A dictionary containing count, mean, std, min, max and one entry per percentile
+      (25%, 50%, 75% by default). Values are scalars if axis is None and arrays of the reduced
+      shape otherwise.
     """
     try:
+        array = np.asarray(array)
+        if axis is None:
+            rows = array.reshape(1, -1)
+            shape = ()
+        else:
+            moved = np.moveaxis(array, axis, -1)
+            shape = moved.shape[:-1]
+            rows = moved.reshape(-1, moved.shape[-1])
+        if rows.shape[1] == 0:
+            raise ValueError("zero-size array to reduction operation minimum which has no identity")
+        # The working copy is the only allocation of the size of the input.
+        work = np.array(rows, dtype=rows.dtype if rows.dtype.kind in 'fiub' else np.float64)
+        if work.dtype == np.bool_:
+            work = work.astype(np.int64)
+        nan_mask = np.isnan(work) if work.dtype.kind == 'f' else None
+        has_nan = nan_mask is not None and nan_mask.any()
+        counts = np.full(work.shape[0], work.shape[1], dtype=np.int64)
+        if has_nan:
+            rows_with_nan = nan_mask.any(axis=1)
+            if skipna:
+                counts -= nan_mask.sum(axis=1)
+            # NaNs are moved past the valid values so every row partitions as if it were shorter.
+            np.copyto(work, np.inf, where=nan_mask)
+        minimum, maximum, quantiles = _order_statistics(work, counts, percentiles)
+        median = np.nan_to_num(quantiles[list(percentiles).index(50)] if 50 in percentiles else minimum.astype(np.float64))
+        shifted = work if work.dtype == np.float64 else work.astype(np.float64)
+        shifted -= median[:, None]
+        if has_nan and skipna:
+            # The partition moved the NaN placeholders past the valid values of each row.
+            shifted[np.arange(work.shape[1]) >= counts[:, None]] = 0.0
+        elif has_nan:
+            # Rows with a NaN are reported as NaN; zeroing them keeps inf out of the sums.
+            shifted[rows_with_nan] = 0.0
+        valid = np.maximum(counts, 1)
+        total = shifted.sum(axis=1)
+        squares = np.einsum('ij,ij->i', shifted, shifted)
+        mean = median + total / valid
+        std = np.sqrt(np.maximum(squares / valid - (total / valid) ** 2, 0.0))
+        if has_nan:
+            invalid = (counts == 0) | (rows_with_nan if not skipna else False)
+            for values in (mean, std, minimum, maximum) + tuple(quantiles):
+                values[invalid] = np.nan
         summary_stats = {
-            "count": array.size,
-            "mean": np.mean(array),
-            "std": np.std(array),
-            "min": np.min(array),
-            "max": np.max(array),
-            "25%": np.percentile(array, 25),
-            "50%": np.median(array),
-            "75%": np.percentile(array, 75)
+            "count": counts,
+            "mean": mean,
+            "std": std,
+            "min": minimum,
+            "max": maximum
         }
+        for q, values in zip(percentiles, quantiles):
+            summary_stats[f"{q:g}%"] = values
+        for key, values in summary_stats.items():
+            summary_stats[key] = values[0] if axis is None else values.reshape(shape)
+        if axis is None and not skipna:
+            summary_stats["count"] = array.size
         logging.info("Summary statistics generated successfully.")
         return summary_stats
     except Exception as e:
         logging.error(f"An error occurred in summary function: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
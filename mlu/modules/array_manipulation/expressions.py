@@ -0,0 +1,98 @@
+"""
+Compiled predicate expressions for array_manipulation.filter.
+
+A predicate is written as a string over the variable x, for example
+"(x > 0) & (x < 10) & ~isnan(x)" or "0 < x < 10 and isfinite(x)". The expression is parsed
+once, checked against a whitelist of element-wise operations, and compiled into a function.
+Chained comparisons, and/or/not are rewritten into the element-wise &, | and ~ so that they
+work on arrays. Because every allowed operation is element-wise, the compiled predicate can
+be evaluated block by block without changing its result.
+"""
+
+import ast
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PREDICATE_FUNCTIONS = {
+    'isnan': np.isnan,
+    'isfinite': np.isfinite,
+    'isinf': np.isinf,
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'exp': np.exp,
+    'log': np.log,
+    'floor': np.floor,
+    'ceil': np.ceil,
+    'round': np.round,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.Invert, ast.USub, ast.UAdd,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+)
+
+class _ElementWise(ast.NodeTransformer):
+    """
+    Rewrites and/or/not and chained comparisons into their element-wise equivalents.
+    """
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        parts = [ast.Compare(left=left, ops=[op], comparators=[right]) for left, op, right in zip(operands, node.ops, operands[1:])]
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+def compile_predicate(expression):
+    """
+    Compiles a predicate expression over x into an element-wise function.
+
+    Parameters:
+    - expression (str): The predicate, using x, numeric constants, arithmetic, comparisons,
+      &, |, ~, and, or, not and the functions in PREDICATE_FUNCTIONS.
+
+    Returns:
+    - callable: A function mapping an array to its boolean mask.
+    """
+    try:
+        tree = _ElementWise().visit(ast.parse(expression, mode='eval'))
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax in filter expression: {type(node).__name__}.")
+            if isinstance(node, ast.Name) and node.id != 'x' and node.id not in PREDICATE_FUNCTIONS:
+                raise ValueError(f"Unknown name '{node.id}' in filter expression. Use x and {', '.join(PREDICATE_FUNCTIONS)}.")
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in PREDICATE_FUNCTIONS or node.keywords):
+                raise ValueError("Only the functions in PREDICATE_FUNCTIONS can be called in a filter expression.")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool)):
+                raise ValueError("Only numeric constants are allowed in filter expressions.")
+        code = compile(ast.fix_missing_locations(tree), '<filter expression>', 'eval')
+        namespace = {'__builtins__': {}, **PREDICATE_FUNCTIONS}
+
+        def predicate(x):
+            return eval(code, namespace, {'x': x})
+
+        predicate.expression = expression
+        predicate.__name__ = f"predicate({expression})"
+        return predicate
+    except Exception as e:
+        logging.error(f"An error occurred while compiling the filter expression: {str(e)}", exc_info=True)
+        raise
@@ -23,6 +23,7 @@ __all__ = ['custom_filter']
 
 import numpy as np
 import logging
+from .array_manipulation import filter
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -32,12 +33,15 @@ def custom_filter(array, condition):
 
     Parameters:
     - array (numpy.ndarray): The input array.
-    - condition (callable): A function that returns a boolean value.
+    - condition (callable or str): A function that returns a boolean value, or a predicate
+      expression over x, which is evaluated in blocks.
 
     Returns:
     - numpy.ndarray: Filtered array based on the condition.
     """
     try:
+        if isinstance(condition, str):
+            return filter(array, condition)
         result = array[condition(array)]
         logging.info("Array filtered successfully using custom_filter.")
         return result
@@ -0,0 +1,336 @@
+"""
+Mergeable streaming sketches for array_manipulation.
+
+Each sketch summarizes a stream of chunks in bounded memory and supports update(chunk),
+merge(other) and to_bytes()/from_bytes(), so summaries of many shards or many batches can be
+built independently and combined later:
+
+- MomentSketch: count, mean, variance, min and max with Welford/Chan merging. Exact up to
+  floating point rounding.
+- QuantileSketch: a KLL quantile sketch. With the default k=200 the rank of a returned
+  quantile is within about 1.65% of the requested rank with 99% confidence, independent of
+  the stream length; the error shrinks roughly as 1/k.
+- DistinctSketch: a HyperLogLog distinct count. The relative standard error is 1.04 / sqrt(2 ** p),
+  about 0.81% for the default p=14 (16 KiB of registers).
+
+SummarySketch bundles the three and produces the same keys as summary(), plus 'distinct'.
+NaNs are skipped by every sketch.
+"""
+
+import hashlib
+import io
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _values(chunk):
+    values = np.asarray(chunk).ravel()
+    if values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+    return values
+
+def _pack(kind, **arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, kind=np.array(kind), **arrays)
+    return buffer.getvalue()
+
+def _unpack(data, kind):
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        if str(archive['kind']) != kind:
+            raise ValueError(f"Serialized sketch is a {archive['kind']}, not a {kind}.")
+        return {name: archive[name] for name in archive.files if name != 'kind'}
+
+class MomentSketch:
+    """
+    Streaming count, mean, variance, min and max (Welford's algorithm, merged with Chan's formula).
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, chunk):
+        """
+        Adds the values of a chunk to the sketch.
+        """
+        values = _values(chunk).astype(np.float64)
+        if values.size:
+            mean = values.mean()
+            self._combine(values.size, mean, float(np.sum((values - mean) ** 2)), values.min(), values.max())
+        return self
+
+    def merge(self, other):
+        """
+        Merges another MomentSketch into this one.
+        """
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def to_bytes(self):
+        return _pack('MomentSketch', state=np.array([self.count, self.mean, self.m2, self.min, self.max], dtype=np.float64))
+
+    @classmethod
+    def from_bytes(cls, data):
+        count, mean, m2, minimum, maximum = _unpack(data, 'MomentSketch')['state']
+        sketch = cls()
+        sketch.count, sketch.mean, sketch.m2, sketch.min, sketch.max = int(count), mean, m2, minimum, maximum
+        return sketch
+
+class QuantileSketch:
+    """
+    KLL quantile sketch.
+
+    Parameters:
+    - k (int): Size of the largest compactor; larger is more accurate and uses more memory.
+    - seed (int, optional): Seed for the random choice of which half each compaction keeps.
+    """
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self):
+        while sum(len(items) for items in self._levels) > sum(self._capacity(h) for h in range(len(self._levels))):
+            for level, items in enumerate(self._levels):
+                if len(items) >= self._capacity(level):
+                    break
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays at its level; every other remaining item moves up with double weight.
+            kept, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+            promoted = items[self._rng.integers(2)::2]
+            self._levels[level] = kept
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+
+    def update(self, chunk):
+        """
+        Adds the values of a chunk to the sketch.
+        """
+        values = _values(chunk).astype(np.float64)
+        if values.size:
+            self.count += values.size
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._levels[0] = np.concatenate([self._levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Merges another QuantileSketch into this one.
+        """
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Returns the approximate q-quantiles (0 <= q <= 1) of the stream.
+        """
+        if self.count == 0:
+            raise ValueError("Cannot compute quantiles of an empty sketch.")
+        q = np.asarray(q, dtype=np.float64)
+        items, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.clip(index, 0, len(items) - 1)]
+        return np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+
+    def rank(self, value):
+        """
+        Returns the approximate fraction of the stream less than or equal to value.
+        """
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, value, side='right')
+        return np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0) / cumulative[-1]
+
+    def to_bytes(self):
+        levels = {f"level_{h}": items for h, items in enumerate(self._levels)}
+        return _pack('QuantileSketch', state=np.array([self.k, self.count, self.min, self.max], dtype=np.float64), **levels)
+
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        arrays = _unpack(data, 'QuantileSketch')
+        k, count, minimum, maximum = arrays.pop('state')
+        sketch = cls(k=int(k), seed=seed)
+        sketch.count, sketch.min, sketch.max = int(count), minimum, maximum
+        sketch._levels = [arrays[f"level_{h}"] for h in range(len(arrays))]
+        return sketch
+
+def _hash64(values):
+    """
+    Returns a 64-bit hash per value: splitmix64 over the bits of numeric values, blake2b otherwise.
+    """
+    if values.dtype.kind in 'fiub':
+        bits = values.astype(np.float64).view(np.uint64) if values.dtype.kind == 'f' else values.astype(np.int64).view(np.uint64)
+        with np.errstate(over='ignore'):
+            z = bits + np.uint64(0x9E3779B97F4A7C15)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            return z ^ (z >> np.uint64(31))
+    return np.array([int.from_bytes(hashlib.blake2b(repr(value).encode(), digest_size=8).digest(), 'little') for value in values], dtype=np.uint64)
+
+class DistinctSketch:
+    """
+    HyperLogLog distinct count.
+
+    Parameters:
+    - p (int): Number of index bits; the sketch keeps 2 ** p one-byte registers.
+    """
+    def __init__(self, p=14):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be between 4 and 18.")
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, chunk):
+        """
+        Adds the values of a chunk to the sketch.
+        """
+        values = _values(chunk)
+        if values.size:
+            hashes = _hash64(values)
+            index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+            # Position of the leftmost 1-bit of the remaining bits. They are cut to 53 bits so the
+            # conversion to float64 is exact, with a guard bit so the rank is at most 53.
+            rest = ((hashes << np.uint64(self.p)) >> np.uint64(11)) | np.uint64(1)
+            rank = (53 - np.floor(np.log2(rest.astype(np.float64)))).astype(np.uint8)
+            np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """
+        Merges another DistinctSketch with the same p into this one.
+        """
+        if other.p != self.p:
+            raise ValueError("Only sketches with the same p can be merged.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """
+        Returns the estimated number of distinct values.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            return m * np.log(m / zeros)
+        return raw
+
+    def to_bytes(self):
+        return _pack('DistinctSketch', registers=self.registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        registers = _unpack(data, 'DistinctSketch')['registers']
+        sketch = cls(p=int(np.log2(len(registers))))
+        sketch.registers = registers.astype(np.uint8)
+        return sketch
+
+class SummarySketch:
+    """
+    Moments, quantiles and a distinct count of a stream, mergeable across shards and batches.
+
+    Parameters:
+    - k (int): Accuracy parameter of the quantile sketch.
+    - p (int): Precision of the distinct count sketch.
+    - seed (int, optional): Seed of the quantile sketch.
+    """
+    def __init__(self, k=200, p=14, seed=None):
+        self.moments = MomentSketch()
+        self.quantiles = QuantileSketch(k=k, seed=seed)
+        self.distinct = DistinctSketch(p=p)
+
+    def update(self, chunk):
+        """
+        Adds the values of a chunk to all three sketches.
+        """
+        values = _values(chunk)
+        self.moments.update(values)
+        self.quantiles.update(values)
+        self.distinct.update(values)
+        return self
+
+    def merge(self, other):
+        """
+        Merges another SummarySketch into this one.
+        """
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def summary(self, percentiles=(25, 50, 75)):
+        """
+        Returns the same statistics as summary() (with approximate percentiles) plus 'distinct'.
+        """
+        if self.moments.count == 0:
+            raise ValueError("Cannot summarize an empty sketch.")
+        stats = {
+            "count": self.moments.count,
+            "mean": self.moments.mean,
+            "std": self.moments.std,
+            "min": self.moments.min,
+            "max": self.moments.max
+        }
+        for q, value in zip(percentiles, self.quantiles.quantile(np.asarray(percentiles) / 100.0)):
+            stats[f"{q:g}%"] = value
+        stats["distinct"] = self.distinct.estimate()
+        return stats
+
+    def to_bytes(self):
+        parts = [self.moments.to_bytes(), self.quantiles.to_bytes(), self.distinct.to_bytes()]
+        return _pack('SummarySketch', **{f"part_{i}": np.frombuffer(part, dtype=np.uint8) for i, part in enumerate(parts)})
+
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        parts = _unpack(data, 'SummarySketch')
+        sketch = cls.__new__(cls)
+        sketch.moments = MomentSketch.from_bytes(parts['part_0'].tobytes())
+        sketch.quantiles = QuantileSketch.from_bytes(parts['part_1'].tobytes(), seed=seed)
+        sketch.distinct = DistinctSketch.from_bytes(parts['part_2'].tobytes())
+        return sketch
@@ -0,0 +1,390 @@
+"""
+Vectorized sliding-window operations for array_manipulation.
+
+Windows run along the first axis (time), so a 2-D array is treated as one series per column.
+
+- rolling: sum, mean, std, var, min and max with the van Herk/Gil-Werman block algorithm, which
+  gives the same O(n) bound as a monotonic deque but runs as a few vectorized accumulations: the
+  series is cut into blocks of one window, and each window is the suffix of one block joined to
+  the prefix of the next. For the moments the prefix and suffix sums restart in every block and
+  are taken about a value of that block, and the two parts are merged as in Chan et al., so the
+  error stays that of a single window however long the series. median/quantile run over
+  sliding_window_view.
+- expanding: the same statistics over all rows seen so far.
+- ewm: exponentially weighted mean, computed in blocks whose decay factors cannot overflow.
+
+RollingWindow, ExpandingWindow and EWMWindow process a stream chunk by chunk: each update(chunk)
+returns the result for the rows of that chunk, carrying the window state (the last window - 1
+rows, the running moments or the weighted sums) across chunk boundaries, so the output matches
+the whole-array functions.
+
+NaN rows are treated as missing: they are left out of every statistic, min_periods counts only
+the valid rows of a window, and the exponentially weighted mean carries its last value over them.
+"""
+
+import warnings
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ROLLING_OPERATIONS = ('sum', 'mean', 'std', 'var', 'min', 'max', 'median', 'quantile', 'count')
+EXPANDING_OPERATIONS = ('sum', 'mean', 'std', 'var', 'min', 'max', 'count')
+
+def _as_series(array, axis):
+    array = np.asarray(array)
+    if array.ndim not in (1, 2):
+        raise ValueError("Window operations support 1-D and 2-D arrays.")
+    return np.moveaxis(array, axis, 0).astype(np.float64)
+
+def _first_valid(values, valid):
+    # The first valid row of each column, NaN for columns without one.
+    if not len(values):
+        return np.full(values.shape[1:], np.nan)
+    first = np.take_along_axis(values, np.argmax(valid, axis=0)[None], axis=0)[0]
+    return np.where(valid.any(axis=0), first, np.nan)
+
+def _window_sums(values, window):
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    lagged = np.concatenate([np.zeros((min(window, len(values)),) + values.shape[1:]), cumulative[1:max(len(values) - window + 1, 1)]])
+    return cumulative[1:] - lagged
+
+def _rolling_extreme(values, window, ufunc):
+    n = len(values)
+    identity = np.inf if ufunc is np.fmin else -np.inf
+    blocks = -(-n // window)
+    padded = np.full((blocks * window,) + values.shape[1:], identity)
+    padded[:n] = values
+    shaped = padded.reshape((blocks, window) + values.shape[1:])
+    prefix = ufunc.accumulate(shaped, axis=1).reshape(padded.shape)
+    suffix = ufunc.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    result = np.empty_like(values)
+    head = min(window - 1, n)
+    # The first window - 1 rows see a partial window, which is just a running extreme.
+    result[:head] = ufunc.accumulate(values[:head], axis=0) if head else result[:head]
+    if n >= window:
+        result[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+    return result
+
+def _block_moments(values, valid, reverse):
+    """
+    Count, sum and sum of squares of the deviations from a shift, accumulated from the start of each
+    block (or from its end if reverse), with the first (or last) valid value of the block as the shift.
+    """
+    if reverse:
+        values, valid = values[:, ::-1], valid[:, ::-1]
+    first = np.argmax(valid, axis=1)[:, None]
+    shift = np.nan_to_num(np.take_along_axis(values, first, axis=1))
+    deviations = np.where(valid, values - shift, 0.0)
+    moments = (np.cumsum(valid, axis=1).astype(np.float64), np.cumsum(deviations, axis=1), np.cumsum(deviations ** 2, axis=1),
+               np.broadcast_to(shift, values.shape))
+    if reverse:
+        moments = tuple(moment[:, ::-1] for moment in moments)
+    return tuple(np.reshape(moment, (-1,) + values.shape[2:]) for moment in moments)
+
+def _rolling_moments(values, valid, window):
+    """
+    Rolling count, sum, mean and sum of squared deviations from the mean (M2) of the valid rows.
+    """
+    n = len(values)
+    blocks = max(-(-n // window), 1)
+    padded = np.zeros((blocks * window,) + values.shape[1:])
+    present = np.zeros(padded.shape, dtype=bool)
+    padded[:n] = np.where(valid, values, 0.0)
+    present[:n] = valid
+    padded, present = padded.reshape((blocks, window) + values.shape[1:]), present.reshape((blocks, window) + values.shape[1:])
+    count_b, sum_b, squares_b, shift_b = (moment[:n] for moment in _block_moments(padded, present, False))
+    # A window ending at row t starts at row t - window + 1; unless that is the start of t's block
+    # (or before row 0), the window also takes the suffix of the previous block from that row on.
+    starts = np.arange(n) - window + 1
+    joined = ((starts > 0) & (starts % window != 0)).reshape((-1,) + (1,) * (values.ndim - 1))
+    count_a, sum_a, squares_a, shift_a = (np.where(joined, moment[np.maximum(starts, 0)], 0.0)
+                                          for moment in _block_moments(padded, present, True))
+    counts = count_a + count_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m2_a = np.where(count_a > 0, squares_a - sum_a ** 2 / count_a, 0.0)
+        m2_b = np.where(count_b > 0, squares_b - sum_b ** 2 / count_b, 0.0)
+        mean_a = shift_a + sum_a / count_a
+        mean_b = shift_b + sum_b / count_b
+        means = shift_b + (sum_b + sum_a + count_a * (shift_a - shift_b)) / counts
+        delta = np.where((count_a > 0) & (count_b > 0), mean_a - mean_b, 0.0)
+        m2 = np.maximum(m2_a, 0.0) + np.maximum(m2_b, 0.0) + delta ** 2 * count_a * count_b / counts
+    totals = (sum_a + count_a * shift_a) + (sum_b + count_b * shift_b)
+    return counts, totals, means, m2
+
+def _rolling_quantile(values, window, q):
+    n = len(values)
+    result = np.empty(values.shape)
+    quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+    with warnings.catch_warnings():
+        # All-NaN windows give NaN, which min_periods masks anyway.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for i in range(min(window - 1, n)):
+            result[i] = quantile(values[:i + 1], q, axis=0)
+        if n >= window:
+            view = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+            result[window - 1:] = quantile(view, q, axis=-1)
+    return result
+
+def rolling(array, window, operation='mean', min_periods=None, q=0.5, ddof=0, axis=0):
+    """
+    Computes a rolling window statistic.
+
+    Parameters:
+    - array (numpy.ndarray): A 1-D series or a 2-D array with one series per column.
+    - window (int): Number of rows in each window.
+    - operation (str): One of 'sum', 'mean', 'std', 'var', 'min', 'max', 'median', 'quantile' and 'count'.
+    - min_periods (int, optional): Minimum number of valid (non-NaN) rows in a window for a result;
+      rows with fewer are NaN. Defaults to window.
+    - q (float): Quantile between 0 and 1, for operation='quantile'.
+    - ddof (int): Delta degrees of freedom for 'std' and 'var'.
+    - axis (int): The time axis.
+
+    Returns:
+    - numpy.ndarray: Float array of the same shape as the input.
+    """
+    try:
+        if operation not in ROLLING_OPERATIONS:
+            raise ValueError(f"Unsupported operation. Choose from {', '.join(ROLLING_OPERATIONS)}.")
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        values = _as_series(array, axis)
+        min_periods = window if min_periods is None else min_periods
+        valid = ~np.isnan(values)
+        counts = _window_sums(valid.astype(np.float64), window)
+        if operation == 'count':
+            result = counts.copy()
+        elif operation in ('sum', 'mean', 'std', 'var'):
+            _, totals, means, m2 = _rolling_moments(values, valid, window)
+            if operation == 'sum':
+                result = totals
+            elif operation == 'mean':
+                result = means
+            else:
+                result = m2 / np.where(counts > ddof, counts - ddof, np.nan)
+                if operation == 'std':
+                    result = np.sqrt(result)
+        elif operation in ('min', 'max'):
+            result = _rolling_extreme(values, window, np.fmin if operation == 'min' else np.fmax)
+        else:
+            result = _rolling_quantile(values, window, 0.5 if operation == 'median' else q)
+        result[counts < max(min_periods, 1)] = np.nan
+        logging.info(f"Rolling {operation} over a window of {window} computed successfully.")
+        return np.moveaxis(result, 0, axis)
+    except Exception as e:
+        logging.error(f"An error occurred in rolling function: {str(e)}", exc_info=True)
+        raise
+
+def _expanding(values, operation, state, ddof=0, min_periods=1):
+    """
+    Expanding statistic of values continuing from state. Returns the result and the new state.
+    """
+    count, mean, m2, minimum, maximum = state if state is not None else (0, 0.0, 0.0, np.inf, -np.inf)
+    valid = ~np.isnan(values)
+    local_counts = np.cumsum(valid, axis=0).astype(np.float64)
+    counts = count + local_counts
+    # Running mean and sum of squared deviations of the chunk, merged with the state (Chan et al.).
+    shift = np.nan_to_num(_first_valid(values, valid))
+    deviations = np.where(valid, values - shift, 0.0)
+    local_sums = np.cumsum(deviations, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local_means = np.where(local_counts > 0, local_sums / local_counts + shift, mean)
+        local_m2 = np.where(local_counts > 0, np.cumsum(deviations ** 2, axis=0) - local_sums ** 2 / local_counts, 0.0)
+        delta = local_means - mean
+        means = np.where(counts > 0, mean + delta * local_counts / counts, 0.0)
+        m2s = np.where(counts > 0, m2 + local_m2 + delta ** 2 * count * local_counts / counts, 0.0)
+        if operation in ('min', 'max'):
+            ufunc = np.fmin if operation == 'min' else np.fmax
+            result = ufunc(ufunc.accumulate(values, axis=0), minimum if operation == 'min' else maximum) if len(values) else np.empty(values.shape)
+        elif operation == 'count':
+            result = counts.copy()
+        elif operation == 'sum':
+            result = means * counts
+        elif operation == 'mean':
+            result = means.copy()
+        else:
+            result = np.maximum(m2s, 0.0) / np.where(counts > ddof, counts - ddof, np.nan)
+            if operation == 'std':
+                result = np.sqrt(result)
+    if len(values):
+        state = (counts[-1], means[-1], m2s[-1], np.minimum(minimum, np.where(valid, values, np.inf).min(axis=0)),
+                 np.maximum(maximum, np.where(valid, values, -np.inf).max(axis=0)))
+    result[counts < max(min_periods, 1)] = np.nan
+    return result, state
+
+def expanding(array, operation='mean', min_periods=1, ddof=0, axis=0):
+    """
+    Computes an expanding window statistic over all rows up to and including each row.
+
+    Parameters:
+    - array (numpy.ndarray): A 1-D series or a 2-D array with one series per column.
+    - operation (str): One of 'sum', 'mean', 'std', 'var', 'min', 'max' and 'count'.
+    - min_periods (int): Minimum number of valid (non-NaN) rows for a result; earlier rows are NaN.
+    - ddof (int): Delta degrees of freedom for 'std' and 'var'.
+    - axis (int): The time axis.
+
+    Returns:
+    - numpy.ndarray: Float array of the same shape as the input.
+    """
+    try:
+        if operation not in EXPANDING_OPERATIONS:
+            raise ValueError(f"Unsupported operation. Choose from {', '.join(EXPANDING_OPERATIONS)}.")
+        values = _as_series(array, axis)
+        result, _ = _expanding(values, operation, None, ddof, min_periods)
+        logging.info(f"Expanding {operation} computed successfully.")
+        return np.moveaxis(result, 0, axis)
+    except Exception as e:
+        logging.error(f"An error occurred in expanding function: {str(e)}", exc_info=True)
+        raise
+
+def _alpha(alpha, span, halflife, com):
+    given = [value is not None for value in (alpha, span, halflife, com)]
+    if sum(given) != 1:
+        raise ValueError("Give exactly one of alpha, span, halflife and com.")
+    if span is not None:
+        alpha = 2.0 / (span + 1.0)
+    elif halflife is not None:
+        alpha = 1.0 - np.exp(-np.log(2.0) / halflife)
+    elif com is not None:
+        alpha = 1.0 / (1.0 + com)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1].")
+    return alpha
+
+def _ewm(values, alpha, adjust, state):
+    """
+    Exponentially weighted mean of values continuing from state. Returns the result and the new state.
+
+    With decay r = 1 - alpha the weighted sums satisfy S_t = r ** k_t * S_-1 + sum_i r ** (k_t - k_i) * x_i,
+    where k_t counts the valid rows up to t, which is a cumulative sum once every x_i is scaled by
+    r ** -k_i. NaN rows add nothing and do not advance k, so they carry the previous result. Blocks
+    are short enough that r ** -k_i stays far from overflow.
+    """
+    decay = 1.0 - alpha
+    shape = values.shape[1:]
+    valid = ~np.isnan(values)
+    if adjust:
+        state = (np.zeros(shape), np.zeros(shape)) if state is None else state
+    else:
+        # Without adjust, y_0 = x_0 at the first valid row; a previous value equal to x_0 reproduces that.
+        # Columns without a valid row so far keep a NaN previous value and are seeded from this chunk.
+        previous = np.full(shape, np.nan) if state is None else state[0]
+        started = ~np.isnan(previous)
+        state = (np.where(started, previous, _first_valid(values, valid)),)
+    if decay == 0.0:
+        # alpha = 1 puts all weight on the latest valid row.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            last = state[0] / state[1] if adjust else previous
+        rows = np.maximum.accumulate(np.where(valid, np.arange(len(values)).reshape((-1,) + (1,) * len(shape)), -1), axis=0)
+        result = np.where(rows >= 0, np.take_along_axis(values, np.maximum(rows, 0), axis=0) if len(values) else values, last)
+        if len(values):
+            last = result[-1]
+        seen = ~np.isnan(last)
+        state = (np.where(seen, last, 0.0), seen.astype(np.float64)) if adjust else (last,)
+        return result, state
+    block = int(min(max(np.log(1e100) / -np.log(decay), 1), 65536))
+    result = np.empty(values.shape)
+    for start in range(0, len(values), block):
+        part = values[start:start + block]
+        present = valid[start:start + block]
+        steps = np.cumsum(present, axis=0).astype(np.float64)
+        growth = np.where(present, decay ** -(steps - 1), 0.0)
+        shrink = decay ** steps
+        weighted = np.cumsum(np.where(present, part, 0.0) * growth, axis=0)
+        if adjust:
+            numerator, denominator = state
+            numerators = shrink * numerator + weighted * shrink / decay
+            denominators = shrink * denominator + np.cumsum(growth, axis=0) * shrink / decay
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[start:start + len(part)] = numerators / denominators
+            state = (numerators[-1], denominators[-1])
+        else:
+            previous, = state
+            smoothed = shrink * previous + alpha * weighted * shrink / decay
+            result[start:start + len(part)] = smoothed
+            state = (smoothed[-1],)
+    if not adjust and len(values):
+        # Rows before the first valid row of a column have no mean yet.
+        result[~(started | (np.cumsum(valid, axis=0) > 0))] = np.nan
+    return result, state
+
+def ewm(array, alpha=None, span=None, halflife=None, com=None, adjust=True, axis=0):
+    """
+    Computes an exponentially weighted moving average.
+
+    Parameters:
+    - array (numpy.ndarray): A 1-D series or a 2-D array with one series per column.
+    - alpha (float, optional): Smoothing factor in (0, 1].
+    - span (float, optional): Span, alpha = 2 / (span + 1).
+    - halflife (float, optional): Half-life in rows, alpha = 1 - exp(-ln(2) / halflife).
+    - com (float, optional): Center of mass, alpha = 1 / (1 + com).
+    - adjust (bool): If True, each result is the weighted average of all rows so far (as in
+      pandas); if False, the recursive form y_t = (1 - alpha) * y_t-1 + alpha * x_t is used. NaN rows
+      are skipped and carry the previous result, as with pandas' ignore_na=True.
+    - axis (int): The time axis.
+
+    Returns:
+    - numpy.ndarray: Float array of the same shape as the input.
+    """
+    try:
+        values = _as_series(array, axis)
+        result, _ = _ewm(values, _alpha(alpha, span, halflife, com), adjust, None)
+        logging.info("Exponentially weighted mean computed successfully.")
+        return np.moveaxis(result, 0, axis)
+    except Exception as e:
+        logging.error(f"An error occurred in ewm function: {str(e)}", exc_info=True)
+        raise
+
+class RollingWindow:
+    """
+    Chunked rolling window: update(chunk) returns rolling(...) for the rows of the chunk, as if
+    all chunks so far had been concatenated. Parameters are those of rolling (time axis 0).
+    """
+    def __init__(self, window, operation='mean', min_periods=None, q=0.5, ddof=0):
+        self.window = window
+        self.operation = operation
+        self.min_periods = min_periods
+        self.q = q
+        self.ddof = ddof
+        self._tail = None
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        data = chunk if self._tail is None else np.concatenate([self._tail, chunk])
+        result = rolling(data, self.window, self.operation, self.min_periods, self.q, self.ddof)
+        seen = 0 if self._tail is None else len(self._tail)
+        self._tail = data[max(len(data) - (self.window - 1), 0):] if self.window > 1 else data[:0]
+        return result[seen:]
+
+class ExpandingWindow:
+    """
+    Chunked expanding window: update(chunk) returns expanding(...) for the rows of the chunk,
+    carrying the running count, moments, min and max. Parameters are those of expanding.
+    """
+    def __init__(self, operation='mean', min_periods=1, ddof=0):
+        if operation not in EXPANDING_OPERATIONS:
+            raise ValueError(f"Unsupported operation. Choose from {', '.join(EXPANDING_OPERATIONS)}.")
+        self.operation = operation
+        self.min_periods = min_periods
+        self.ddof = ddof
+        self._state = None
+
+    def update(self, chunk):
+        values = np.asarray(chunk, dtype=np.float64)
+        result, self._state = _expanding(values, self.operation, self._state, self.ddof, self.min_periods)
+        return result
+
+class EWMWindow:
+    """
+    Chunked exponentially weighted mean: update(chunk) returns ewm(...) for the rows of the chunk,
+    carrying the weighted sums. Parameters are those of ewm.
+    """
+    def __init__(self, alpha=None, span=None, halflife=None, com=None, adjust=True):
+        self.alpha = _alpha(alpha, span, halflife, com)
+        self.adjust = adjust
+        self._state = None
+
+    def update(self, chunk):
+        values = np.asarray(chunk, dtype=np.float64)
+        result, self._state = _ewm(values, self.alpha, self.adjust, self._state)
+        return result
@@ -1,4 +1,5 @@
 from sklearn.model_selection import cross_val_score, GridSearchCV
+from ..model_building import bayesian_search
 import numpy as np
 import logging
 
@@ -30,16 +31,25 @@ class AutoML:
         logging.info(f"Best Model: {best_model_name}, Score: {best_score}")
         return best_model
 
-    def hyperparameter_tuning(self, model, param_grid, X, y, scoring):
+    def hyperparameter_tuning(self, model, param_grid, X, y, scoring, method='grid', n_trials=50, n_jobs=1, storage=None):
         """
-        Tunes hyperparameters for the given model using GridSearchCV.
+        Tunes hyperparameters for the given model using GridSearchCV or a Bayesian (TPE) search.
         Parameters:
         - model: The model instance to optimize.
-        - param_grid: The parameter grid to search over.
+        - param_grid: The parameter grid to search over. With method='bayesian', values may also be scipy.stats distributions.
         - X: Features dataset.
         - y: Target dataset.
         - scoring: Scoring metric.
+        - method (str): 'grid' for GridSearchCV or 'bayesian' for bayesian_search.
+        - n_trials (int): Number of trials of the Bayesian search.
+        - n_jobs (int): Number of trials evaluated in parallel by the Bayesian search.
+        - storage (str, optional): SQLite file recording the Bayesian trials for resuming and warm starts.
         """
+        if method == 'bayesian':
+            best_estimator, _ = bayesian_search(model, param_grid, X, y, n_trials=n_trials, scoring=scoring, n_jobs=n_jobs, storage=storage)
+            return best_estimator
+        if method != 'grid':
+            raise ValueError("Invalid method. Choose 'grid' or 'bayesian'.")
         grid_search = GridSearchCV(model, param_grid, scoring=scoring)
         grid_search.fit(X, y)
         logging.info(f"Best Parameters: {grid_search.best_params_}")
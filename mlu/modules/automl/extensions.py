@@ -1,6 +1,7 @@
 # This file is for extending the AutoML module with custom functions.
 
 import logging
+from ..model_building import bayesian_search
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -33,26 +34,29 @@ def custom_model_selector(X, y, models, scoring):
         logging.error(f"An error occurred in custom_model_selector: {e}", exc_info=True)
         raise
 
-def custom_hyperparameter_tuner(model, param_grid, X, y, scoring):
+def custom_hyperparameter_tuner(model, param_grid, X, y, scoring, n_trials=30, cv=5, n_jobs=1, storage=None):
     """
     A custom hyperparameter tuning function for the AutoML module.
-    Tunes model parameters based on the provided parameter grid and scoring metric.
+    Tunes model parameters with a Bayesian (TPE) search that proposes each trial from the results of the earlier ones.
 
     Parameters:
     - model: The model instance to tune.
-    - param_grid: The grid of parameters to search over.
+    - param_grid: The grid of parameters to search over. Values may be lists of choices or scipy.stats distributions.
     - X: Feature dataset.
     - y: Target dataset.
     - scoring: Scoring metric to use for hyperparameter evaluation.
+    - n_trials (int): Number of trials.
+    - cv (int): Number of cross-validation folds per trial.
+    - n_jobs (int): Number of trials evaluated in parallel.
+    - storage (str, optional): SQLite file recording the trials, so an interrupted search resumes.
 
     Returns:
     - The tuned model instance.
     """
     try:
-        # Placeholder for hyperparameter tuning logic
-        # Replace with actual hyperparameter tuning implementation
-        logging.info("Custom hyperparameter tuning completed successfully.")
-        return model  # Return the tuned model
+        tuned_model, best_params = bayesian_search(model, param_grid, X, y, n_trials=n_trials, cv=cv, scoring=scoring, n_jobs=n_jobs, storage=storage)
+        logging.info(f"Custom hyperparameter tuning completed successfully. Best Parameters: {best_params}")
+        return tuned_model
     except Exception as e:
         logging.error(f"An error occurred in custom_hyperparameter_tuner: {e}", exc_info=True)
         raise
@@ -1 +1,2 @@
-from .chain import Chain
\ No newline at end of file
+from .chain import Chain
+from .cache import ChainCache
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Content-addressed memoization of Chain intermediate results.
+
+Every intermediate result is keyed on a hash of the chain's input buffer followed by the name
+and arguments of each step applied so far, so a prefix such as
+handle_missing_values().normalize() on unchanged data is a cache lookup instead of a recompute.
+Results are held in an in-memory LRU bounded by entry count and bytes, and optionally spilled
+to a directory on disk with its own size bound.
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import sys
+import numpy as np
+import pandas as pd
+from .._hashing import hash_data
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _code_names(code):
+    # Global names read by the code, including those of nested functions and comprehensions.
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            names |= _code_names(const)
+    return names
+
+def _describe_code(code):
+    # Nested code objects are described by their contents, since their repr holds a memory address.
+    consts = tuple(_describe_code(const) if hasattr(const, 'co_code') else const for const in code.co_consts)
+    return repr((code.co_code, consts, code.co_names))
+
+def _describe(value, seen=None):
+    # Callables are described by their code, defaults, captured values and the globals they read, not
+    # their id, so that the same lambda defined in a later run produces the same key, while a changed
+    # default or global gives a new one.
+    seen = set() if seen is None else seen
+    if callable(value) and hasattr(value, 'expression'):
+        return repr(('expression', value.expression))
+    if callable(value) and hasattr(value, '__code__'):
+        if id(value) in seen:
+            # A recursive function refers to itself through its globals.
+            return repr(('recursive', value.__qualname__))
+        seen = seen | {id(value)}
+        code = value.__code__
+        closure = tuple(cell.cell_contents for cell in value.__closure__ or ())
+        namespace = getattr(value, '__globals__', {})
+        referenced = {name: namespace[name] for name in sorted(_code_names(code)) if name in namespace}
+        return repr((value.__module__, value.__qualname__, _describe_code(code), _describe(closure, seen),
+                     _describe(value.__defaults__ or (), seen), _describe(value.__kwdefaults__ or {}, seen), _describe(referenced, seen)))
+    if isinstance(value, (list, tuple)):
+        return repr(type(value)(_describe(item, seen) for item in value))
+    if isinstance(value, dict):
+        return repr(sorted((key, _describe(item, seen)) for key, item in value.items()))
+    if isinstance(value, (np.ndarray, pd.DataFrame, pd.Series)):
+        return hash_data(value)
+    if isinstance(value, np.ufunc):
+        return f"ufunc:{value.__name__}"
+    return repr(value)
+
+def step_key(previous_key, name, params):
+    """
+    Derives the key of a step's result from the key of its input, the step name and its arguments.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(previous_key.encode())
+    digest.update(name.encode())
+    digest.update(_describe(params).encode())
+    return digest.hexdigest()
+
+def _size_of(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    return sys.getsizeof(value)
+
+def _frozen(value):
+    # Cached arrays are stored as read-only copies so that later in-place steps cannot change them.
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return value
+
+class ChainCache:
+    """
+    An LRU cache of Chain intermediate results.
+
+    Parameters:
+    - max_bytes (int): Maximum total size of the results held in memory.
+    - max_entries (int, optional): Maximum number of results held in memory.
+    - directory (str, optional): If given, results are also written to this directory and
+      looked up there on a memory miss.
+    - max_disk_bytes (int, optional): Maximum total size of the files in directory.
+    """
+    def __init__(self, max_bytes=1 << 30, max_entries=None, directory=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Returns the cached result for the key, or None on a miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        if self.directory is not None and os.path.exists(self._path(key)):
+            path = self._path(key)
+            with open(path, 'rb') as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+            value = _frozen(value)
+            self._store(key, value)
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """
+        Stores a result under the key, evicting the least recently used entries as needed.
+        """
+        value = _frozen(value)
+        self._store(key, value)
+        if self.directory is not None:
+            path = self._path(key)
+            with open(path + '.tmp', 'wb') as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+            self._evict_disk()
+
+    def _store(self, key, value):
+        size = _size_of(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes or (self.max_entries is not None and len(self._entries) > self.max_entries):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _evict_disk(self):
+        if self.max_disk_bytes is None:
+            return
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        while files and total > self.max_disk_bytes:
+            path = files.pop(0)
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        """
+        Removes all results from memory and disk.
+        """
+        self._entries.clear()
+        self._bytes = 0
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
@@ -1,86 +1,455 @@
 import numpy as np
+import pandas as pd
 from modules.data_transformation import handle_missing_values, normalize, encode_categorical, remove_low_variance_features, apply_pca, generate_polynomial_features
-from modules.array_manipulation import filter, aggregate, summary
-from modules.model_building import initialize_decision_tree, initialize_neural_network, optimize_hyperparameters
+from modules.array_manipulation import filter, aggregate, summary, compile_predicate
+from modules.model_building import initialize_decision_tree, initialize_neural_network, initialize_gradient_boosting, optimize_hyperparameters, train_neural_network
 from modules.model_evaluation import calculate_metrics, plot_roc_curve, plot_confusion_matrix
 from sklearn.model_selection import train_test_split
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from .mapping import apply_map
+from . import columnar
+from .cache import hash_data, step_key
+from .plan import PlanNode, group_plan, run_fused, DEFAULT_BLOCK_SIZE, FUSABLE_STEPS
+from .parallel import run_parallel
+from .streaming import ChunkSource, run_streaming
+from .profiling import StepProfile, describe_plan, summarize_profile
+from .splitting import IndexSplit, features_and_labels, split_indices, fold_indices
+from contextlib import nullcontext
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def _split_set(name):
+    # X_train, X_test, y_train and y_test are read from the index split when the data was split
+    # with mode='index', unless they were assigned explicitly.
+    def get(self):
+        value = self.__dict__.get('_' + name)
+        if value is None and self.__dict__.get('_split') is not None:
+            return getattr(self._split, name)
+        return value
+
+    def set(self, value):
+        self.__dict__['_' + name] = value
+
+    return property(get, set)
+
 class Chain:
-    def __init__(self, data):
-        self.data = np.array(data)
+    X_train = _split_set('X_train')
+    X_test = _split_set('X_test')
+    y_train = _split_set('y_train')
+    y_test = _split_set('y_test')
+
+    def __init__(self, data, lazy=False, block_size=DEFAULT_BLOCK_SIZE, parallel=None, cache=None, copy=True, profiling=False, backend='numpy'):
+        """
+        Parameters:
+        - data (array-like): The input data.
+        - lazy (bool): If True, data methods only record a plan node and the plan runs on value().
+          Adjacent filter, map and normalize steps are then fused into a single blocked pass.
+        - block_size (int): Number of rows processed per block by fused steps.
+        - parallel (int, optional): Number of worker processes for filter, map and normalize steps.
+          The data is sharded over shared memory and each shard is processed by its own worker.
+          Consecutive such steps run together on one pool when the data is next used, even
+          without lazy.
+        - cache (ChainCache, optional): If given, every intermediate result is memoized under a key
+          derived from a hash of the input data and the steps applied so far. Hit and miss counts
+          per step are kept in self.cache_hits and self.cache_misses.
+        - copy (bool): If False, an ndarray (or memmap) passed as data is used without copying, and
+          normalize, handle_missing_values and fused steps write into it in place where its dtype
+          can hold the result.
+        - profiling (bool): If True, wall time, CPU time, input/output shape and dtype, bytes allocated
+          (tracemalloc) and fused/cached flags are recorded for every step; see profile() and explain().
+        - backend (str): 'numpy' converts data to a single ndarray. 'columnar' keeps a DataFrame (or
+          Arrow table) as typed columns and runs numeric steps column by column; normalize then
+          scales each column by its own min and max, and filter conditions must return a row mask.
+        """
+        if backend not in ('numpy', 'columnar'):
+            raise ValueError("Unsupported backend. Choose 'numpy' or 'columnar'.")
+        self.backend = backend
+        if backend == 'columnar':
+            self.data = columnar.to_frame(data, copy)
+        else:
+            self.data = np.array(data) if copy else np.asarray(data)
+        self.copy = copy
+        self.lazy = lazy
+        self.block_size = block_size
+        self.parallel = parallel
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_key = None
+        self._plan = []
+        self.profiling = profiling
+        self._profile = []
+        self.map_path = None
+        self.source = None
+        self._split = None
+        self.folds = None
+        self.model = None
+        self.model_type = None
+        self.model_params = {}
+        self.training_report = None
         logging.info("Chain initialized with data.")
 
+    @property
+    def data(self):
+        self._run_pending()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._run_pending()
+        self._data = value
+
+    def _run_pending(self):
+        # An eager parallel chain holds back its filter, map and normalize steps until the data is
+        # next used, so that consecutive steps go to the worker pool as one fused dispatch.
+        if self.__dict__.get('_plan') and not self.lazy:
+            self._execute_plan()
+
+    @classmethod
+    def from_source(cls, source, chunk_size=DEFAULT_BLOCK_SIZE):
+        """
+        Creates a chain that streams its data chunk by chunk instead of loading it into memory.
+
+        Parameters:
+        - source (numpy.memmap, numpy.ndarray, str or iterable): A memory-mapped array, the path of
+          a .npy file, or an iterator of array chunks.
+        - chunk_size (int): Number of rows per chunk when slicing arrays and .npy files.
+
+        Returns:
+        - Chain: A lazy chain. filter, map, normalize, aggregate and summary run out of core; any
+          other step loads the result of the steps before it into memory and runs from there.
+          value() materializes the result, and iter_chunks() yields it chunk by chunk.
+        """
+        chain = cls(np.empty(0), lazy=True, block_size=chunk_size)
+        chain.source = ChunkSource(source, chunk_size)
+        logging.info("Chain attached to a streamed data source.")
+        return chain
+
+    def _execute_streaming(self, plan):
+        """
+        Runs the streamable prefix of the plan over the source and returns the nodes left to run in memory.
+        """
+        source, self.source = self.source, None
+        map_modes = {}
+        try:
+            kind, result, rest = run_streaming(source, plan, map_modes)
+            if kind == 'stream':
+                chunks = list(result)
+                self.data = np.concatenate(chunks) if chunks else np.array([])
+            else:
+                self.data = result
+        finally:
+            source.close()
+        map_nodes = [node for node in plan if node.name == 'map' and id(node) in map_modes]
+        if map_nodes:
+            self.map_path = map_modes[id(map_nodes[-1])]
+        return rest
+
+    def _records(self, name):
+        """
+        Returns True if the step has to go through the execution plan rather than run directly.
+        """
+        return self.lazy or self.profiling or self.cache is not None or bool(self.parallel and name in FUSABLE_STEPS)
+
+    def _cached_prefix(self, cache, nodes):
+        """
+        Replaces self.data with the result of the longest cached prefix of the nodes and returns the
+        nodes that still have to run, together with the cache key of each of them.
+        """
+        if self._cache_key is None:
+            self._cache_key = hash_data(self.data)
+        keys = []
+        key = self._cache_key
+        for node in nodes:
+            key = step_key(key, node.name, node.params)
+            keys.append(key)
+        for index in range(len(nodes) - 1, -1, -1):
+            if keys[index] in cache:
+                cached = cache.get(keys[index])
+                if cached is not None:
+                    self.data = cached
+                    self._cache_key = keys[index]
+                    self.cache_hits += index + 1
+                    logging.info(f"Cache hit for {index + 1} step(s) ending in '{nodes[index].name}'.")
+                    return nodes[index + 1:], keys[index + 1:]
+        return nodes, keys
+
+    def _record(self, name, **params):
+        self._plan.append(PlanNode(name, params))
+        logging.info(f"Step '{name}' added to the execution plan.")
+        if not self.lazy and not (self.parallel and name in FUSABLE_STEPS):
+            self._execute_plan()
+        return self
+
+    def _execute_plan(self):
+        """
+        Runs the recorded plan, fusing adjacent element-wise steps, and clears it.
+        """
+        plan, self._plan = self._plan, []
+        if not plan and self.source is None:
+            return
+        lazy, parallel, cache, profiling = self.lazy, self.parallel, self.cache, self.profiling
+        self.lazy, self.parallel, self.cache, self.profiling = False, None, None, False
+        try:
+            if self.source is not None:
+                streamed = [node.name for node in plan]
+                with self._profiled(profiling, 'stream[' + '+'.join(streamed) + ']', fused=True) as profile:
+                    plan = self._execute_streaming(plan)
+                self._add_profile(profile, profiling)
+                self._cache_key = None
+            for kind, nodes in group_plan(plan):
+                if cache is not None:
+                    stage = nodes
+                    with self._profiled(profiling, '+'.join(node.name for node in stage), cached=True) as profile:
+                        nodes, keys = self._cached_prefix(cache, stage)
+                    if len(nodes) < len(stage):
+                        if profiling:
+                            profile.step = '+'.join(node.name for node in stage[:len(stage) - len(nodes)])
+                        self._add_profile(profile, profiling)
+                    if not nodes:
+                        continue
+                    before = self.data
+                    # With copy=False a step can change the data in place and keep the same object, so
+                    # identity alone cannot tell it from a failed step; the content hash can.
+                    before_hash = None if self.copy else hash_data(before)
+                fused = kind == 'fused' and isinstance(self.data, np.ndarray) and self.data.ndim > 0
+                with self._profiled(profiling, '+'.join(node.name for node in nodes), fused=fused) as profile:
+                    self._run_stage(nodes, fused, parallel)
+                self._add_profile(profile, profiling)
+                if cache is not None:
+                    self.cache_misses += len(nodes)
+                    changed = self.data is not before or (before_hash is not None and hash_data(self.data) != before_hash)
+                    if not changed:
+                        # The step failed and left the data unchanged, so there is nothing to cache.
+                        self._cache_key = None
+                    else:
+                        cache.put(keys[-1], self.data)
+                        self._cache_key = keys[-1]
+        except Exception as e:
+            self._cache_key = None
+            logging.error(f"An error occurred while executing the plan: {str(e)}", exc_info=True)
+        finally:
+            self.lazy, self.parallel, self.cache, self.profiling = lazy, parallel, cache, profiling
+
+    def _run_stage(self, nodes, fused, parallel):
+        if fused:
+            map_paths = []
+            if parallel and parallel > 1 and len(self.data) >= parallel:
+                self.data = run_parallel(self.data, nodes, parallel, self.block_size, map_paths)
+            else:
+                out = None if self.copy or not self.data.flags.writeable else self.data
+                self.data = run_fused(self.data, nodes, self.block_size, map_paths, out=out)
+            if map_paths:
+                self.map_path = map_paths[-1]
+        else:
+            for node in nodes:
+                getattr(self, node.name)(**node.params)
+
+    def _profiled(self, profiling, step, fused=False, cached=False):
+        return StepProfile(step, self.data, fused, cached) if profiling else nullcontext()
+
+    def _add_profile(self, profile, profiling):
+        if profiling:
+            record = profile.finish(self.data)
+            self._profile.append(record)
+            logging.info(f"Step '{record['step']}' took {record['wall_time']:.6f}s wall, {record['cpu_time']:.6f}s CPU, allocated {record['bytes_allocated']} bytes.")
+
     def handle_missing_values(self, strategy='mean'):
+        if self._records('handle_missing_values'):
+            return self._record('handle_missing_values', strategy=strategy)
         try:
-            self.data = handle_missing_values(self.data, strategy)
+            if self.backend == 'columnar':
+                self.data = columnar.handle_missing_columns(self.data, strategy, copy=self.copy)
+            else:
+                self.data = handle_missing_values(self.data, strategy, copy=self.copy)
             logging.info(f"Missing values handled using {strategy} strategy.")
         except Exception as e:
             logging.error(f"An error occurred in handle_missing_values: {str(e)}", exc_info=True)
         return self
 
     def normalize(self):
+        if self._records('normalize'):
+            return self._record('normalize')
         try:
-            self.data = normalize(self.data)
+            if self.backend == 'columnar':
+                self.data = columnar.normalize_columns(self.data, copy=self.copy)
+            else:
+                self.data = normalize(self.data, copy=self.copy)
             logging.info("Data normalized.")
         except Exception as e:
             logging.error(f"An error occurred in normalize: {str(e)}", exc_info=True)
         return self
 
     def encode_categorical(self, encoding_type='onehot'):
+        if self._records('encode_categorical'):
+            return self._record('encode_categorical', encoding_type=encoding_type)
         try:
-            self.data = encode_categorical(self.data, encoding_type)
+            if self.backend == 'columnar':
+                self.data = columnar.encode_columns(self.data, encoding_type)
+            else:
+                self.data = encode_categorical(self.data, encoding_type)
             logging.info(f"Categorical data encoded using {encoding_type} encoding.")
         except Exception as e:
             logging.error(f"An error occurred in encode_categorical: {str(e)}", exc_info=True)
         return self
 
     def filter(self, condition):
+        if isinstance(condition, str):
+            # Expressions are compiled once, so fused, parallel and streamed plans can apply them per block.
+            condition = compile_predicate(condition)
+        if self._records('filter'):
+            return self._record('filter', condition=condition)
         try:
-            self.data = filter(self.data, condition)
+            if self.backend == 'columnar':
+                self.data = columnar.filter_rows(self.data, condition)
+            else:
+                self.data = filter(self.data, condition)
             logging.info("Data filtered.")
         except Exception as e:
             logging.error(f"An error occurred in filter: {str(e)}", exc_info=True)
         return self
 
     def aggregate(self, operation):
+        if self._records('aggregate'):
+            return self._record('aggregate', operation=operation)
         try:
-            result = aggregate(self.data, operation)
-            self.data = np.array([result])  # Wrap the result in an array to keep the data consistent
+            if self.backend == 'columnar':
+                self.data = columnar.aggregate_columns(self.data, operation)
+            else:
+                result = aggregate(self.data, operation)
+                self.data = np.array([result])  # Wrap the result in an array to keep the data consistent
             logging.info(f"Data aggregated using {operation} operation.")
         except Exception as e:
             logging.error(f"An error occurred in aggregate: {str(e)}", exc_info=True)
         return self
 
-    def map(self, function):
+    def map(self, function, mode='auto', chunk_size=None):
+        """
+        Maps a function over the data. See mapping.apply_map for the available modes; the path
+        that was taken is stored in self.map_path.
+        """
+        if self._records('map'):
+            return self._record('map', function=function, mode=mode, chunk_size=chunk_size)
         try:
-            self.data = np.array(list(map(function, self.data)))
-            logging.info("Data mapped.")
+            if self.backend == 'columnar':
+                self.data, paths = columnar.map_columns(self.data, function, mode, chunk_size, copy=self.copy)
+                # Report the slowest path taken by any column.
+                self.map_path = next((path for path in ('elementwise', 'chunked', 'vectorized') if path in paths.values()), None)
+            else:
+                self.data, self.map_path = apply_map(self.data, function, mode, chunk_size)
+            logging.info(f"Data mapped using the {self.map_path} path.")
         except Exception as e:
             logging.error(f"An error occurred in map: {str(e)}", exc_info=True)
         return self
 
     def summary(self):
+        if self._records('summary'):
+            return self._record('summary')
         try:
-            result = summary(self.data)
-            logging.info("Summary statistics generated.")
-            for key, value in result.items():
-                logging.info(f"{key}: {value}")
-            self.data = np.array([result])  # Wrap the summary in an array to maintain consistency and allow chaining
+            if self.backend == 'columnar':
+                self.data = columnar.summarize_columns(self.data)
+                logging.info(f"Summary statistics generated:\n{self.data}")
+            else:
+                result = summary(self.data)
+                logging.info("Summary statistics generated.")
+                for key, value in result.items():
+                    logging.info(f"{key}: {value}")
+                self.data = np.array([result])  # Wrap the summary in an array to maintain consistency and allow chaining
         except Exception as e:
             logging.error(f"An error occurred in summary: {str(e)}", exc_info=True)
         return self
 
     def value(self):
+        if self.lazy:
+            self._execute_plan()
         logging.info("Returning data.")
         return self.data
 
-    def split_data(self, test_size=0.2, random_state=42):
+    def iter_chunks(self):
+        """
+        Yields the result of the chain in chunks of block_size rows. For a chain created with
+        from_source whose plan does not end in aggregate or summary, the result is never held
+        in memory as a whole.
+        """
+        if self.source is not None and all(node.name in ('filter', 'map', 'normalize') for node in self._plan):
+            try:
+                _, stream, _ = run_streaming(self.source, list(self._plan))
+                yield from stream
+            finally:
+                # Also runs when the caller stops early, so a spill file is never left behind.
+                self.source.close()
+            return
+        data = self.value()
+        for start in range(0, len(data), self.block_size):
+            yield data[start:start + self.block_size]
+
+    def profile(self):
+        """
+        Returns the per-step profile recorded so far as a pandas DataFrame with the columns
+        step, wall_time, cpu_time, input_shape, input_dtype, output_shape, output_dtype,
+        bytes_allocated, fused and cached. Requires profiling=True.
+        """
+        if not self.profiling:
+            logging.warning("Profiling is disabled. Create the chain with profiling=True to record step profiles.")
+        return summarize_profile(self._profile)
+
+    def explain(self):
+        """
+        Returns a description of how the pending plan will be executed: which steps are fused,
+        streamed or run on worker processes, and which stages are already in the cache.
+        """
+        cached_stages = set()
+        if self.cache is not None and self.source is None and self._plan:
+            key = self._cache_key or hash_data(self.data)
+            for index, (_, nodes) in enumerate(group_plan(self._plan)):
+                for node in nodes:
+                    key = step_key(key, node.name, node.params)
+                if key in self.cache:
+                    cached_stages.add(index)
+        description = describe_plan(self._plan, self.source is not None, self.parallel, cached_stages)
+        logging.info(description)
+        return description
+
+    def split_data(self, test_size=0.2, random_state=42, mode='copy', stratify=False, groups=None, n_splits=None, n_repeats=1, shuffle=True):
+        """
+        Splits the data into training and testing sets, using the last column as the labels.
+
+        Parameters:
+        - test_size (float or int): Fraction or number of rows in the test set.
+        - random_state (int, optional): Random seed.
+        - mode (str): 'copy' materializes X_train, X_test, y_train and y_test with train_test_split.
+          'index' stores only row indices; the four sets are then sliced from the data when read,
+          as views where the rows are contiguous.
+        - stratify (bool): If True, class proportions of the labels are kept in every split.
+        - groups (array-like, optional): Group label per row; a group never straddles a split.
+        - n_splits (int, optional): If given, K-fold index splits are stored in self.folds instead,
+          and train_model and evaluate_model run once per fold.
+        - n_repeats (int): Number of times the K-fold split is repeated with a different shuffle.
+        - shuffle (bool): If False, splits are taken in row order (mode='index' and folds only).
+        """
+        if self.lazy:
+            self._execute_plan()
         try:
-            self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(self.data[:, :-1], self.data[:, -1], test_size=test_size, random_state=random_state)
-            logging.info("Data split into training and testing sets.")
+            if mode not in ('copy', 'index'):
+                raise ValueError("Unsupported split mode. Choose 'copy' or 'index'.")
+            X, y = features_and_labels(self.data)
+            labels = np.asarray(y) if stratify else None
+            self._split = None
+            self.folds = None
+            if n_splits is not None:
+                folds = fold_indices(len(self.data), n_splits, n_repeats, random_state, shuffle, stratify=labels, groups=groups)
+                self.folds = [IndexSplit(X, y, train, test) for train, test in folds]
+                logging.info(f"Data split into {len(self.folds)} cross-validation folds.")
+            elif mode == 'index' or groups is not None:
+                train, test = split_indices(len(self.data), test_size, random_state, shuffle, stratify=labels, groups=groups)
+                self._split = IndexSplit(X, y, train, test)
+                self._X_train = self._X_test = self._y_train = self._y_test = None
+                logging.info("Data split into training and testing indices.")
+            else:
+                self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=labels)
+                logging.info("Data split into training and testing sets.")
         except Exception as e:
             logging.error(f"An error occurred in data splitting: {str(e)}", exc_info=True)
         return self
@@ -91,29 +460,80 @@ class Chain:
                 self.model = initialize_decision_tree(**kwargs)
             elif model_type == 'neural_network':
                 self.model = initialize_neural_network(**kwargs)
+            elif model_type == 'gradient_boosting':
+                # Histogram boosting; the binned training matrix of each fold is cached and reused by later fits.
+                self.model = initialize_gradient_boosting(**kwargs)
             else:
-                raise ValueError("Unsupported model type. Choose 'decision_tree' or 'neural_network'.")
+                raise ValueError("Unsupported model type. Choose 'decision_tree', 'neural_network' or 'gradient_boosting'.")
+            self.model_type = model_type
+            self.model_params = kwargs
             logging.info(f"{model_type} model selected.")
         except Exception as e:
             logging.error(f"An error occurred in model selection: {str(e)}", exc_info=True)
         return self
 
-    def train_model(self):
+    def train_model(self, **kwargs):
+        """
+        Trains the selected model on the training set, or one copy of it per fold.
+
+        Parameters:
+        - **kwargs: For a neural network, options of train_neural_network (epochs, batch_size,
+          shuffle_buffer, chunk_size, jit_compile, ...). The network is then fed through a streaming
+          tf.data pipeline and the throughput report is kept in self.training_report (one report
+          per fold when training on folds).
+        """
         try:
             if self.model is None:
                 raise ValueError("Model not selected. Use the select_model method first.")
-            self.model.fit(self.X_train, self.y_train)
-            logging.info("Model trained successfully.")
+            if self.folds:
+                # Each fold trains its own copy of the selected model on that fold's rows only.
+                self.fold_models = []
+                reports = []
+                for fold in self.folds:
+                    if self.model_type == 'neural_network':
+                        # sklearn cannot clone a Keras network, so each fold builds a new one from the same settings.
+                        model, report = train_neural_network(initialize_neural_network(**self.model_params), fold.X_train, fold.y_train, **kwargs)
+                        reports.append(report)
+                    else:
+                        model = clone(self.model)
+                        model.fit(fold.X_train, fold.y_train)
+                    self.fold_models.append(model)
+                if reports:
+                    self.training_report = reports
+                logging.info(f"Model trained on {len(self.folds)} folds.")
+            elif self.model_type == 'neural_network':
+                self.model, self.training_report = train_neural_network(self.model, self.X_train, self.y_train, **kwargs)
+            else:
+                self.model.fit(self.X_train, self.y_train)
+                logging.info("Model trained successfully.")
         except Exception as e:
             logging.error(f"An error occurred in model training: {str(e)}", exc_info=True)
         return self
 
+    def _predict_labels(self, model, X):
+        predictions = model.predict(X)
+        if self.model_type == 'neural_network':
+            # A network outputs probabilities: one sigmoid unit, or one softmax unit per class.
+            predictions = np.asarray(predictions)
+            if predictions.ndim == 2 and predictions.shape[1] > 1:
+                return predictions.argmax(axis=1)
+            return (predictions.ravel() > 0.5).astype(int)
+        return predictions
+
     def evaluate_model(self):
         try:
             if self.model is None:
                 raise ValueError("Model not trained. Use the train_model method first.")
-            predictions = self.model.predict(self.X_test)
-            calculate_metrics(self.y_test, predictions)
+            if self.folds:
+                self.fold_scores = []
+                for model, fold in zip(self.fold_models, self.folds):
+                    predictions = self._predict_labels(model, fold.X_test)
+                    calculate_metrics(fold.y_test, predictions)
+                    self.fold_scores.append(accuracy_score(fold.y_test, predictions))
+                logging.info(f"Mean accuracy over {len(self.folds)} folds: {np.mean(self.fold_scores):.4f}")
+            else:
+                predictions = self._predict_labels(self.model, self.X_test)
+                calculate_metrics(self.y_test, predictions)
         except Exception as e:
             logging.error(f"An error occurred in model evaluation: {str(e)}", exc_info=True)
-        return self
\ No newline at end of file
+        return self
@@ -0,0 +1,121 @@
+"""
+Columnar backend for the Chain class.
+
+With backend='columnar' a chain keeps tabular input as a pandas DataFrame instead of converting
+it with np.array, which turns mixed dtypes into one object array. Numeric steps run column by
+column on each column's own typed values, non-numeric columns pass through untouched, and
+handle_missing_values and encode_categorical keep their pandas fast paths.
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+from modules.data_transformation import handle_missing_values, normalize
+from modules.array_manipulation import aggregate, summary
+from .mapping import apply_map
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def to_frame(data, copy=True):
+    """
+    Converts tabular input to a DataFrame without going through an object array.
+
+    Parameters:
+    - data (pandas.DataFrame, pyarrow.Table, dict or array-like): The input data. Arrow tables are
+      converted with Arrow-backed dtypes where pandas supports them.
+    - copy (bool): If False, a DataFrame passed as data is used as is.
+
+    Returns:
+    - pandas.DataFrame: The data as typed columns.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.copy() if copy else data
+    if isinstance(data, pd.Series):
+        return data.to_frame()
+    if hasattr(data, 'to_pandas'):
+        try:
+            return data.to_pandas(types_mapper=pd.ArrowDtype)
+        except TypeError:
+            return data.to_pandas()
+    return pd.DataFrame(data)
+
+def numeric_columns(frame):
+    return frame.select_dtypes(include='number').columns
+
+def _writable(frame, copy):
+    return frame.copy() if copy else frame
+
+def normalize_columns(frame, copy=True):
+    """
+    Scales every numeric column to the [0, 1] range using that column's own min and max.
+    """
+    frame = _writable(frame, copy)
+    for column in numeric_columns(frame):
+        # Float columns are scaled in place when pandas hands out a writeable view of them.
+        frame[column] = normalize(frame[column].to_numpy(), copy=False)
+    return frame
+
+def filter_rows(frame, condition):
+    """
+    Keeps the rows for which condition(frame) is True. The condition must return one boolean per row.
+    """
+    mask = condition(frame)
+    if isinstance(mask, pd.DataFrame) or np.ndim(mask) != 1:
+        raise ValueError("A columnar filter condition must return one boolean per row.")
+    return frame[np.asarray(mask, dtype=bool)]
+
+def map_columns(frame, function, mode='auto', chunk_size=None, copy=True):
+    """
+    Applies a function to every numeric column using the fastest path the function supports.
+
+    Returns:
+    - tuple: The mapped DataFrame and the paths taken, one per numeric column.
+    """
+    frame = _writable(frame, copy)
+    paths = {}
+    for column in numeric_columns(frame):
+        frame[column], paths[column] = apply_map(frame[column].to_numpy(), function, mode, chunk_size)
+    return frame, paths
+
+def handle_missing_columns(frame, strategy='mean', copy=True):
+    """
+    Fills missing values column by column. 'mean' and 'median' apply to numeric columns only;
+    'mode' and 'constant' apply to every column.
+    """
+    if strategy in ('mean', 'median'):
+        frame = _writable(frame, copy)
+        columns = numeric_columns(frame)
+        frame[columns] = handle_missing_values(frame[columns], strategy)
+        return frame
+    return handle_missing_values(frame, strategy, copy=copy)
+
+def encode_columns(frame, encoding_type='onehot'):
+    """
+    Encodes the non-numeric columns, leaving numeric columns with their dtypes.
+    """
+    categorical = frame.columns.difference(numeric_columns(frame), sort=False)
+    if encoding_type == 'onehot':
+        return pd.get_dummies(frame, columns=list(categorical))
+    if encoding_type == 'label':
+        frame = frame.copy()
+        for column in categorical:
+            frame[column] = frame[column].astype('category').cat.codes
+        return frame
+    raise ValueError("Unsupported encoding type. Choose from 'onehot' or 'label'.")
+
+def aggregate_columns(frame, operation):
+    """
+    Aggregates every numeric column, returning a one-row DataFrame.
+    """
+    columns = numeric_columns(frame)
+    return pd.DataFrame({column: [aggregate(frame[column].to_numpy(), operation)] for column in columns})
+
+def summarize_columns(frame):
+    """
+    Generates summary statistics for every numeric column, one column per input column and one
+    row per statistic.
+    """
+    columns = numeric_columns(frame)
+    # One fused pass over the numeric block instead of one summary call per column.
+    stats = summary(frame[columns].to_numpy(), axis=0)
+    return pd.DataFrame(stats, index=columns).T
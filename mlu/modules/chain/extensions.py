@@ -18,18 +18,24 @@ def custom_map(chain_instance, function):
 __all__ = ['custom_map']
 """
 
-import numpy as np
 import logging
 from functools import wraps
 from .chain import Chain
+from .mapping import apply_map
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def extend_chain(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
+        # Custom functions work on chain_instance.data directly, so a pending lazy plan runs first.
+        if args and isinstance(args[0], Chain) and args[0].lazy:
+            args[0]._execute_plan()
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
+            if args and isinstance(args[0], Chain):
+                args[0]._cache_key = None
+            return result
         except Exception as e:
             logging.error(f"An error occurred in {func.__name__}: {e}", exc_info=True)
             raise
@@ -37,9 +43,9 @@ def extend_chain(func):
     return wrapper
 
 @extend_chain
-def custom_map(chain_instance, function):
-    chain_instance.data = np.array(list(map(function, chain_instance.data)))
-    logging.info("Custom map operation completed successfully.")
+def custom_map(chain_instance, function, mode='auto', chunk_size=None):
+    chain_instance.data, chain_instance.map_path = apply_map(chain_instance.data, function, mode, chunk_size)
+    logging.info(f"Custom map operation completed successfully using the {chain_instance.map_path} path.")
     return chain_instance
 
 __all__ = ['custom_map']  # Add the names of your custom chainable functions here to make them available for import.
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Multi-core execution of fused Chain steps over shared memory.
+
+The input array is copied once into a multiprocessing.shared_memory block and split into
+contiguous shards, one per worker. Workers attach to the block by name, so no shard is ever
+pickled; each worker applies the element-wise steps to its shard and writes the result into a
+shared memory block of its own, returning only the block name, shape and min/max through the
+pipe. A normalize step is handled like in plan.run_fused: the per-shard min/max are merged in
+the parent and the scaling is applied by the workers in the next pass.
+
+Worker processes are started with the 'fork' method where available, so filter conditions and
+map functions (including lambdas) are inherited rather than pickled. On platforms without fork
+they have to be picklable.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import logging
+from .plan import DEFAULT_BLOCK_SIZE, apply_steps, split_segments
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_WORKER_SEGMENTS = None
+_WORKER_BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+
+def _init_worker(segments, block_size):
+    global _WORKER_SEGMENTS, _WORKER_BLOCK_SIZE
+    _WORKER_SEGMENTS = segments
+    _WORKER_BLOCK_SIZE = block_size
+
+def _attach(descriptor):
+    name, dtype, shape, start, stop = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)[start:stop]
+    return block, array
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    return block
+
+def _run_shard(descriptor, segment_index, scale):
+    """
+    Applies one segment of steps to a shard and writes the result to a new shared memory block.
+    """
+    steps, normalize_after = _WORKER_SEGMENTS[segment_index]
+    block, shard = _attach(descriptor)
+    map_modes = {}
+    try:
+        parts = []
+        for start in range(0, len(shard), _WORKER_BLOCK_SIZE):
+            part = shard[start:start + _WORKER_BLOCK_SIZE]
+            if scale is not None:
+                part = (part - scale[0]) / scale[1]
+            part = apply_steps(part, steps, map_modes)
+            if len(part):
+                parts.append(part)
+        # Parts may still be views of the shard, so they are copied out before the block is closed.
+        result = np.concatenate(parts) if parts else None
+        del parts
+    finally:
+        del shard
+        block.close()
+    if result is None:
+        return None, None, None
+    out = _share(result)
+    out.close()
+    min_max = (np.min(result), np.max(result)) if normalize_after else None
+    paths = [map_modes.get(id(node)) for node in steps if node.name == 'map']
+    return (out.name, result.dtype.str, result.shape, 0, len(result)), min_max, paths
+
+def _release(descriptors):
+    for descriptor in descriptors:
+        block = shared_memory.SharedMemory(name=descriptor[0])
+        block.close()
+        block.unlink()
+
+def _context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def run_parallel(data, nodes, workers, block_size=DEFAULT_BLOCK_SIZE, map_paths=None):
+    """
+    Runs a fused run of element-wise steps on a process pool.
+
+    Parameters:
+    - data (numpy.ndarray): The input array.
+    - nodes (list of PlanNode): Adjacent filter, map and normalize nodes.
+    - workers (int): Number of worker processes (and shards).
+    - block_size (int): Number of rows each worker processes per block.
+    - map_paths (list, optional): If given, the path taken by each map node is appended to it.
+
+    Returns:
+    - numpy.ndarray: The result of applying all steps, equivalent to running them eagerly.
+    """
+    segments = split_segments(nodes)
+    if segments[-1][1]:
+        # A trailing normalize needs one more pass to apply the merged min/max.
+        segments.append(([], False))
+    data = np.ascontiguousarray(data)
+    source = _share(data)
+    bounds = np.linspace(0, len(data), workers + 1).astype(int)
+    shards = [(source.name, data.dtype.str, data.shape, start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    owned = []
+    paths = []
+    scale = None
+    try:
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=_context(), initializer=_init_worker, initargs=(segments, block_size)) as pool:
+            for index, (steps, normalize_after) in enumerate(segments):
+                results = list(pool.map(_run_shard, shards, [index] * len(shards), [scale] * len(shards)))
+                _release(owned)
+                shards = [descriptor for descriptor, _, _ in results if descriptor is not None]
+                owned = list(shards)
+                paths.append(next((p for _, _, p in results if p), []))
+                if normalize_after:
+                    bounds_found = [min_max for _, min_max, _ in results if min_max is not None]
+                    if not bounds_found:
+                        # Reproduce the error raised by the eager normalize on an empty array.
+                        np.min(np.empty(0))
+                    min_val = np.min([b[0] for b in bounds_found])
+                    max_val = np.max([b[1] for b in bounds_found])
+                    scale = (min_val, max_val - min_val)
+                else:
+                    scale = None
+                if not shards:
+                    break
+        if shards:
+            first = shards[0]
+            rows = sum(stop - start for _, _, _, start, stop in shards)
+            result = np.empty((rows,) + tuple(first[2][1:]), dtype=np.result_type(*[np.dtype(d[1]) for d in shards]))
+            pos = 0
+            for descriptor in shards:
+                block, shard = _attach(descriptor)
+                result[pos:pos + len(shard)] = shard
+                pos += len(shard)
+                del shard
+                block.close()
+        else:
+            result = apply_steps(data[:0], [node for node in nodes if node.name != 'normalize'], {})
+    finally:
+        _release(owned)
+        source.close()
+        source.unlink()
+    if map_paths is not None:
+        map_paths.extend(path for segment_paths in paths for path in segment_paths)
+    logging.info(f"Ran {len(nodes)} element-wise steps on {len(bounds) - 1} worker processes.")
+    return result
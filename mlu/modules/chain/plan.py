@@ -0,0 +1,170 @@
+"""
+Execution plan support for the lazy mode of the Chain class.
+
+In lazy mode every Chain method only records a PlanNode. When the plan is run,
+adjacent element-wise steps (filter, map and normalize) are grouped into a single
+fused stage that walks the data in fixed-size blocks and writes into one output
+buffer, instead of materializing a full intermediate array after every step.
+
+Fused steps are applied block by block along the first axis, so filter conditions
+and map functions must be element-wise (or row-wise): a condition such as
+`lambda x: x > x.mean()` depends on the whole array and gives different results
+when it only sees one block at a time.
+"""
+
+from collections import namedtuple
+import numpy as np
+import logging
+from .mapping import apply_map, resolve_map_mode
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_BLOCK_SIZE = 65536
+
+FUSABLE_STEPS = ('filter', 'map', 'normalize')
+
+PlanNode = namedtuple('PlanNode', ['name', 'params'])
+
+def is_fusable(node):
+    """
+    Returns True if the plan node is an element-wise step that can take part in a fused stage.
+    """
+    return node.name in FUSABLE_STEPS
+
+def group_plan(plan):
+    """
+    Groups a plan into stages.
+
+    Parameters:
+    - plan (list of PlanNode): The recorded plan.
+
+    Returns:
+    - list of tuple: Each stage is ('fused', [nodes]) for a run of adjacent element-wise
+      steps, or ('step', [node]) for a step that has to run on its own.
+    """
+    stages = []
+    for node in plan:
+        if is_fusable(node):
+            if stages and stages[-1][0] == 'fused':
+                stages[-1][1].append(node)
+            else:
+                stages.append(('fused', [node]))
+        else:
+            stages.append(('step', [node]))
+    return stages
+
+def split_segments(nodes):
+    """
+    Splits a fused run at every normalize step. Each segment is a list of filter/map nodes
+    followed by an optional normalize, which needs the global min/max of the segment output.
+    """
+    segments = []
+    current = []
+    for node in nodes:
+        if node.name == 'normalize':
+            segments.append((current, True))
+            current = []
+        else:
+            current.append(node)
+    if current or not segments:
+        segments.append((current, False))
+    return segments
+
+def apply_steps(block, nodes, map_modes):
+    """
+    Applies filter and map nodes to one block. map_modes caches the resolved mode of each map node.
+    """
+    for node in nodes:
+        if node.name == 'filter':
+            block = block[node.params['condition'](block)]
+        elif node.name == 'map':
+            params = node.params
+            mode = map_modes.get(id(node))
+            if mode is None and len(block):
+                # Resolve 'auto' once per node on the first non-empty block instead of probing every block.
+                mode = resolve_map_mode(block, params['function'], params.get('mode', 'auto'), params.get('chunk_size'))
+                map_modes[id(node)] = mode
+            block, _ = apply_map(block, params['function'], mode or 'elementwise', params.get('chunk_size'))
+    return block
+
+def _write_block(out, pos, block, capacity):
+    """
+    Writes a block into the output buffer at the given position, allocating the buffer on
+    the first block and promoting its dtype if a later block does not fit.
+    """
+    if out is None or (pos == 0 and (out.shape[1:] != block.shape[1:] or out.dtype != block.dtype)):
+        return np.empty((capacity,) + block.shape[1:], dtype=block.dtype)
+    if out.shape[1:] != block.shape[1:]:
+        raise ValueError(f"Fused steps produced blocks of inconsistent shape: {out.shape[1:]} and {block.shape[1:]}.")
+    if not np.can_cast(block.dtype, out.dtype, casting='same_kind'):
+        promoted = np.empty(out.shape, dtype=np.result_type(out.dtype, block.dtype))
+        promoted[:pos] = out[:pos]
+        return promoted
+    return out
+
+def run_fused(data, nodes, block_size=DEFAULT_BLOCK_SIZE, map_paths=None, out=None):
+    """
+    Runs a fused run of element-wise steps over the data in blocks.
+
+    Parameters:
+    - data (numpy.ndarray): The input array.
+    - nodes (list of PlanNode): Adjacent filter, map and normalize nodes.
+    - block_size (int): Number of rows processed per block.
+    - map_paths (list, optional): If given, the path taken by each map node is appended to it.
+    - out (numpy.ndarray, optional): A buffer with as many rows as data to write the result into.
+      It may be data itself. If the result does not fit its dtype or row shape, a new buffer is
+      allocated instead.
+
+    Returns:
+    - numpy.ndarray: The result of applying all steps, equivalent to running them eagerly.
+    """
+    segments = split_segments(nodes)
+    map_modes = {}
+    source = data
+    length = len(source)
+    initial = out
+    out = None
+    scale = None
+    for steps, normalize_after in segments:
+        # The first segment reads from the input; later segments rewrite the output buffer
+        # in place. Filters only shrink blocks, so the write position never passes the read position.
+        pending = scale
+        target = initial if out is None else out
+        pos = 0
+        min_val = None
+        max_val = None
+        for start in range(0, length, block_size):
+            block = source[start:start + block_size]
+            if pending is not None:
+                block = (block - pending[0]) / pending[1]
+            block = apply_steps(block, steps, map_modes)
+            if not len(block):
+                continue
+            target = _write_block(target, pos, block, length)
+            target[pos:pos + len(block)] = block
+            pos += len(block)
+            if normalize_after:
+                min_val = np.min(block) if min_val is None else np.minimum(min_val, np.min(block))
+                max_val = np.max(block) if max_val is None else np.maximum(max_val, np.max(block))
+        if target is None:
+            target = apply_steps(source[:0], steps, map_modes)
+        out = target[:pos]
+        if normalize_after:
+            if min_val is None:
+                # Reproduce the error raised by the eager normalize on an empty array.
+                np.min(out)
+            scale = (min_val, max_val - min_val)
+        source = out
+        length = pos
+    if segments[-1][1]:
+        # The last normalize has nothing after it to fuse with, so apply it in one pass.
+        min_val, value_range = scale
+        if np.issubdtype(out.dtype, np.floating):
+            np.subtract(out, min_val, out=out)
+            np.divide(out, value_range, out=out)
+        else:
+            out = (out - min_val) / value_range
+    if map_paths is not None:
+        map_paths.extend(map_modes.get(id(node), 'elementwise') for node in nodes if node.name == 'map')
+    logging.info(f"Fused {len(nodes)} element-wise steps into {len(segments)} pass(es).")
+    return out
@@ -0,0 +1,121 @@
+"""
+Per-step profiling and plan descriptions for the Chain class.
+
+StepProfile measures one executed stage of a chain: wall time, CPU time, the shape and dtype of
+its input and output, the bytes allocated while it ran (from tracemalloc) and whether it was
+fused or served from the cache. describe_plan renders a recorded plan before it runs.
+"""
+
+import time
+import tracemalloc
+import pandas as pd
+import logging
+from .plan import group_plan, split_segments
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PROFILE_COLUMNS = ['step', 'wall_time', 'cpu_time', 'input_shape', 'input_dtype', 'output_shape', 'output_dtype', 'bytes_allocated', 'fused', 'cached']
+
+def _shape_and_dtype(data):
+    shape = getattr(data, 'shape', None)
+    dtype = getattr(data, 'dtype', None)
+    if dtype is None and hasattr(data, 'dtypes'):
+        # DataFrames report one dtype per column.
+        dtype = ','.join(sorted({str(d) for d in data.dtypes}))
+    return shape, None if dtype is None else str(dtype)
+
+class StepProfile:
+    """
+    Context manager that profiles one stage of a chain.
+
+    Parameters:
+    - step (str): Name of the stage, e.g. 'normalize' or 'filter+map'.
+    - data: The input of the stage.
+    - fused (bool): Whether the stage ran as a fused pass.
+    - cached (bool): Whether the stage was served from the cache.
+
+    After the block exits, call finish(output) to get the profile record.
+    """
+    def __init__(self, step, data, fused=False, cached=False):
+        self.step = step
+        self.fused = fused
+        self.cached = cached
+        self.input_shape, self.input_dtype = _shape_and_dtype(data)
+
+    def __enter__(self):
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.wall_time = time.perf_counter() - self._wall
+        self.cpu_time = time.process_time() - self._cpu
+        self.bytes_allocated = max(tracemalloc.get_traced_memory()[1] - self._baseline, 0)
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def finish(self, output):
+        """
+        Returns the profile record of the stage as a dict with the keys in PROFILE_COLUMNS.
+        """
+        output_shape, output_dtype = _shape_and_dtype(output)
+        return {
+            'step': self.step,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'input_shape': self.input_shape,
+            'input_dtype': self.input_dtype,
+            'output_shape': output_shape,
+            'output_dtype': output_dtype,
+            'bytes_allocated': self.bytes_allocated,
+            'fused': self.fused,
+            'cached': self.cached
+        }
+
+def _describe_node(node):
+    params = ', '.join(f"{key}={getattr(value, '__name__', repr(value))}" for key, value in node.params.items() if value is not None)
+    return f"{node.name}({params})"
+
+def describe_plan(plan, streamed=False, parallel=None, cached_stages=()):
+    """
+    Describes how a recorded plan will be executed.
+
+    Parameters:
+    - plan (list of PlanNode): The recorded plan.
+    - streamed (bool): Whether the chain streams its data from a chunk source.
+    - parallel (int, optional): Number of worker processes for fused stages.
+    - cached_stages (collection of int): Indices of stages whose result is already cached.
+
+    Returns:
+    - str: One line per stage.
+    """
+    mode = 'streamed' if streamed else 'in memory'
+    lines = [f"Execution plan ({len(plan)} step(s), {mode}):"]
+    if not plan:
+        lines.append("  (empty)")
+    for index, (kind, nodes) in enumerate(group_plan(plan)):
+        steps = ' -> '.join(_describe_node(node) for node in nodes)
+        if kind == 'fused':
+            passes = len(split_segments(nodes)) + (1 if nodes[-1].name == 'normalize' else 0)
+            detail = f"fused, {passes} pass(es)" if not streamed else "per chunk"
+            if parallel and parallel > 1 and not streamed:
+                detail += f" on {parallel} workers"
+            line = f"  {index + 1}. [{steps}] ({detail})"
+        else:
+            line = f"  {index + 1}. {steps}"
+        if index in cached_stages:
+            line += " [cached]"
+        lines.append(line)
+    return '\n'.join(lines)
+
+def summarize_profile(records):
+    """
+    Returns the profile records as a pandas DataFrame with one row per stage.
+    """
+    return pd.DataFrame(records, columns=PROFILE_COLUMNS)
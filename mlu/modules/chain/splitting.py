@@ -0,0 +1,165 @@
+"""
+Index-based train/test splits and cross-validation folds for the Chain class.
+
+A split stores only the row indices of each side. The features and labels are views of the
+chain's data (the last column is the label), and X_train, X_test, y_train and y_test are
+sliced from them when they are read: contiguous index runs become slice views, anything else
+is fancy-indexed on demand, so the full matrix is never copied into four new arrays up front.
+Fold indices are cached by their parameters (the FOLD_CACHE_SIZE most recent settings) so
+repeated cross-validation over the same data reuses them.
+"""
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import logging
+from sklearn.model_selection import ShuffleSplit, StratifiedShuffleSplit, GroupShuffleSplit, KFold, StratifiedKFold
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FOLD_CACHE_SIZE = 32
+
+_FOLD_CACHE = OrderedDict()
+
+def _take(data, index):
+    # A sorted run of consecutive rows is served as a slice, which is a view of the data.
+    if len(index) and index[-1] - index[0] == len(index) - 1 and np.all(np.diff(index) == 1):
+        rows = slice(int(index[0]), int(index[-1]) + 1)
+    else:
+        rows = index
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.iloc[rows]
+    return data[rows]
+
+class IndexSplit:
+    """
+    One train/test split held as index arrays.
+
+    Parameters:
+    - X (array-like): The features. Only a reference is kept.
+    - y (array-like): The labels. Only a reference is kept.
+    - train_index (numpy.ndarray): Row indices of the training set.
+    - test_index (numpy.ndarray): Row indices of the test set.
+    """
+    def __init__(self, X, y, train_index, test_index):
+        self.X = X
+        self.y = y
+        self.train_index = np.asarray(train_index)
+        self.test_index = np.asarray(test_index)
+
+    @property
+    def X_train(self):
+        return _take(self.X, self.train_index)
+
+    @property
+    def X_test(self):
+        return _take(self.X, self.test_index)
+
+    @property
+    def y_train(self):
+        return _take(self.y, self.train_index)
+
+    @property
+    def y_test(self):
+        return _take(self.y, self.test_index)
+
+def features_and_labels(data):
+    """
+    Splits data into features (all columns but the last) and labels (the last column) without copying.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.iloc[:, :-1], data.iloc[:, -1]
+    return data[:, :-1], data[:, -1]
+
+def split_indices(n_samples, test_size=0.2, random_state=42, shuffle=True, stratify=None, groups=None):
+    """
+    Computes the row indices of a single train/test split.
+
+    Parameters:
+    - n_samples (int): Number of rows.
+    - test_size (float or int): Fraction or number of rows in the test set.
+    - random_state (int, optional): Random seed.
+    - shuffle (bool): If False, the last rows form the test set, so both sides are contiguous
+      and are served as views.
+    - stratify (array-like, optional): Labels whose class proportions are kept in both sets.
+    - groups (array-like, optional): Group labels; all rows of a group land on the same side.
+
+    Returns:
+    - tuple: The sorted train indices and the sorted test indices.
+    """
+    if stratify is not None and groups is not None:
+        raise ValueError("A split can be stratified or grouped, not both.")
+    placeholder = np.empty((n_samples, 0))
+    if groups is not None:
+        splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+        train, test = next(splitter.split(placeholder, groups=np.asarray(groups)))
+    elif stratify is not None:
+        splitter = StratifiedShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+        train, test = next(splitter.split(placeholder, np.asarray(stratify)))
+    elif shuffle:
+        train, test = next(ShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state).split(placeholder))
+    else:
+        n_test = int(np.ceil(test_size * n_samples)) if isinstance(test_size, float) else int(test_size)
+        return np.arange(n_samples - n_test), np.arange(n_samples - n_test, n_samples)
+    return np.sort(train), np.sort(test)
+
+def _group_folds(groups, n_splits, rng=None):
+    unique, inverse = np.unique(np.asarray(groups), return_inverse=True)
+    if len(unique) < n_splits:
+        raise ValueError(f"Cannot have n_splits={n_splits} greater than the number of groups ({len(unique)}).")
+    fold_of_group = np.empty(len(unique), dtype=np.int64)
+    # Without an rng the groups are assigned in sorted order, so unshuffled folds are the same on every call.
+    order = np.arange(len(unique)) if rng is None else rng.permutation(len(unique))
+    for fold, members in enumerate(np.array_split(order, n_splits)):
+        fold_of_group[members] = fold
+    fold_of_row = fold_of_group[inverse]
+    rows = np.arange(len(fold_of_row))
+    return [(rows[fold_of_row != fold], rows[fold_of_row == fold]) for fold in range(n_splits)]
+
+def _key_of(values):
+    if values is None:
+        return None
+    return hashlib.blake2b(np.ascontiguousarray(np.asarray(values)).tobytes(), digest_size=16).hexdigest()
+
+def fold_indices(n_samples, n_splits=5, n_repeats=1, random_state=42, shuffle=True, stratify=None, groups=None):
+    """
+    Computes (and caches) the row indices of repeated K-fold cross-validation.
+
+    Parameters:
+    - n_samples (int): Number of rows.
+    - n_splits (int): Number of folds per repeat.
+    - n_repeats (int): Number of times the K-fold split is repeated with a different shuffle.
+    - random_state (int, optional): Random seed.
+    - shuffle (bool): If False (and n_repeats is 1), every test fold is a contiguous run of rows.
+    - stratify (array-like, optional): Labels whose class proportions are kept in every fold.
+    - groups (array-like, optional): Group labels; each group is held out in exactly one fold per repeat.
+
+    Returns:
+    - list of tuple: (train indices, test indices) for every fold of every repeat.
+    """
+    if stratify is not None and groups is not None:
+        raise ValueError("Folds can be stratified or grouped, not both.")
+    if n_repeats > 1 and not shuffle:
+        raise ValueError("Repeated K-fold needs shuffle=True, otherwise every repeat is identical.")
+    key = (n_samples, n_splits, n_repeats, random_state, shuffle, _key_of(stratify), _key_of(groups))
+    if key in _FOLD_CACHE:
+        _FOLD_CACHE.move_to_end(key)
+        return _FOLD_CACHE[key]
+    rng = np.random.RandomState(random_state)
+    placeholder = np.empty((n_samples, 0))
+    folds = []
+    for _ in range(n_repeats):
+        seed = rng.randint(np.iinfo(np.int32).max) if shuffle else None
+        if groups is not None:
+            folds.extend(_group_folds(groups, n_splits, np.random.RandomState(seed) if shuffle else None))
+        elif stratify is not None:
+            folds.extend(StratifiedKFold(n_splits=n_splits, shuffle=shuffle, random_state=seed).split(placeholder, np.asarray(stratify)))
+        else:
+            folds.extend(KFold(n_splits=n_splits, shuffle=shuffle, random_state=seed).split(placeholder))
+    folds = [(np.sort(train), np.sort(test)) for train, test in folds]
+    _FOLD_CACHE[key] = folds
+    if len(_FOLD_CACHE) > FOLD_CACHE_SIZE:
+        _FOLD_CACHE.popitem(last=False)
+    logging.info(f"Computed {len(folds)} folds ({n_splits} splits x {n_repeats} repeats).")
+    return folds
@@ -0,0 +1,278 @@
+"""
+Out-of-core execution of Chain plans over memory-mapped arrays, .npy files and chunk iterators.
+
+A streamed plan never holds the whole dataset in memory. Filter and map steps are applied
+chunk by chunk, normalize makes one pass to merge the per-chunk min/max before it is applied,
+and aggregate and summary are computed from per-chunk partial results that are merged across
+chunks. Steps that need more than one pass re-read the source; a one-shot iterator is spilled
+to a temporary file on its first pass so it can be read again, but only when the plan has such
+a step.
+"""
+
+import os
+import tempfile
+import numpy as np
+import logging
+from .plan import DEFAULT_BLOCK_SIZE, apply_steps
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+STREAMABLE_STEPS = ('filter', 'map', 'normalize', 'aggregate', 'summary')
+
+QUANTILE_BINS = 4096
+
+class ChunkSource:
+    """
+    A re-iterable source of array chunks.
+
+    Parameters:
+    - source (numpy.ndarray, numpy.memmap, str or iterable): An in-memory or memory-mapped array,
+      the path of a .npy file (opened with mmap_mode='r'), or an iterable of array chunks.
+    - chunk_size (int): Number of rows per chunk when slicing arrays.
+    - spill (bool): Whether a chunk iterator is written to a temporary file on its first pass so
+      that it can be read again. run_streaming turns this off for plans that read the source once.
+    """
+    def __init__(self, source, chunk_size=DEFAULT_BLOCK_SIZE, spill=True):
+        if isinstance(source, (str, os.PathLike)):
+            source = np.load(source, mmap_mode='r')
+        self.chunk_size = chunk_size
+        self.spill = spill
+        self._array = source if isinstance(source, np.ndarray) else None
+        self._iterator = None if self._array is not None else iter(source)
+        self._spill_path = None
+
+    def __iter__(self):
+        if self._array is not None:
+            for start in range(0, len(self._array), self.chunk_size):
+                yield np.asarray(self._array[start:start + self.chunk_size])
+        elif self._iterator is not None and not self.spill:
+            iterator, self._iterator = self._iterator, None
+            for chunk in iterator:
+                yield np.asarray(chunk)
+        elif self._iterator is not None:
+            yield from self._spill()
+        else:
+            raise RuntimeError("The chunk iterator was consumed without being fully spilled.")
+
+    def _spill(self):
+        # Tee the one-shot iterator into a temporary file, then serve later passes from a memmap.
+        iterator, self._iterator = self._iterator, None
+        handle = tempfile.NamedTemporaryFile(prefix='mlu_chain_', suffix='.bin', delete=False)
+        self._spill_path = handle.name
+        dtype = None
+        row_shape = ()
+        rows = 0
+        with handle:
+            for chunk in iterator:
+                chunk = np.asarray(chunk)
+                if dtype is None:
+                    dtype, row_shape = chunk.dtype, chunk.shape[1:]
+                elif chunk.dtype != dtype:
+                    chunk = chunk.astype(dtype)
+                handle.write(np.ascontiguousarray(chunk).tobytes())
+                rows += len(chunk)
+                yield chunk
+        if rows:
+            self._array = np.memmap(handle.name, dtype=dtype, mode='r', shape=(rows,) + row_shape)
+        else:
+            self._array = np.empty((0,) + row_shape, dtype=dtype or float)
+        logging.info(f"Chunk iterator spilled to {handle.name} for multi-pass steps.")
+
+    def close(self):
+        """
+        Removes the spill file, if one was written. Array and .npy sources stay readable.
+        """
+        if self._spill_path is None:
+            return
+        self._array = None
+        if os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+        self._spill_path = None
+
+class _Stream:
+    """
+    A re-iterable view of a source with element-wise steps applied to every chunk.
+    """
+    def __init__(self, upstream, steps=(), scale=None, map_modes=None):
+        self.upstream = upstream
+        self.steps = list(steps)
+        self.scale = scale
+        self.map_modes = {} if map_modes is None else map_modes
+
+    def __iter__(self):
+        for chunk in self.upstream:
+            if self.scale is not None:
+                chunk = (chunk - self.scale[0]) / self.scale[1]
+            chunk = apply_steps(chunk, self.steps, self.map_modes)
+            if len(chunk):
+                yield chunk
+
+def _merge_min_max(stream):
+    min_val = None
+    max_val = None
+    for chunk in stream:
+        chunk_min = np.min(chunk)
+        chunk_max = np.max(chunk)
+        min_val = chunk_min if min_val is None else np.minimum(min_val, chunk_min)
+        max_val = chunk_max if max_val is None else np.maximum(max_val, chunk_max)
+    if min_val is None:
+        raise ValueError("zero-size array to reduction operation minimum which has no identity")
+    return min_val, max_val
+
+def _merge_moments(stream):
+    """
+    Merges count, mean, sum of squared deviations, min and max across chunks (Chan et al.).
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    total = 0
+    min_val = None
+    max_val = None
+    for chunk in stream:
+        values = chunk.ravel()
+        n = values.size
+        chunk_sum = np.sum(values)
+        chunk_mean = chunk_sum / n
+        chunk_m2 = np.sum((values - chunk_mean) ** 2)
+        delta = chunk_mean - mean
+        new_count = count + n
+        mean = mean + delta * n / new_count
+        m2 = m2 + chunk_m2 + delta ** 2 * count * n / new_count
+        count = new_count
+        total = total + chunk_sum
+        chunk_min = np.min(values)
+        chunk_max = np.max(values)
+        min_val = chunk_min if min_val is None else np.minimum(min_val, chunk_min)
+        max_val = chunk_max if max_val is None else np.maximum(max_val, chunk_max)
+    return {'count': count, 'sum': total, 'mean': mean, 'm2': m2, 'min': min_val, 'max': max_val}
+
+def _bin_index(values, min_val, width):
+    index = ((values - min_val) / width * QUANTILE_BINS).astype(np.int64)
+    return np.clip(index, 0, QUANTILE_BINS - 1)
+
+def stream_quantiles(stream, percentiles, count, min_val, max_val):
+    """
+    Computes exact percentiles (numpy's linear interpolation) of a stream in two passes.
+
+    The first pass builds a histogram between min_val and max_val; the second collects only
+    the values in the bins that contain the needed order statistics and selects them exactly.
+    Memory use is bounded by the size of those bins, not by the size of the stream.
+    """
+    if count == 0:
+        raise ValueError("Cannot compute percentiles of an empty stream.")
+    if np.isnan(min_val) or np.isnan(max_val):
+        return [np.nan for _ in percentiles]
+    if min_val == max_val:
+        return [min_val * 1.0 for _ in percentiles]
+    positions = [q / 100.0 * (count - 1) for q in percentiles]
+    ranks = sorted({int(np.floor(p)) for p in positions} | {int(np.ceil(p)) for p in positions})
+    width = max_val - min_val
+    histogram = np.zeros(QUANTILE_BINS, dtype=np.int64)
+    for chunk in stream:
+        histogram += np.bincount(_bin_index(chunk.ravel(), min_val, width), minlength=QUANTILE_BINS)
+    cumulative = np.cumsum(histogram)
+    rank_bins = {rank: int(np.searchsorted(cumulative, rank, side='right')) for rank in ranks}
+    needed = sorted(set(rank_bins.values()))
+    collected = {b: [] for b in needed}
+    for chunk in stream:
+        values = chunk.ravel()
+        index = _bin_index(values, min_val, width)
+        for b in needed:
+            collected[b].append(values[index == b])
+    ordered = {b: np.sort(np.concatenate(parts)) for b, parts in collected.items()}
+    order_stats = {}
+    for rank, b in rank_bins.items():
+        before = cumulative[b - 1] if b > 0 else 0
+        order_stats[rank] = ordered[b][rank - before]
+    results = []
+    for p in positions:
+        lo, hi = int(np.floor(p)), int(np.ceil(p))
+        results.append(order_stats[lo] + (order_stats[hi] - order_stats[lo]) * (p - lo))
+    return results
+
+def stream_aggregate(stream, operation):
+    """
+    Applies an aggregation operation ('sum', 'mean', 'max', 'min') across all chunks.
+    """
+    if operation not in ('sum', 'mean', 'max', 'min'):
+        raise ValueError("Unsupported operation. Choose from 'sum', 'mean', 'max', 'min'.")
+    if operation in ('max', 'min'):
+        min_val, max_val = _merge_min_max(stream)
+        return max_val if operation == 'max' else min_val
+    moments = _merge_moments(stream)
+    if operation == 'sum':
+        return moments['sum']
+    return moments['sum'] / moments['count'] if moments['count'] else np.nan
+
+def stream_summary(stream):
+    """
+    Generates the same statistics as array_manipulation.summary across all chunks.
+    """
+    moments = _merge_moments(stream)
+    if moments['count'] == 0:
+        raise ValueError("zero-size array to reduction operation minimum which has no identity")
+    q25, q50, q75 = stream_quantiles(stream, [25, 50, 75], moments['count'], moments['min'], moments['max'])
+    return {
+        "count": moments['count'],
+        "mean": moments['mean'],
+        "std": np.sqrt(moments['m2'] / moments['count']),
+        "min": moments['min'],
+        "max": moments['max'],
+        "25%": q25,
+        "50%": q50,
+        "75%": q75
+    }
+
+def _passes(plan):
+    """
+    Returns the number of times the streamed prefix of the plan reads its source.
+    """
+    passes = 1
+    for node in plan:
+        if node.name == 'normalize':
+            passes += 1
+        elif node.name == 'summary':
+            # Moments, then the histogram and selection passes of stream_quantiles.
+            return passes + 2
+        elif node.name == 'aggregate' or node.name not in STREAMABLE_STEPS:
+            break
+    return passes
+
+def run_streaming(source, plan, map_modes=None):
+    """
+    Runs a plan over a chunk source.
+
+    Parameters:
+    - source (ChunkSource): The chunk source.
+    - plan (list of PlanNode): The recorded plan.
+    - map_modes (dict, optional): Resolved map modes, filled in as map nodes are first applied.
+
+    Returns:
+    - tuple: ('stream', stream, rest) if the plan ends in a stream of chunks or reaches a step
+      that only runs in memory, where rest are the plan nodes from that step on, or
+      ('value', result, rest) if the plan reaches aggregate or summary, where result is the
+      in-memory result of that step and rest are the plan nodes that follow it.
+    """
+    map_modes = {} if map_modes is None else map_modes
+    if isinstance(source, ChunkSource):
+        source.spill = _passes(plan) > 1
+    stream = _Stream(source, map_modes=map_modes)
+    for position, node in enumerate(plan):
+        if node.name not in STREAMABLE_STEPS:
+            # The caller materializes the stream and runs this step and the rest in memory.
+            return 'stream', stream, plan[position:]
+        if node.name in ('filter', 'map'):
+            stream.steps.append(node)
+        elif node.name == 'normalize':
+            min_val, max_val = _merge_min_max(stream)
+            stream = _Stream(stream, scale=(min_val, max_val - min_val), map_modes=map_modes)
+        elif node.name == 'aggregate':
+            result = stream_aggregate(stream, node.params['operation'])
+            return 'value', np.array([result]), plan[position + 1:]
+        elif node.name == 'summary':
+            result = stream_summary(stream)
+            for key, value in result.items():
+                logging.info(f"{key}: {value}")
+            return 'value', np.array([result]), plan[position + 1:]
+    return 'stream', stream, []
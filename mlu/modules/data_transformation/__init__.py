@@ -1 +1,5 @@
-from .data_transformation import handle_missing_values, normalize, encode_categorical, remove_low_variance_features, apply_pca, generate_polynomial_features
\ No newline at end of file
+from .data_transformation import handle_missing_values, normalize, encode_categorical, remove_low_variance_features, apply_pca, generate_polynomial_features
+from .transformers import MissingValueImputer, MinMaxNormalizer, PCAProjector
+from .encoding import CategoryEncoder, hash_encode
+from .selection import VarianceSelector, iter_row_chunks
+from .polynomial import polynomial_output_size, iter_polynomial_features
\ No newline at end of file
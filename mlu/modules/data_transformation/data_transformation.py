@@ -1,105 +1,355 @@
+import os
+import warnings
 import numpy as np
 import pandas as pd
-from sklearn.feature_selection import VarianceThreshold
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import PolynomialFeatures
+from sklearn.decomposition import PCA, IncrementalPCA
+from scipy import sparse
 import logging
+from .transformers import PCAProjector
+from .encoding import CategoryEncoder, hash_encode
+from .selection import VarianceSelector
+from .polynomial import polynomial_output_size, iter_polynomial_features
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def handle_missing_values(data, strategy='mean'):
+MISSING_VALUE_STRATEGIES = ('mean', 'median', 'mode', 'constant')
+
+def _column_mode(values):
+    # Sorted distinct values and a bincount of their positions; argmax picks the smallest of tied values.
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan
+    unique, inverse = np.unique(values, return_inverse=True)
+    return unique[np.bincount(inverse).argmax()]
+
+def _array_fill_values(array, strategies):
+    """
+    Computes the fill value of every column of a 2-D float array, batching the columns that share a strategy.
+    """
+    fill = np.zeros(array.shape[1])
+    for strategy in set(strategies):
+        columns = [j for j, name in enumerate(strategies) if name == strategy]
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            # All-NaN columns have no statistic; they stay NaN.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if strategy == 'mean':
+                fill[columns] = np.nanmean(array[:, columns], axis=0)
+            elif strategy == 'median':
+                fill[columns] = np.nanmedian(array[:, columns], axis=0)
+            elif strategy == 'mode':
+                fill[columns] = [_column_mode(array[:, j]) for j in columns]
+    return fill
+
+def _fill_array(data, strategy, copy):
+    array = np.asarray(data)
+    if not np.issubdtype(array.dtype, np.floating):
+        # Integer and boolean arrays cannot hold NaN, so there is nothing to fill.
+        return array.copy() if copy else array
+    result = array if not copy and array.flags.writeable else array.copy()
+    matrix = result.reshape(len(result), -1) if result.ndim > 1 else result.reshape(-1, 1)
+    if isinstance(strategy, dict):
+        unknown = set(strategy) - set(range(matrix.shape[1]))
+        if unknown:
+            raise ValueError(f"Strategy given for unknown column(s) {sorted(unknown)}.")
+        strategies = [strategy.get(j, 'mean') for j in range(matrix.shape[1])]
+    else:
+        strategies = [strategy] * matrix.shape[1]
+    mask = np.isnan(matrix)
+    if not mask.any():
+        return result
+    fill = _array_fill_values(matrix, strategies)
+    np.copyto(matrix, np.broadcast_to(fill, matrix.shape), where=mask)
+    return result
+
+def _fill_value(data, strategy):
+    if strategy == 'mean':
+        return data.mean()
+    if strategy == 'median':
+        return data.median()
+    if strategy == 'mode':
+        # mode() returns a DataFrame. Use iloc to get the first mode if exists.
+        return data.mode().iloc[0]
+    return 0  # Assuming 0 as the constant value for simplicity.
+
+def handle_missing_values(data, strategy='mean', copy=True):
+    """
+    Fills missing values in a DataFrame, Series or NumPy array.
+
+    NumPy arrays are imputed without a pandas round-trip: the statistics come from
+    np.nanmean/np.nanmedian over all columns that share a strategy (and a bincount of distinct
+    values for 'mode'), and the NaNs are filled with one np.copyto(where=mask).
+
+    Parameters:
+    - data (pandas.DataFrame, pandas.Series or numpy.ndarray): The input data. Arrays are imputed
+      per column (the first axis indexes rows).
+    - strategy (str or dict): 'mean', 'median', 'mode' or 'constant' (fills with 0), or a dict
+      mapping column labels (or column indices, for arrays) to strategies; columns not in the
+      dict use 'mean'.
+    - copy (bool): If False, the missing values are filled in place and data itself is returned.
+
+    Returns:
+    - pandas.DataFrame, pandas.Series or numpy.ndarray: The data with missing values filled.
+    """
     try:
-        if strategy == 'mean':
-            return data.fillna(data.mean())
-        elif strategy == 'median':
-            return data.fillna(data.median())
-        elif strategy == 'mode':
-            # mode() returns a DataFrame. Use iloc to get the first mode if exists.
-            return data.fillna(data.mode().iloc[0])
-        elif strategy == 'constant':
-            return data.fillna(0)  # Assuming 0 as the constant value for simplicity.
-        else:
+        strategies = strategy.values() if isinstance(strategy, dict) else [strategy]
+        if any(name not in MISSING_VALUE_STRATEGIES for name in strategies):
             raise ValueError("Unsupported strategy. Choose from 'mean', 'median', 'mode', or 'constant'.")
+        if not isinstance(data, (pd.DataFrame, pd.Series)):
+            return _fill_array(data, strategy, copy)
+        if isinstance(strategy, dict):
+            if isinstance(data, pd.Series):
+                raise ValueError("A per-column strategy needs a DataFrame.")
+            value = {column: _fill_value(data[column], strategy.get(column, 'mean')) for column in data.columns}
+        else:
+            value = _fill_value(data, strategy)
+        if not copy:
+            data.fillna(value, inplace=True)
+            return data
+        return data.fillna(value)
     except Exception as e:
         logging.error(f"An error occurred in handle_missing_values: {e}", exc_info=True)
         raise
 
-def normalize(array):
+def normalize(array, out=None, copy=True):
+    """
+    Scales an array to the [0, 1] range using its min and max.
+
+    Parameters:
+    - array (numpy.ndarray): The input array.
+    - out (numpy.ndarray, optional): A buffer of the same shape to write the result into. It may be
+      array itself.
+    - copy (bool): If False and array is a writeable floating-point array, it is normalized in
+      place. Integer arrays cannot hold the result and are always copied.
+
+    Returns:
+    - numpy.ndarray: The normalized array, with the dtype of the input for floating-point input.
+    """
     try:
         min_val = np.min(array)
         max_val = np.max(array)
-        return (array - min_val) / (max_val - min_val)
+        if out is None and not copy and isinstance(array, np.ndarray) and np.issubdtype(array.dtype, np.floating) and array.flags.writeable:
+            out = array
+        if out is None:
+            return (array - min_val) / (max_val - min_val)
+        np.subtract(array, min_val, out=out)
+        np.divide(out, max_val - min_val, out=out)
+        return out
     except Exception as e:
         logging.error(f"An error occurred in normalize: {e}", exc_info=True)
         raise
 
-def encode_categorical(data, encoding_type='onehot'):
+def encode_categorical(data, encoding_type='onehot', sparse_output=False, n_features=2 ** 20, encoder=None):
+    """
+    Encodes categorical data.
+
+    Parameters:
+    - data (pandas.DataFrame, pandas.Series or numpy.ndarray): The input data.
+    - encoding_type (str): 'onehot', 'label', or 'hash' for a fixed-width hashed sparse matrix.
+    - sparse_output (bool): If True, 'onehot' returns a scipy.sparse CSR matrix built from a fitted
+      CategoryEncoder instead of a dense pd.get_dummies frame.
+    - n_features (int): Output width of the 'hash' encoding.
+    - encoder (CategoryEncoder, optional): A fitted encoder to apply instead of learning the
+      categories from data; values it has not seen go to its unknown bucket.
+
+    Returns:
+    - pandas.DataFrame, pandas.Series, numpy.ndarray or scipy.sparse.csr_matrix: The encoded data.
+    """
     try:
+        if encoder is not None:
+            return encoder.transform(data)
         if encoding_type == 'onehot':
+            if sparse_output:
+                return CategoryEncoder('onehot').fit(data).transform(data)
             return pd.get_dummies(data)
         elif encoding_type == 'label':
+            if isinstance(data, pd.DataFrame):
+                codes = data.apply(lambda column: column.astype('category').cat.codes)
+                return codes.iloc[:, 0] if codes.shape[1] == 1 else codes
             return data.astype('category').cat.codes
+        elif encoding_type == 'hash':
+            return hash_encode(data, n_features)
         else:
-            raise ValueError("Unsupported encoding type. Choose from 'onehot' or 'label'.")
+            raise ValueError("Unsupported encoding type. Choose from 'onehot', 'label' or 'hash'.")
     except Exception as e:
         logging.error(f"An error occurred in encode_categorical: {e}", exc_info=True)
         raise
 
-def remove_low_variance_features(data, threshold=0.0):
+def remove_low_variance_features(data, threshold=0.0, chunk_size=65536, return_indices=False):
     """
     Removes features with low variance.
 
+    The variances are accumulated chunk by chunk in one sequential scan (see VarianceSelector),
+    so data can also be a memmap, a .npy or Parquet path or an iterator of chunks. NaN values are
+    ignored; columns without any other value are removed.
+
     Parameters:
-    - data (pandas.DataFrame): The input dataset.
+    - data (pandas.DataFrame, numpy.ndarray, scipy.sparse matrix, str or iterable): The input dataset.
     - threshold (float): Features with a variance lower than this threshold will be removed.
+    - chunk_size (int): Rows per chunk when scanning an in-memory or memory-mapped source.
+    - return_indices (bool): If True, return only the indices of the kept columns without touching
+      the data again. Sources that are not in memory always return the indices.
 
     Returns:
-    - pandas.DataFrame: The transformed dataset with low-variance features removed.
+    - pandas.DataFrame, numpy.ndarray or scipy.sparse matrix: The dataset with low-variance
+      features removed, or numpy.ndarray: the kept column indices.
     """
     try:
-        selector = VarianceThreshold(threshold=threshold)
-        data_transformed = selector.fit_transform(data)
-        return pd.DataFrame(data_transformed, columns=data.columns[selector.get_support()])
+        selector = VarianceSelector(threshold=threshold).fit(data, chunk_size)
+        if return_indices or not (isinstance(data, (pd.DataFrame, np.ndarray)) or sparse.issparse(data)):
+            return selector.kept_indices_
+        return selector.transform(data)
     except Exception as e:
         logging.error(f"An error occurred in remove_low_variance_features: {e}", exc_info=True)
         raise
 
-def apply_pca(data, n_components=None):
+PCA_MEMORY_BYTES = 1 << 30
+PCA_WIDE_FEATURES = 500
+
+def _pca_method(array, n_components, max_memory_bytes):
+    n_samples, n_features = array.shape
+    if isinstance(array, np.memmap) or array.nbytes > max_memory_bytes:
+        return 'incremental'
+    # A float (fraction of explained variance) or 'mle' n_components needs the exact solver.
+    is_count = isinstance(n_components, (int, np.integer)) and not isinstance(n_components, bool)
+    if n_features >= PCA_WIDE_FEATURES and is_count and n_components < 0.8 * min(n_samples, n_features):
+        return 'randomized'
+    return 'full'
+
+def apply_pca(data, n_components=None, method='auto', batch_size=None, max_memory_bytes=PCA_MEMORY_BYTES, random_state=None, return_projector=False):
     """
     Applies PCA for dimensionality reduction.
 
+    With method='auto' the solver is picked from the shape and size of the data: IncrementalPCA
+    over row chunks for memory-mapped data or data larger than max_memory_bytes, randomized SVD
+    for wide data when only a few components are kept, and an exact SVD otherwise.
+
     Parameters:
-    - data (pandas.DataFrame): The input dataset.
-    - n_components (int, optional): Number of components to keep.
+    - data (pandas.DataFrame, numpy.ndarray, numpy.memmap or str): The input dataset, or the path
+      of a .npy file, which is memory-mapped rather than loaded.
+    - n_components (int, float or str, optional): Number of components to keep. Defaults to all of
+      them (for incremental PCA, at most batch_size). A float between 0 and 1 (the fraction of
+      variance to explain) or 'mle' is passed to the exact solver.
+    - method (str): 'auto', 'full', 'randomized' or 'incremental'.
+    - batch_size (int, optional): Rows per chunk for incremental PCA. Defaults to the larger of
+      5 * n_features and the rows in 64 MiB.
+    - max_memory_bytes (int): Size above which 'auto' switches to incremental PCA.
+    - random_state (int, optional): Random seed of the randomized solver.
+    - return_projector (bool): If True, also return the fitted PCAProjector, which transforms new
+      batches without refitting.
 
     Returns:
     - pandas.DataFrame: The transformed dataset after applying PCA.
+    - PCAProjector: The fitted projector, if return_projector is True.
     """
     try:
-        pca = PCA(n_components=n_components)
-        data_transformed = pca.fit_transform(data)
-        components_col = [f"PCA_Component_{i}" for i in range(1, n_components + 1)]
-        return pd.DataFrame(data_transformed, columns=components_col)
+        if isinstance(data, (str, os.PathLike)):
+            data = np.load(data, mmap_mode='r')
+        columns = data.columns if isinstance(data, pd.DataFrame) else None
+        array = data.to_numpy() if isinstance(data, pd.DataFrame) else data
+        if method == 'auto':
+            method = _pca_method(array, n_components, max_memory_bytes)
+        if method == 'incremental':
+            if batch_size is None:
+                row_bytes = max(array[:1].nbytes, 1)
+                batch_size = max(5 * array.shape[1], (64 << 20) // row_bytes)
+            batch_size = max(batch_size, n_components or 0)
+            pca = IncrementalPCA(n_components=n_components, batch_size=batch_size)
+            bounds = list(range(0, len(array), batch_size)) + [len(array)]
+            if len(bounds) > 2 and bounds[-1] - bounds[-2] < (n_components or min(batch_size, array.shape[1])):
+                # partial_fit needs at least n_components rows, so a short tail joins the previous chunk.
+                del bounds[-2]
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                pca.partial_fit(np.asarray(array[start:stop], dtype=np.float64))
+        elif method in ('full', 'randomized'):
+            pca = PCA(n_components=n_components, svd_solver=method, random_state=random_state)
+            pca.fit(array)
+        else:
+            raise ValueError("Unsupported method. Choose from 'auto', 'full', 'randomized', 'incremental'.")
+        projector = PCAProjector(pca, feature_names=columns, batch_size=batch_size)
+        data_transformed = projector.transform(array)
+        logging.info(f"PCA ({method}) fitted with {pca.n_components_} components.")
+        if return_projector:
+            return data_transformed, projector
+        return data_transformed
     except Exception as e:
         logging.error(f"An error occurred in apply_pca: {e}", exc_info=True)
         raise
 
-def generate_polynomial_features(data, degree=2, include_bias=False):
+POLYNOMIAL_MAX_OUTPUT_BYTES = 1 << 30
+
+def _stack_dense(blocks, n_rows, n_columns):
+    # Each block is copied into its rows of the preallocated result and then dropped.
+    result = np.empty((n_rows, n_columns))
+    row = 0
+    for block in blocks:
+        result[row:row + block.shape[0]] = block
+        row += block.shape[0]
+    return result
+
+def _stack_csr(blocks, n_rows, n_columns):
+    # The CSR arrays are filled block by block. Their capacity is extrapolated from the rows seen so
+    # far, grows in place when a block does not fit, and is trimmed in place at the end.
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    values = indices = None
+    nnz = row = 0
+    for block in blocks:
+        block = block.tocsr()
+        end = nnz + block.nnz
+        if values is None or end > len(values):
+            capacity = max(end, int(end / (row + block.shape[0]) * n_rows * 1.05) + 1, 0 if values is None else 2 * len(values))
+            if values is None:
+                values, indices = np.empty(capacity, dtype=block.dtype), np.empty(capacity, dtype=np.int64)
+            else:
+                values.resize(capacity, refcheck=False)
+                indices.resize(capacity, refcheck=False)
+        values[nnz:end] = block.data
+        indices[nnz:end] = block.indices
+        indptr[row + 1:row + 1 + block.shape[0]] = block.indptr[1:] + nnz
+        nnz, row = end, row + block.shape[0]
+    if values is None:
+        return sparse.csr_matrix((n_rows, n_columns))
+    values.resize(nnz, refcheck=False)
+    indices.resize(nnz, refcheck=False)
+    return sparse.csr_matrix((values, indices, indptr), shape=(n_rows, n_columns))
+
+def generate_polynomial_features(data, degree=2, include_bias=False, interaction_only=False, top_k=None, target=None, sparse_output=False, chunk_size=None, max_output_bytes=POLYNOMIAL_MAX_OUTPUT_BYTES):
     """
     Generates polynomial features.
 
+    The size of the output is estimated before anything is computed and logged; a warning is
+    logged when the dense result would exceed max_output_bytes. Rows are expanded in chunks and
+    copied into the output as they are produced, so only one chunk is held next to the result;
+    with sparse_output the dense result is never materialized, and iter_polynomial_features
+    streams the same blocks without collecting them.
+
     Parameters:
-    - data (pandas.DataFrame or numpy.ndarray): The input dataset.
+    - data (pandas.DataFrame, array-like or scipy.sparse matrix): The input dataset.
     - degree (int): The degree of the polynomial features.
     - include_bias (bool): If True, include a bias column (the feature in which all polynomial powers are zero).
+    - interaction_only (bool): If True, only products of distinct features are generated.
+    - top_k (int, optional): If given (degree 2 only), keep the inputs plus only the k degree-2
+      terms ranked best on a sample of rows: by correlation with target if given, else by variance.
+    - target (array-like, optional): Target used to rank the top_k terms.
+    - sparse_output (bool): If True, return a scipy.sparse CSR matrix. Sparse input always gives sparse output.
+    - chunk_size (int, optional): Rows expanded per chunk.
+    - max_output_bytes (int): Dense output size above which a warning is logged.
 
     Returns:
-    - pandas.DataFrame or numpy.ndarray: The transformed dataset with polynomial features.
+    - numpy.ndarray or scipy.sparse.csr_matrix: The transformed dataset with polynomial features.
     """
     try:
-        poly = PolynomialFeatures(degree=degree, include_bias=include_bias)
-        data_transformed = poly.fit_transform(data)
-        return data_transformed
+        if not sparse.issparse(data) and not isinstance(data, pd.DataFrame):
+            data = np.asarray(data)
+        n_samples, n_features = data.shape
+        n_outputs = polynomial_output_size(n_features, degree, include_bias, interaction_only, top_k)
+        output_bytes = n_samples * n_outputs * 8
+        logging.info(f"Polynomial expansion of {n_features} features gives {n_outputs} columns ({output_bytes / 2 ** 20:.1f} MiB dense).")
+        if output_bytes > max_output_bytes and not sparse_output:
+            logging.warning(f"The dense polynomial output ({output_bytes / 2 ** 20:.1f} MiB) exceeds {max_output_bytes / 2 ** 20:.1f} MiB. Consider top_k, interaction_only, sparse_output or iter_polynomial_features.")
+        blocks = iter_polynomial_features(data, degree, include_bias, interaction_only, top_k, target, sparse_output, chunk_size)
+        if sparse_output or sparse.issparse(data):
+            return _stack_csr(blocks, n_samples, n_outputs)
+        return _stack_dense(blocks, n_samples, n_outputs)
     except Exception as e:
         logging.error(f"An error occurred in generate_polynomial_features: {e}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,174 @@
+"""
+Categorical encoding with a fitted category dictionary or by feature hashing.
+
+encode_categorical learns its categories from every batch it is given, so two batches can get
+different columns. CategoryEncoder learns them once (and saves them like the other fitted
+transformers), giving every batch the same sparse one-hot layout or integer codes, with an
+unknown bucket for values seen only later. hash_encode needs no dictionary at all.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import logging
+from .transformers import _FittedTransformer, _to_json
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ENCODINGS = ('onehot', 'label', 'hash')
+
+def _categorical_frame(data):
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, pd.Series):
+        return data.to_frame()
+    array = np.asarray(data)
+    return pd.DataFrame(array.reshape(len(array), -1) if array.ndim != 2 else array)
+
+def hash_encode(data, n_features=2 ** 20, columns=None):
+    """
+    Encodes categorical columns by feature hashing into a fixed-width sparse matrix.
+
+    Each value is hashed together with its column name, so no category dictionary is needed and
+    unseen values still get a column. Distinct values may collide in the same column.
+
+    Parameters:
+    - data (pandas.DataFrame, pandas.Series or numpy.ndarray): The categorical data.
+    - n_features (int): Width of the output.
+    - columns (list, optional): Columns to encode. Defaults to every column.
+
+    Returns:
+    - scipy.sparse.csr_matrix: One non-zero per row and encoded column.
+    """
+    frame = _categorical_frame(data)
+    columns = list(frame.columns) if columns is None else list(columns)
+    n_rows = len(frame)
+    indices = np.empty((n_rows, len(columns)), dtype=np.int64)
+    for j, column in enumerate(columns):
+        keys = (f"{column}=" + frame[column].astype(str)).to_numpy(dtype=object)
+        indices[:, j] = (pd.util.hash_array(keys) % np.uint64(n_features)).astype(np.int64)
+    indptr = np.arange(0, n_rows * len(columns) + 1, len(columns))
+    matrix = sparse.csr_matrix((np.ones(indices.size), indices.ravel(), indptr), shape=(n_rows, n_features))
+    # Collisions within a row are summed.
+    matrix.sum_duplicates()
+    return matrix
+
+class CategoryEncoder(_FittedTransformer):
+    """
+    Encodes categorical columns with a fitted category dictionary.
+
+    Parameters:
+    - encoding_type (str): 'onehot' for a sparse CSR one-hot matrix, 'label' for integer codes.
+    - columns (list, optional): Columns to encode. Defaults to the non-numeric columns of a
+      DataFrame, and to every column of an array or Series. Other DataFrame columns are passed
+      through unchanged (as the leading columns of the one-hot matrix).
+
+    Every encoded column has an unknown bucket: values not seen during fit get the code
+    len(categories) with 'label', and the last column of that feature's block with 'onehot'.
+    Transform is a hash-table lookup per value; nothing is re-derived from the data.
+    """
+    _init_attributes = ('encoding_type', 'columns')
+    _state_attributes = ('encoding_type', 'columns', 'categories_', 'passthrough_')
+
+    def __init__(self, encoding_type='onehot', columns=None):
+        if encoding_type not in ('onehot', 'label'):
+            raise ValueError("Unsupported encoding type. Choose from 'onehot' or 'label'.")
+        self.encoding_type = encoding_type
+        self.columns = columns
+        self.categories_ = None
+        self.passthrough_ = None
+        self.fitted_ = False
+
+    def _restore(self):
+        self.categories_ = {column: values for column, values in self.categories_}
+        self._build_index()
+
+    def get_state(self):
+        state = super().get_state()
+        state['categories_'] = [[column, values] for column, values in self.categories_.items()]
+        return state
+
+    def _build_index(self):
+        self._index = {column: pd.Index(values) for column, values in self.categories_.items()}
+
+    def _encoded_columns(self, frame, is_frame):
+        if self.columns is not None:
+            return list(self.columns)
+        if is_frame:
+            return [column for column in frame.columns if not pd.api.types.is_numeric_dtype(frame[column])]
+        return list(frame.columns)
+
+    def fit(self, data):
+        """
+        Learns the sorted distinct values of every encoded column.
+        """
+        try:
+            frame = _categorical_frame(data)
+            encoded = self._encoded_columns(frame, isinstance(data, pd.DataFrame))
+            self.categories_ = {}
+            for column in encoded:
+                values = frame[column].dropna().unique()
+                self.categories_[column] = _to_json(np.sort(values.astype(object) if values.dtype == object else values))
+            self.passthrough_ = [column for column in frame.columns if column not in self.categories_] if isinstance(data, pd.DataFrame) else []
+            self._build_index()
+            self.fitted_ = True
+            logging.info(f"CategoryEncoder fitted on {len(self.categories_)} column(s) with {sum(len(v) for v in self.categories_.values())} categories.")
+            return self
+        except Exception as e:
+            logging.error(f"An error occurred in CategoryEncoder.fit: {e}", exc_info=True)
+            raise
+
+    def codes(self, data):
+        """
+        Returns the integer code of every value, one column per encoded column.
+        """
+        self._check_fitted()
+        frame = _categorical_frame(data)
+        codes = np.empty((len(frame), len(self.categories_)), dtype=np.int64)
+        for j, (column, index) in enumerate(self._index.items()):
+            found = index.get_indexer(frame[column])
+            codes[:, j] = np.where(found < 0, len(index), found)
+        return codes
+
+    def feature_names(self):
+        """
+        Returns the name of every output column of the one-hot matrix.
+        """
+        self._check_fitted()
+        names = [str(column) for column in self.passthrough_]
+        for column, values in self.categories_.items():
+            names.extend(f"{column}_{value}" for value in values)
+            names.append(f"{column}_<unknown>")
+        return names
+
+    def transform(self, data, copy=True):
+        """
+        Encodes data with the fitted categories.
+
+        Returns:
+        - scipy.sparse.csr_matrix: For 'onehot', the passthrough columns followed by one block per
+          encoded column (its categories, then the unknown bucket).
+        - numpy.ndarray or pandas.DataFrame: For 'label', the codes; a DataFrame keeps its
+          passthrough columns.
+        """
+        try:
+            codes = self.codes(data)
+            if self.encoding_type == 'label':
+                if isinstance(data, pd.DataFrame):
+                    result = data.copy() if copy else data
+                    for j, column in enumerate(self.categories_):
+                        result[column] = codes[:, j]
+                    return result
+                return codes[:, 0] if codes.shape[1] == 1 and np.ndim(data) == 1 else codes
+            widths = np.array([len(values) + 1 for values in self.categories_.values()], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(widths)[:-1]])
+            n_rows = len(codes)
+            indptr = np.arange(0, n_rows * codes.shape[1] + 1, codes.shape[1])
+            onehot = sparse.csr_matrix((np.ones(codes.size), (codes + offsets).ravel(), indptr), shape=(n_rows, int(widths.sum())))
+            if self.passthrough_:
+                numeric = sparse.csr_matrix(_categorical_frame(data)[self.passthrough_].to_numpy(dtype=np.float64))
+                onehot = sparse.hstack([numeric, onehot], format='csr')
+            return onehot
+        except Exception as e:
+            logging.error(f"An error occurred in CategoryEncoder.transform: {e}", exc_info=True)
+            raise
@@ -17,14 +17,31 @@ def custom_normalizer(array):
 __all__ = ['custom_normalizer']
 """
 
+import numpy as np
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def custom_normalizer(array):
+def custom_normalizer(array, out=None, copy=True):
+    """
+    Divides an array by its max.
+
+    Parameters:
+    - array (numpy.ndarray): The input array.
+    - out (numpy.ndarray, optional): A buffer of the same shape to write the result into.
+    - copy (bool): If False and array is a writeable floating-point array, it is scaled in place.
+
+    Returns:
+    - numpy.ndarray: The scaled array.
+    """
     try:
         # Custom normalization logic
-        normalized_array = array / array.max()
+        if out is None and not copy and isinstance(array, np.ndarray) and np.issubdtype(array.dtype, np.floating) and array.flags.writeable:
+            out = array
+        if out is None:
+            normalized_array = array / array.max()
+        else:
+            normalized_array = np.divide(array, array.max(), out=out)
         logging.info("Custom normalization completed successfully.")
         return normalized_array
     except Exception as e:
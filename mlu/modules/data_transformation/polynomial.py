@@ -0,0 +1,162 @@
+"""
+Memory-bounded polynomial feature expansion.
+
+The expansion is described by a list of terms, each a tuple of input column indices whose
+product is one output column, in the same order as sklearn's PolynomialFeatures. Rows are
+expanded in chunks, so the output can be streamed block by block (iter_polynomial_features)
+or written as a sparse matrix without materializing a dense copy of the full result.
+polynomial_output_size gives the width of the output before anything is computed.
+"""
+
+from itertools import combinations, combinations_with_replacement
+from math import comb
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import PolynomialFeatures
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+POLYNOMIAL_CHUNK_BYTES = 64 << 20
+PAIR_SAMPLE_ROWS = 2048
+
+def polynomial_output_size(n_features, degree=2, include_bias=False, interaction_only=False, top_k=None):
+    """
+    Returns the number of output columns of a polynomial expansion, without computing it.
+
+    Parameters:
+    - n_features (int): Number of input columns.
+    - degree (int): The degree of the polynomial features.
+    - include_bias (bool): Whether a bias column is included.
+    - interaction_only (bool): If True, only products of distinct columns are generated.
+    - top_k (int, optional): If given, only the k best degree-2 terms are kept next to the inputs.
+
+    Returns:
+    - int: The number of output columns.
+    """
+    if top_k is not None:
+        pairs = comb(n_features, 2) if interaction_only else comb(n_features + 1, 2)
+        return int(include_bias) + n_features + min(top_k, pairs)
+    if interaction_only:
+        terms = sum(comb(n_features, d) for d in range(1, degree + 1))
+    else:
+        terms = sum(comb(n_features + d - 1, d) for d in range(1, degree + 1))
+    return int(include_bias) + terms
+
+def _as_matrix(data):
+    if isinstance(data, pd.DataFrame):
+        return data.to_numpy()
+    if sparse.issparse(data):
+        return data.tocsr()
+    return data
+
+def _pairs(n_features, interaction_only):
+    generator = combinations(range(n_features), 2) if interaction_only else combinations_with_replacement(range(n_features), 2)
+    return np.array(list(generator), dtype=np.int64).reshape(-1, 2)
+
+def select_top_pairs(data, k, target=None, interaction_only=False, sample_rows=PAIR_SAMPLE_ROWS):
+    """
+    Ranks the degree-2 terms on a sample of rows and returns the k best.
+
+    With a target, pairs are ranked by the absolute correlation of their product with it;
+    without one, by the variance of their product.
+
+    Returns:
+    - numpy.ndarray: The selected (i, j) column pairs, shape (k, 2).
+    """
+    matrix = _as_matrix(data)
+    sample = matrix[:sample_rows]
+    sample = sample.toarray() if sparse.issparse(sample) else np.asarray(sample, dtype=np.float64)
+    pairs = _pairs(sample.shape[1], interaction_only)
+    scores = np.empty(len(pairs))
+    if target is not None:
+        y = np.asarray(target, dtype=np.float64)[:len(sample)]
+        y = (y - y.mean()) / (y.std() or 1.0)
+    block = max(POLYNOMIAL_CHUNK_BYTES // max(sample.shape[0] * 8, 1), 1)
+    for start in range(0, len(pairs), block):
+        chunk = pairs[start:start + block]
+        products = sample[:, chunk[:, 0]] * sample[:, chunk[:, 1]]
+        if target is None:
+            scores[start:start + block] = products.var(axis=0)
+        else:
+            std = products.std(axis=0)
+            centered = products - products.mean(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores[start:start + block] = np.nan_to_num(np.abs(y @ centered) / (len(y) * std))
+    k = min(k, len(pairs))
+    best = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+    return pairs[np.sort(best)]
+
+def polynomial_terms(n_features, degree=2, include_bias=False, interaction_only=False, pairs=None):
+    """
+    Lists the output terms as tuples of input column indices (the empty tuple is the bias).
+    """
+    terms = [()] if include_bias else []
+    terms.extend((i,) for i in range(n_features))
+    if pairs is not None:
+        terms.extend(tuple(int(i) for i in pair) for pair in pairs)
+        return terms
+    for d in range(2, degree + 1):
+        generator = combinations(range(n_features), d) if interaction_only else combinations_with_replacement(range(n_features), d)
+        terms.extend(generator)
+    return terms
+
+def _expand(block, terms, sparse_output, expander=None):
+    if sparse.issparse(block) and expander is not None:
+        return expander.transform(block)
+    if sparse.issparse(block):
+        columns = []
+        for term in terms:
+            column = sparse.csr_matrix(np.ones((block.shape[0], 1))) if not term else block[:, term[0]]
+            for index in term[1:]:
+                column = column.multiply(block[:, index])
+            columns.append(column)
+        return sparse.hstack(columns, format='csr')
+    block = np.asarray(block, dtype=np.float64)
+    result = np.empty((block.shape[0], len(terms)))
+    # Terms of equal degree are computed together with one fancy index per factor.
+    by_degree = {}
+    for position, term in enumerate(terms):
+        by_degree.setdefault(len(term), []).append(position)
+    for degree, positions in by_degree.items():
+        if degree == 0:
+            result[:, positions] = 1.0
+            continue
+        factors = np.array([terms[p] for p in positions], dtype=np.int64)
+        product = block[:, factors[:, 0]].copy()
+        for d in range(1, degree):
+            product *= block[:, factors[:, d]]
+        result[:, positions] = product
+    return sparse.csr_matrix(result) if sparse_output else result
+
+def iter_polynomial_features(data, degree=2, include_bias=False, interaction_only=False, top_k=None, target=None, sparse_output=False, chunk_size=None):
+    """
+    Yields the polynomial features of data one block of rows at a time.
+
+    Parameters:
+    - data (numpy.ndarray, numpy.memmap, pandas.DataFrame or scipy.sparse matrix): The input dataset.
+    - degree, include_bias, interaction_only, top_k: As in generate_polynomial_features.
+    - target (array-like, optional): Ranks the top_k pairs by correlation with it.
+    - sparse_output (bool): If True, every block is a CSR matrix (always the case for sparse input).
+    - chunk_size (int, optional): Rows per block. Defaults to the rows whose output fits in 64 MiB.
+
+    Yields:
+    - numpy.ndarray or scipy.sparse.csr_matrix: The expanded rows of one block.
+    """
+    matrix = _as_matrix(data)
+    n_features = matrix.shape[1]
+    pairs = None
+    if top_k is not None:
+        if degree != 2:
+            raise ValueError("top_k selects degree-2 terms; use it with degree=2.")
+        pairs = select_top_pairs(matrix, top_k, target, interaction_only)
+    terms = polynomial_terms(n_features, degree, include_bias, interaction_only, pairs)
+    expander = None
+    if sparse.issparse(matrix) and pairs is None:
+        # sklearn expands CSR input natively, keeping the output sparse.
+        expander = PolynomialFeatures(degree=degree, include_bias=include_bias, interaction_only=interaction_only).fit(matrix[:1])
+    if chunk_size is None:
+        chunk_size = max(POLYNOMIAL_CHUNK_BYTES // (8 * max(len(terms), 1)), 1)
+    for start in range(0, matrix.shape[0], chunk_size):
+        yield _expand(matrix[start:start + chunk_size], terms, sparse_output, expander)
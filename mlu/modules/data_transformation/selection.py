@@ -0,0 +1,165 @@
+"""
+Low-variance column selection in one sequential scan over chunked sources.
+
+VarianceSelector merges the per-column moments of each chunk, so arrays, memory maps, sparse
+matrices, DataFrames, .npy and Parquet files (see iter_row_chunks) are selected on without
+being loaded whole.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import logging
+from .transformers import _FittedTransformer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def iter_row_chunks(source, chunk_size=65536):
+    """
+    Yields row chunks of a source without loading it whole.
+
+    Parameters:
+    - source: An array, memmap, DataFrame or scipy.sparse matrix (sliced by rows), the path of a
+      .npy file (memory-mapped) or a Parquet file (read one row group at a time, requires
+      pyarrow), or an iterable of chunks.
+    - chunk_size (int): Rows per chunk when slicing.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if str(source).endswith('.parquet'):
+            import pyarrow.parquet as pq
+            parquet = pq.ParquetFile(source)
+            for group in range(parquet.num_row_groups):
+                yield parquet.read_row_group(group).to_pandas()
+            return
+        source = np.load(source, mmap_mode='r')
+    if isinstance(source, (np.ndarray, pd.DataFrame)) or sparse.issparse(source):
+        rows = source.shape[0]
+        for start in range(0, rows, chunk_size):
+            yield source.iloc[start:start + chunk_size] if isinstance(source, pd.DataFrame) else source[start:start + chunk_size]
+        return
+    yield from source
+
+class VarianceSelector(_FittedTransformer):
+    """
+    Selects the columns whose variance exceeds a threshold, learned in one sequential scan.
+
+    Parameters:
+    - threshold (float): Columns with a variance at or below this are dropped. With 0, columns
+      are dropped when their min equals their max, as in sklearn's VarianceThreshold.
+
+    partial_fit merges per-column count, mean and sum of squared deviations (Welford/Chan) in
+    float64, whatever the dtype of the chunk, and accepts dense, DataFrame and sparse chunks.
+    NaN values are left out of every statistic, as in sklearn's VarianceThreshold.
+    """
+    _init_attributes = ('threshold',)
+    _state_attributes = ('threshold', 'variances_', 'kept_indices_', 'columns_')
+
+    def __init__(self, threshold=0.0):
+        self.threshold = threshold
+        self.count_ = 0
+        self.mean_ = None
+        self.m2_ = None
+        self.min_ = None
+        self.max_ = None
+        self.columns_ = None
+        self.fitted_ = False
+
+    def _restore(self):
+        self.variances_ = np.asarray(self.variances_, dtype=np.float64)
+        self.kept_indices_ = np.asarray(self.kept_indices_, dtype=np.int64)
+
+    def partial_fit(self, chunk):
+        """
+        Merges the column statistics of one more chunk.
+        """
+        try:
+            if isinstance(chunk, pd.DataFrame):
+                if self.columns_ is None:
+                    self.columns_ = list(chunk.columns)
+                chunk = chunk.to_numpy()
+            n = chunk.shape[0]
+            if n == 0:
+                return self
+            # NaN values are skipped, so every column has its own count of valid values.
+            if sparse.issparse(chunk):
+                chunk = chunk.tocsr()
+                missing = np.isnan(chunk.data) if chunk.dtype.kind in 'fc' else None
+                if missing is not None and missing.any():
+                    counts = n - np.bincount(chunk.indices[missing], minlength=chunk.shape[1])
+                    low, high = chunk.copy(), chunk.copy()
+                    low.data[missing], high.data[missing] = np.inf, -np.inf
+                    chunk = chunk.copy()
+                    chunk.data[missing] = 0.0
+                else:
+                    counts = np.full(chunk.shape[1], n)
+                    low = high = chunk
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    mean = np.asarray(chunk.sum(axis=0), dtype=np.float64).ravel() / counts
+                # Sum of squared deviations from the chunk mean without densifying: sum(x^2) - n * mean^2.
+                squares = np.asarray(chunk.multiply(chunk).sum(axis=0), dtype=np.float64).ravel()
+                m2 = np.where(counts > 0, np.maximum(squares - counts * mean ** 2, 0.0), 0.0)
+                minimum = low.min(axis=0).toarray().ravel().astype(np.float64)
+                maximum = high.max(axis=0).toarray().ravel().astype(np.float64)
+            else:
+                values = np.asarray(chunk)
+                values = values.reshape(n, -1)
+                valid = ~np.isnan(values) if values.dtype.kind in 'fc' else None
+                if valid is None or valid.all():
+                    counts = np.full(values.shape[1], n)
+                    mean = values.mean(axis=0, dtype=np.float64)
+                    deviations = values - mean
+                    minimum = values.min(axis=0).astype(np.float64)
+                    maximum = values.max(axis=0).astype(np.float64)
+                else:
+                    counts = valid.sum(axis=0)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        mean = np.where(valid, values, 0.0).sum(axis=0, dtype=np.float64) / counts
+                    deviations = np.where(valid, values - mean, 0.0)
+                    minimum = np.where(valid, values, np.inf).min(axis=0).astype(np.float64)
+                    maximum = np.where(valid, values, -np.inf).max(axis=0).astype(np.float64)
+                m2 = np.einsum('ij,ij->j', deviations, deviations, dtype=np.float64)
+            mean = np.where(counts > 0, mean, 0.0)
+            if self.mean_ is None:
+                self.count_, self.mean_, self.m2_, self.min_, self.max_ = counts, mean, m2, minimum, maximum
+            else:
+                total = self.count_ + counts
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    delta = mean - self.mean_
+                    self.mean_ = np.where(total > 0, self.mean_ + delta * counts / total, 0.0)
+                    self.m2_ = np.where(total > 0, self.m2_ + m2 + delta ** 2 * self.count_ * counts / total, 0.0)
+                self.count_ = total
+                self.min_ = np.minimum(self.min_, minimum)
+                self.max_ = np.maximum(self.max_, maximum)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Columns without a valid value get a NaN variance and are dropped.
+                self.variances_ = np.where(self.count_ > 0, self.m2_ / self.count_, np.nan)
+            support = self.max_ > self.min_ if self.threshold == 0 else self.variances_ > self.threshold
+            self.kept_indices_ = np.flatnonzero(support)
+            self.fitted_ = True
+            return self
+        except Exception as e:
+            logging.error(f"An error occurred in VarianceSelector.partial_fit: {e}", exc_info=True)
+            raise
+
+    def fit(self, source, chunk_size=65536):
+        """
+        Learns the column variances from a source in one pass (see iter_row_chunks for sources).
+        """
+        self.__init__(self.threshold)
+        for chunk in iter_row_chunks(source, chunk_size):
+            self.partial_fit(chunk)
+        self._check_fitted()
+        logging.info(f"VarianceSelector kept {len(self.kept_indices_)} of {len(self.variances_)} columns.")
+        return self
+
+    def transform(self, data, copy=True):
+        """
+        Keeps the selected columns of data.
+        """
+        self._check_fitted()
+        if isinstance(data, pd.DataFrame):
+            return data.iloc[:, self.kept_indices_]
+        if sparse.issparse(data):
+            return data.tocsc()[:, self.kept_indices_].tocsr()
+        return np.asarray(data)[:, self.kept_indices_]
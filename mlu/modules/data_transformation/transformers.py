@@ -0,0 +1,347 @@
+"""
+Fitted, reusable versions of handle_missing_values, normalize and apply_pca.
+
+handle_missing_values and normalize compute their statistics from the data they are given,
+which is wasted work at inference time and wrong for small batches (a one-row batch
+normalizes to NaN). The transformers here learn the statistics once with fit, or
+incrementally from chunks with partial_fit, and transform then applies them in one
+element-wise pass without any reductions. The fitted statistics are saved as a small JSON
+file with save and restored with load. PCAProjector applies a fitted PCA to new batches.
+
+The categorical encoders are in encoding.py and the streaming variance selection in
+selection.py; both build on _FittedTransformer from here.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import logging
+from ..array_manipulation import QuantileSketch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+IMPUTER_STRATEGIES = ('mean', 'median', 'mode', 'constant')
+
+def _columns(data):
+    """
+    Returns the data as a list of 1-D columns, and the column labels of a DataFrame.
+    """
+    if isinstance(data, pd.DataFrame):
+        return [data[column].to_numpy() for column in data.columns], list(data.columns)
+    if isinstance(data, pd.Series):
+        return [data.to_numpy()], None
+    array = np.asarray(data)
+    if array.ndim == 1:
+        return [array], None
+    return [array[:, j] for j in range(array.shape[1])], None
+
+def _missing(values):
+    return pd.isna(values) if values.dtype.kind == 'O' else np.isnan(values) if values.dtype.kind in 'fc' else np.zeros(values.shape, dtype=bool)
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return [_to_json(item) for item in value.tolist()]
+    return value
+
+class _FittedTransformer:
+    """
+    Shared fit_transform, save and load for the fitted transformers of this package.
+    """
+    _state_attributes = ()
+
+    def fit_transform(self, data, copy=True):
+        return self.fit(data).transform(data, copy=copy)
+
+    def _check_fitted(self):
+        if not self.fitted_:
+            raise ValueError(f"This {type(self).__name__} is not fitted yet. Call fit or partial_fit first.")
+
+    def get_state(self):
+        """
+        Returns the fitted statistics as a JSON-serializable dict.
+        """
+        self._check_fitted()
+        return {name: _to_json(getattr(self, name)) for name in self._state_attributes}
+
+    def save(self, path):
+        """
+        Writes the fitted statistics to a JSON file.
+        """
+        with open(path, 'w') as handle:
+            json.dump({'type': type(self).__name__, **self.get_state()}, handle)
+        logging.info(f"{type(self).__name__} saved to {path}.")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restores a transformer saved with save.
+        """
+        with open(path) as handle:
+            state = json.load(handle)
+        if state.pop('type') != cls.__name__:
+            raise ValueError(f"{path} does not hold a {cls.__name__}.")
+        transformer = cls(**{name: state.pop(name) for name in cls._init_attributes})
+        for name, value in state.items():
+            setattr(transformer, name, value)
+        transformer._restore()
+        transformer.fitted_ = True
+        return transformer
+
+    def _restore(self):
+        pass
+
+class MissingValueImputer(_FittedTransformer):
+    """
+    Fills missing values with per-column statistics learned once.
+
+    Parameters:
+    - strategy (str): 'mean', 'median', 'mode' or 'constant'.
+    - fill_value: The value used by the 'constant' strategy.
+
+    fit computes exact statistics. partial_fit updates them from one chunk at a time: mean and
+    mode stay exact, and median comes from a KLL sketch per column (see
+    array_manipulation.sketches for its error bound).
+    """
+    _init_attributes = ('strategy', 'fill_value')
+    _state_attributes = ('strategy', 'fill_value', 'statistics_', 'columns_')
+
+    def __init__(self, strategy='mean', fill_value=0):
+        if strategy not in IMPUTER_STRATEGIES:
+            raise ValueError("Unsupported strategy. Choose from 'mean', 'median', 'mode', or 'constant'.")
+        self.strategy = strategy
+        self.fill_value = fill_value
+        self.statistics_ = None
+        self.columns_ = None
+        self.fitted_ = False
+        self._reset()
+
+    def _reset(self):
+        self._counts = None
+        self._sums = None
+        self._sketches = None
+        self._value_counts = None
+
+    def fit(self, data):
+        """
+        Learns the fill value of every column from data.
+        """
+        try:
+            self._reset()
+            columns, self.columns_ = _columns(data)
+            if self.strategy == 'median':
+                # The sketches are seeded too, so that a later partial_fit continues from all of data.
+                present = [values[~_missing(values)].astype(np.float64) for values in columns]
+                self._sketches = [QuantileSketch().update(values) for values in present]
+                self.statistics_ = [float(np.median(values)) if values.size else np.nan for values in present]
+                self.fitted_ = True
+            else:
+                self.partial_fit(data)
+            logging.info(f"MissingValueImputer fitted with strategy '{self.strategy}'.")
+            return self
+        except Exception as e:
+            logging.error(f"An error occurred in MissingValueImputer.fit: {e}", exc_info=True)
+            raise
+
+    def partial_fit(self, data):
+        """
+        Updates the fill values with one more chunk of data.
+        """
+        try:
+            columns, labels = _columns(data)
+            if self.columns_ is None:
+                self.columns_ = labels
+            n_columns = len(columns)
+            if self.strategy == 'constant':
+                self.statistics_ = [self.fill_value] * n_columns
+            elif self.strategy == 'mean':
+                if self._counts is None:
+                    self._counts = np.zeros(n_columns)
+                    self._sums = np.zeros(n_columns)
+                for j, values in enumerate(columns):
+                    present = values[~_missing(values)].astype(np.float64)
+                    self._counts[j] += present.size
+                    self._sums[j] += present.sum()
+                with np.errstate(invalid='ignore'):
+                    self.statistics_ = (self._sums / self._counts).tolist()
+            elif self.strategy == 'median':
+                if self._sketches is None:
+                    self._sketches = [QuantileSketch() for _ in range(n_columns)]
+                for sketch, values in zip(self._sketches, columns):
+                    sketch.update(values[~_missing(values)].astype(np.float64))
+                self.statistics_ = [float(sketch.quantile(0.5)) if sketch.count else np.nan for sketch in self._sketches]
+            else:
+                if self._value_counts is None:
+                    self._value_counts = [{} for _ in range(n_columns)]
+                for counts, values in zip(self._value_counts, columns):
+                    unique, occurrences = np.unique(values[~_missing(values)], return_counts=True)
+                    for value, occurrence in zip(unique.tolist(), occurrences.tolist()):
+                        counts[value] = counts.get(value, 0) + occurrence
+                # Ties go to the smallest value, like DataFrame.mode().iloc[0].
+                self.statistics_ = [min(counts, key=lambda value: (-counts[value], value)) if counts else np.nan for counts in self._value_counts]
+            self.fitted_ = True
+            return self
+        except Exception as e:
+            logging.error(f"An error occurred in MissingValueImputer.partial_fit: {e}", exc_info=True)
+            raise
+
+    def transform(self, data, copy=True):
+        """
+        Fills the missing values of data with the fitted statistics.
+
+        Parameters:
+        - data (numpy.ndarray, pandas.DataFrame or pandas.Series): Data with the fitted columns.
+        - copy (bool): If False, float arrays and pandas objects are filled in place.
+
+        Returns:
+        - The data with missing values filled, of the same type as the input.
+        """
+        try:
+            self._check_fitted()
+            if isinstance(data, (pd.DataFrame, pd.Series)):
+                if isinstance(data, pd.DataFrame):
+                    # Fill by the fitted labels, so columns in another order or a subset get their own values.
+                    values = dict(zip(self.columns_ if self.columns_ is not None else data.columns, self.statistics_))
+                else:
+                    values = self.statistics_[0]
+                if not copy:
+                    data.fillna(values, inplace=True)
+                    return data
+                return data.fillna(values)
+            array = np.asarray(data)
+            if array.dtype.kind not in 'fcO':
+                return array.copy() if copy else array
+            result = array.copy() if copy or not array.flags.writeable else array
+            fill = np.asarray(self.statistics_, dtype=result.dtype)
+            np.copyto(result, fill if result.ndim > 1 else fill[0], where=_missing(result))
+            return result
+        except Exception as e:
+            logging.error(f"An error occurred in MissingValueImputer.transform: {e}", exc_info=True)
+            raise
+
+class MinMaxNormalizer(_FittedTransformer):
+    """
+    Scales data to the [0, 1] range of a fitted min and max.
+
+    Parameters:
+    - per_column (bool): If False, one min and max over the whole array, like normalize. If True,
+      one per column.
+
+    A fitted range of zero scales by 1 instead, so constant data maps to 0 rather than NaN.
+    """
+    _init_attributes = ('per_column',)
+    _state_attributes = ('per_column', 'min_', 'max_')
+
+    def __init__(self, per_column=False):
+        self.per_column = per_column
+        self.min_ = None
+        self.max_ = None
+        self.fitted_ = False
+
+    def _restore(self):
+        self.min_ = np.asarray(self.min_, dtype=np.float64)
+        self.max_ = np.asarray(self.max_, dtype=np.float64)
+
+    def fit(self, data):
+        """
+        Learns the min and max of data.
+        """
+        self.min_ = None
+        self.max_ = None
+        self.partial_fit(data)
+        logging.info("MinMaxNormalizer fitted.")
+        return self
+
+    def partial_fit(self, data):
+        """
+        Updates the min and max with one more chunk of data.
+        """
+        try:
+            array = np.asarray(data, dtype=np.float64)
+            axis = 0 if self.per_column else None
+            chunk_min = np.nanmin(array, axis=axis)
+            chunk_max = np.nanmax(array, axis=axis)
+            self.min_ = chunk_min if self.min_ is None else np.fmin(self.min_, chunk_min)
+            self.max_ = chunk_max if self.max_ is None else np.fmax(self.max_, chunk_max)
+            self.fitted_ = True
+            return self
+        except Exception as e:
+            logging.error(f"An error occurred in MinMaxNormalizer.partial_fit: {e}", exc_info=True)
+            raise
+
+    def transform(self, data, out=None, copy=True):
+        """
+        Scales data with the fitted min and max.
+
+        Parameters:
+        - data (numpy.ndarray): The input array.
+        - out (numpy.ndarray, optional): A buffer of the same shape to write the result into.
+        - copy (bool): If False and data is a writeable floating-point array, it is scaled in place.
+
+        Returns:
+        - numpy.ndarray: The scaled array.
+        """
+        try:
+            self._check_fitted()
+            scale = self.max_ - self.min_
+            scale = np.where(scale == 0, 1.0, scale)
+            if out is None and not copy and isinstance(data, np.ndarray) and np.issubdtype(data.dtype, np.floating) and data.flags.writeable:
+                out = data
+            if out is None:
+                return (np.asarray(data) - self.min_) / scale
+            np.subtract(data, self.min_, out=out)
+            np.divide(out, scale, out=out)
+            return out
+        except Exception as e:
+            logging.error(f"An error occurred in MinMaxNormalizer.transform: {e}", exc_info=True)
+            raise
+
+    def inverse_transform(self, data):
+        """
+        Maps scaled data back to the original range.
+        """
+        self._check_fitted()
+        scale = self.max_ - self.min_
+        return np.asarray(data) * np.where(scale == 0, 1.0, scale) + self.min_
+
+class PCAProjector:
+    """
+    A fitted PCA that projects new batches without refitting.
+
+    Parameters:
+    - estimator (sklearn.decomposition.PCA or IncrementalPCA): The fitted estimator.
+    - feature_names (list, optional): Column names the estimator was fitted on; DataFrames passed
+      to transform are reordered to them.
+    - batch_size (int, optional): If given, transform projects the input in chunks of this many
+      rows, so memory-mapped input is never loaded whole.
+    """
+    def __init__(self, estimator, feature_names=None, batch_size=None):
+        self.estimator = estimator
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.batch_size = batch_size
+        self.columns = [f"PCA_Component_{i}" for i in range(1, estimator.n_components_ + 1)]
+
+    def transform(self, data):
+        """
+        Projects data onto the fitted components.
+
+        Returns:
+        - pandas.DataFrame: One column per component.
+        """
+        try:
+            if isinstance(data, pd.DataFrame):
+                data = (data[self.feature_names] if self.feature_names is not None else data).to_numpy()
+            mean = self.estimator.mean_
+            components = self.estimator.components_
+            step = self.batch_size or len(data) or 1
+            result = np.empty((len(data), components.shape[0]))
+            for start in range(0, len(data), step):
+                chunk = np.asarray(data[start:start + step], dtype=np.float64)
+                np.dot(chunk - mean, components.T, out=result[start:start + len(chunk)])
+            if getattr(self.estimator, 'whiten', False):
+                result /= np.sqrt(self.estimator.explained_variance_)
+            return pd.DataFrame(result, columns=self.columns)
+        except Exception as e:
+            logging.error(f"An error occurred in PCAProjector.transform: {e}", exc_info=True)
+            raise
@@ -1 +1,5 @@
-from .ethical_ai_utils import bias_detection, fairness_metrics
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    'ethical_ai_utils': ['bias_detection', 'fairness_metrics'],
+})
@@ -1,7 +1,5 @@
 import pandas as pd
 from sklearn import preprocessing
-from aif360.metrics import BinaryLabelDatasetMetric
-from aif360.datasets import BinaryLabelDataset
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -45,6 +43,9 @@ def fairness_metrics(predictions, ground_truth, groups):
     - dict: Fairness metrics including demographic parity and equalized odds.
     """
     try:
+        from aif360.metrics import BinaryLabelDatasetMetric
+        from aif360.datasets import BinaryLabelDataset
+
         # Create a BinaryLabelDataset for fairness metric calculation
         dataset = BinaryLabelDataset(favorable_label=1, unfavorable_label=0, 
                                      df=pd.DataFrame({'feature': groups, 'label': ground_truth}),
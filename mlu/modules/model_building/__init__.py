@@ -1 +1,8 @@
-from .model_building import initialize_decision_tree, initialize_neural_network, optimize_hyperparameters
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    'model_building': ['initialize_decision_tree', 'initialize_neural_network', 'optimize_hyperparameters'],
+    'training': ['make_dataset', 'train_neural_network'],
+    'tpe': ['bayesian_search', 'TrialStore'],
+    'boosting': ['initialize_gradient_boosting', 'BinnedGradientBoostingClassifier', 'BinCache'],
+})
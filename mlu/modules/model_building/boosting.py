@@ -0,0 +1,262 @@
+"""
+Histogram-based gradient boosting with a reusable cache of binned features.
+
+HistGradientBoostingClassifier quantizes every feature to at most 255 uint8 bins before growing
+trees, and it does so again on every fit, so a hyperparameter search re-bins the same training
+matrix once per candidate and fold. BinnedGradientBoostingClassifier keeps the bin mapper and the
+binned training matrix in a BinCache keyed on a hash of that matrix, so every later fit on the same
+rows (each CV fold across all trials) skips binning. As in HistGradientBoostingClassifier, the bin
+mapper is fit on the training rows only; with early stopping those exclude the validation split,
+so only fits that draw the same split (a fixed random_state) share bins.
+
+The cache belongs to the estimator: clones made by the sklearn search utilities share it, and it
+is dropped with them. The binned matrices are also written to a directory as .npy files, which
+copies of the cache pickled into worker processes (as joblib does for n_jobs > 1) open as
+read-only memory maps, so a parallel search bins each matrix once across all of its workers.
+Reusing the bins relies on HistGradientBoostingClassifier._bin_data and on
+fit(X_val=...), which are checked for at import; on other scikit-learn versions the estimator
+falls back to binning on every fit.
+"""
+
+from collections import OrderedDict
+import hashlib
+import inspect
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier
+from .._hashing import hash_data
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SKLEARN_MIN_VERSION = (1, 7)
+
+def _supports_bin_reuse():
+    version = tuple(int(part) for part in sklearn.__version__.split('.')[:2] if part.isdigit())
+    return (version >= SKLEARN_MIN_VERSION and hasattr(HistGradientBoostingClassifier, '_bin_data')
+            and 'X_val' in inspect.signature(HistGradientBoostingClassifier.fit).parameters)
+
+BIN_REUSE_SUPPORTED = _supports_bin_reuse()
+
+class BinCache:
+    """
+    An LRU cache of binned feature matrices and the bin mappers that produced them, backed by a
+    directory that other processes can read.
+
+    Copying the cache (as sklearn's clone does with estimator parameters) returns the same cache,
+    so all clones of an estimator share it. Pickling it (as joblib does to send an estimator to a
+    worker process) keeps only its settings and directory, so the worker finds the bins written by
+    any other process. Hit and miss counts are those of the current process.
+
+    Parameters:
+    - max_bytes (int): Maximum total size of the binned matrices held, in memory and on disk.
+    - max_entries (int): Maximum number of binned matrices held, in memory and on disk.
+    - directory (str, optional): Where the binned matrices are written. None uses a temporary
+      directory that is removed with the cache.
+    """
+    def __init__(self, max_bytes=256 << 20, max_entries=8, directory=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='mlu_bins_')
+            weakref.finalize(self, shutil.rmtree, directory, True)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {'max_bytes': self.max_bytes, 'max_entries': self.max_entries, 'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def get(self, key):
+        """
+        Returns the cached (bin_mapper, X_binned) for the key, or None on a miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        path = self._path(key)
+        try:
+            # The .npy file is written last, so once it exists the mapper is complete.
+            X_binned = np.load(path + '.npy', mmap_mode='r')
+            with open(path + '.pkl', 'rb') as handle:
+                bin_mapper = pickle.load(handle)
+        except (OSError, EOFError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path + '.npy')
+        self._store(key, bin_mapper, X_binned)
+        self.hits += 1
+        return bin_mapper, X_binned
+
+    def put(self, key, bin_mapper, X_binned):
+        if X_binned.nbytes > self.max_bytes:
+            return
+        # Shared by every later fit, so it is made read-only.
+        X_binned.flags.writeable = False
+        self._store(key, bin_mapper, X_binned)
+        path = self._path(key)
+        # Each file is written under a name of its own and then renamed, so that processes binning
+        # the same matrix at the same time never read a partial file.
+        suffix = f".{os.getpid()}.tmp"
+        with open(path + '.pkl' + suffix, 'wb') as handle:
+            pickle.dump(bin_mapper, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.pkl' + suffix, path + '.pkl')
+        with open(path + '.npy' + suffix, 'wb') as handle:
+            np.save(handle, X_binned)
+        os.replace(path + '.npy' + suffix, path + '.npy')
+        self._evict_disk()
+
+    def _store(self, key, bin_mapper, X_binned):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1].nbytes
+        self._entries[key] = (bin_mapper, X_binned)
+        self._bytes += X_binned.nbytes
+        while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npy'):
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.path.getmtime(path), os.path.getsize(path), path[:-len('.npy')]))
+                except OSError:
+                    continue
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        while files and (total > self.max_bytes or len(files) > self.max_entries):
+            _, size, path = files.pop(0)
+            total -= size
+            for suffix in ('.npy', '.pkl'):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    # Another process removed it first, or has it mapped on a platform that forbids removal.
+                    pass
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(('.npy', '.pkl')):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+class BinnedGradientBoostingClassifier(HistGradientBoostingClassifier):
+    """
+    HistGradientBoostingClassifier that reuses the bins of its training matrix from its BinCache. Bins
+    are reused for numeric ndarray input without class_weight or warm_start; other fits bin as usual.
+
+    Parameters:
+    - bin_cache (BinCache, optional): The cache shared by this estimator and its clones. None disables it.
+    - All other parameters are those of HistGradientBoostingClassifier.
+    """
+    _parameter_constraints = {**HistGradientBoostingClassifier._parameter_constraints, 'bin_cache': [None, BinCache]}
+
+    def __init__(self, loss='log_loss', *, learning_rate=0.1, max_iter=100, max_leaf_nodes=31, max_depth=None, min_samples_leaf=20,
+                 l2_regularization=0.0, max_features=1.0, max_bins=255, categorical_features='from_dtype', monotonic_cst=None,
+                 interaction_cst=None, warm_start=False, early_stopping='auto', scoring='loss', validation_fraction=0.1,
+                 n_iter_no_change=10, tol=1e-7, verbose=0, random_state=None, class_weight=None, bin_cache=None):
+        super().__init__(loss=loss, learning_rate=learning_rate, max_iter=max_iter, max_leaf_nodes=max_leaf_nodes, max_depth=max_depth,
+                         min_samples_leaf=min_samples_leaf, l2_regularization=l2_regularization, max_features=max_features,
+                         max_bins=max_bins, categorical_features=categorical_features, monotonic_cst=monotonic_cst,
+                         interaction_cst=interaction_cst, warm_start=warm_start, early_stopping=early_stopping, scoring=scoring,
+                         validation_fraction=validation_fraction, n_iter_no_change=n_iter_no_change, tol=tol, verbose=verbose,
+                         random_state=random_state, class_weight=class_weight)
+        self.bin_cache = bin_cache
+
+    def fit(self, X, y, sample_weight=None, **fit_params):
+        self._cache_bins = (self.bin_cache is not None and BIN_REUSE_SUPPORTED and not fit_params and not self.warm_start
+                            and self.class_weight is None and isinstance(X, np.ndarray) and X.dtype.kind in 'iuf')
+        try:
+            return super().fit(X, y, sample_weight, **fit_params)
+        finally:
+            self._cache_bins = False
+
+    def _bin_data(self, X, sample_weight, is_training_data):
+        if not is_training_data or not getattr(self, '_cache_bins', False):
+            return super()._bin_data(X, sample_weight, is_training_data)
+        # X is the training part of the matrix passed to fit, after any early-stopping split.
+        mapper = self._bin_mapper
+        settings = (mapper.n_bins, mapper.subsample, repr(mapper.is_categorical), repr(mapper.known_categories))
+        if mapper.subsample is not None and X.shape[0] > mapper.subsample and isinstance(self.random_state, (int, np.integer)):
+            # The bin edges come from a random subsample here, so a fixed seed must give its own edges.
+            settings += (self.random_state,)
+        key = hash_data(X) + repr(settings) + (hash_data(sample_weight) if sample_weight is not None else '')
+        cached = self.bin_cache.get(key)
+        if cached is None:
+            X_binned = super()._bin_data(X, sample_weight, is_training_data)
+            self.bin_cache.put(key, self._bin_mapper, X_binned)
+            return X_binned
+        self._bin_mapper, X_binned = cached
+        return X_binned
+
+def initialize_gradient_boosting(max_iter=100, learning_rate=0.1, max_leaf_nodes=31, max_depth=None, min_samples_leaf=20,
+                                 l2_regularization=0.0, max_bins=255, early_stopping='auto', random_state=None, bin_cache=True):
+    """
+    Initializes a histogram-based gradient boosting model whose feature bins are cached.
+
+    Parameters:
+    - max_iter (int, optional): The number of boosting rounds.
+    - learning_rate (float, optional): The shrinkage applied to each tree.
+    - max_leaf_nodes (int, optional): The maximum number of leaves per tree.
+    - max_depth (int, optional): The maximum depth of each tree.
+    - min_samples_leaf (int, optional): The minimum number of samples per leaf.
+    - l2_regularization (float, optional): The L2 penalty on leaf values.
+    - max_bins (int, optional): The number of uint8 bins per feature (at most 255; missing values get their own bin).
+    - early_stopping (str or bool, optional): 'auto' stops early on datasets of more than 10000 rows.
+    - random_state (int, optional): Random state for reproducibility.
+    - bin_cache (bool or BinCache, optional): True gives the model (and its clones, including those in worker processes)
+      a new BinCache in a temporary directory; False disables reuse.
+
+    Returns:
+    - BinnedGradientBoostingClassifier: An unfitted gradient boosting classifier.
+    """
+    try:
+        if bin_cache is True:
+            bin_cache = BinCache()
+        elif bin_cache is False:
+            bin_cache = None
+        if not BIN_REUSE_SUPPORTED:
+            logging.warning(f"Bin reuse needs scikit-learn >= {'.'.join(map(str, SKLEARN_MIN_VERSION))}; every fit will bin its data.")
+        model = BinnedGradientBoostingClassifier(max_iter=max_iter, learning_rate=learning_rate, max_leaf_nodes=max_leaf_nodes, max_depth=max_depth,
+                                                 min_samples_leaf=min_samples_leaf, l2_regularization=l2_regularization, max_bins=max_bins,
+                                                 early_stopping=early_stopping, random_state=random_state, bin_cache=bin_cache)
+        logging.info("Gradient boosting model initialized successfully.")
+        return model
+    except Exception as e:
+        logging.error("An error occurred while initializing the gradient boosting model: %s", e, exc_info=True)
+        raise
@@ -1,8 +1,9 @@
 from sklearn.tree import DecisionTreeClassifier
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from sklearn.base import clone, is_classifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables the Halving*SearchCV imports)
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV, ParameterGrid, check_cv
+import math
+import numpy as np
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,6 +42,10 @@ def initialize_neural_network(input_shape, layers, activation='relu', output_uni
     - Sequential: An uninitialized neural network model.
     """
     try:
+        # TensorFlow takes seconds to import, so it is only loaded when a network is built.
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense
+
         model = Sequential()
         model.add(Dense(layers[0], input_shape=input_shape, activation=activation))
         for units in layers[1:]:
@@ -52,19 +57,85 @@ def initialize_neural_network(input_shape, layers, activation='relu', output_uni
         logging.error("An error occurred while initializing the neural network model: %s", e, exc_info=True)
         raise
 
-def optimize_hyperparameters(model, param_grid, X, y, cv=5, n_iter=None, scoring=None, search_type='grid'):
+def _hyperband_brackets(min_resources, max_resources, factor):
+    """
+    Returns the (n_candidates, min_resources) of every Hyperband bracket, from the most exploratory
+    bracket (many candidates, smallest budget) to plain training of a few candidates at full budget.
+    Every bracket ends at max_resources, so the best scores of the brackets are comparable.
+    """
+    s_max = int(math.floor(math.log(max_resources / min_resources, factor) + 1e-9))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n_candidates = int(math.ceil((s_max + 1) / (s + 1) * factor ** s))
+        brackets.append((n_candidates, max(int(max_resources // factor ** s), 1)))
+    return brackets
+
+def _hyperband_search(model, param_grid, X, y, cv, scoring, resource, factor, min_resources, max_resources, n_jobs, random_state):
+    if max_resources == 'auto':
+        if resource != 'n_samples':
+            raise ValueError("max_resources must be given when the resource is a model parameter.")
+        max_resources = len(X)
+    if min_resources in ('smallest', 'exhaust'):
+        if resource == 'n_samples':
+            # The smallest budget must still leave every class in every fold.
+            n_classes = len(np.unique(y)) if is_classifier(model) else 1
+            min_resources = max(2 * check_cv(cv, y, classifier=is_classifier(model)).get_n_splits(X, y) * n_classes, max_resources // factor ** 3)
+        else:
+            min_resources = max(max_resources // factor ** 3, 1)
+    grids = param_grid if isinstance(param_grid, list) else [param_grid]
+    grid_size = None
+    if all(not hasattr(values, 'rvs') for grid in grids for values in grid.values()):
+        grid_size = len(ParameterGrid(param_grid))
+    best = None
+    seen = set()
+    for n_candidates, bracket_min in _hyperband_brackets(min_resources, max_resources, factor):
+        if grid_size is not None and n_candidates > grid_size:
+            # A small grid needs fewer rounds; the bracket then starts later so it still ends at max_resources.
+            n_candidates = grid_size
+            rounds = min(int(math.floor(math.log(n_candidates, factor) + 1e-9)), int(round(math.log(max_resources / bracket_min, factor))))
+            bracket_min = max(int(max_resources // factor ** rounds), 1)
+        if (n_candidates, bracket_min) in seen:
+            continue
+        seen.add((n_candidates, bracket_min))
+        search = HalvingRandomSearchCV(model, param_grid, n_candidates=n_candidates, factor=factor, resource=resource,
+                                       min_resources=bracket_min, max_resources=max_resources, cv=cv, scoring=scoring,
+                                       refit=False, random_state=random_state, n_jobs=n_jobs)
+        search.fit(X, y)
+        logging.info(f"Hyperband bracket with {n_candidates} candidates from {bracket_min} {resource}: best score {search.best_score_:.4f}")
+        if best is None or search.best_score_ > best.best_score_:
+            best = search
+    best_estimator = clone(model).set_params(**best.best_params_).fit(X, y)
+    return best_estimator, best.best_params_, best.best_score_
+
+def optimize_hyperparameters(model, param_grid, X, y, cv=5, n_iter=None, scoring=None, search_type='grid', resource='n_samples', factor=3,
+                             min_resources='exhaust', max_resources='auto', n_jobs=None, random_state=None, storage=None):
     """
-    Perform hyperparameter optimization for a given model using Grid Search or Randomized Search.
+    Perform hyperparameter optimization for a given model using Grid Search, Randomized Search, Successive Halving, Hyperband
+    or a Bayesian (TPE) search.
 
     Parameters:
     - model: The model instance to optimize.
-    - param_grid (dict): The parameter grid to search over.
+    - param_grid (dict): The parameter grid to search over. For 'hyperband', 'bayesian' (and 'halving' with n_iter) the
+      values may also be scipy.stats distributions.
     - X: Features dataset.
     - y: Target dataset.
     - cv (int, optional): Number of cross-validation folds. Defaults to 5.
     - n_iter (int, optional): Number of parameter settings sampled for RandomizedSearchCV. Use only if search_type='random'.
+      With search_type='halving', the number of candidates sampled for the first round instead of trying the whole grid.
+      With search_type='bayesian', the number of trials (50 if not given).
     - scoring (str, optional): A single string to evaluate the predictions on the test set. For example, 'accuracy'.
-    - search_type (str, optional): Type of search to perform. Can be 'grid' for GridSearchCV or 'random' for RandomizedSearchCV.
+    - search_type (str, optional): Type of search to perform. Can be 'grid' for GridSearchCV, 'random' for RandomizedSearchCV,
+      'halving' for successive halving, 'hyperband' for several successive-halving brackets with different starting budgets
+      or 'bayesian' for a TPE search that learns from earlier trials (see tpe.bayesian_search).
+    - resource (str, optional): The budget that grows from round to round in 'halving' and 'hyperband': 'n_samples', or the
+      name of a model parameter such as 'n_estimators' or 'max_iter'.
+    - factor (int, optional): Each round keeps 1/factor of the candidates and multiplies their budget by factor.
+    - min_resources (int or str, optional): The budget of the first round. 'exhaust' sizes it so that the last round uses max_resources.
+    - max_resources (int or str, optional): The largest budget. 'auto' is the number of samples; it must be given for a parameter resource.
+    - n_jobs (int, optional): Number of parallel jobs. None runs 'halving' and 'hyperband' on all cores and 'grid' and 'random' sequentially.
+    - random_state (int, optional): Seed for sampling candidates and subsampling rows.
+    - storage (str, optional): With search_type='bayesian', the SQLite file recording the trials, so an interrupted
+      search resumes and later searches on the same data are warm-started.
 
     Returns:
     - The best estimator model after hyperparameter optimization.
@@ -74,12 +145,30 @@ def optimize_hyperparameters(model, param_grid, X, y, cv=5, n_iter=None, scoring
         raise ValueError("n_iter must be specified when using RandomizedSearchCV.")
     
     try:
+        if search_type in ('halving', 'hyperband') and n_jobs is None:
+            n_jobs = -1
         if search_type == 'grid':
-            search = GridSearchCV(model, param_grid, cv=cv, scoring=scoring)
+            search = GridSearchCV(model, param_grid, cv=cv, scoring=scoring, n_jobs=n_jobs)
         elif search_type == 'random':
-            search = RandomizedSearchCV(model, param_grid, n_iter=n_iter, cv=cv, scoring=scoring)
+            search = RandomizedSearchCV(model, param_grid, n_iter=n_iter, cv=cv, scoring=scoring, n_jobs=n_jobs, random_state=random_state)
+        elif search_type == 'halving' and n_iter is None:
+            search = HalvingGridSearchCV(model, param_grid, factor=factor, resource=resource, min_resources=min_resources,
+                                         max_resources=max_resources, cv=cv, scoring=scoring, n_jobs=n_jobs, random_state=random_state)
+        elif search_type == 'halving':
+            search = HalvingRandomSearchCV(model, param_grid, n_candidates=n_iter, factor=factor, resource=resource, min_resources=min_resources,
+                                           max_resources=max_resources, cv=cv, scoring=scoring, n_jobs=n_jobs, random_state=random_state)
+        elif search_type == 'hyperband':
+            best_estimator, best_params, best_score = _hyperband_search(model, param_grid, X, y, cv, scoring, resource, factor,
+                                                                        min_resources, max_resources, n_jobs, random_state)
+            logging.info(f"Best parameters found: {best_params}")
+            logging.info(f"Best score achieved: {best_score}")
+            return best_estimator, best_params
+        elif search_type == 'bayesian':
+            from .tpe import bayesian_search
+            return bayesian_search(model, param_grid, X, y, n_trials=n_iter or 50, cv=cv, scoring=scoring, n_jobs=n_jobs or 1,
+                                   storage=storage, random_state=random_state)
         else:
-            raise ValueError("Invalid search_type. Choose either 'grid' or 'random'.")
+            raise ValueError("Invalid search_type. Choose 'grid', 'random', 'halving', 'hyperband' or 'bayesian'.")
 
         search.fit(X, y)
         logging.info(f"Best parameters found: {search.best_params_}")
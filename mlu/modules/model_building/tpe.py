@@ -0,0 +1,326 @@
+"""
+Sequential model-based hyperparameter search with a Tree-structured Parzen Estimator (TPE).
+
+After a few random startup trials, every new candidate is drawn where the density of the best
+trials so far is high relative to the density of the others. Numeric dimensions are given as
+scipy.stats distributions and modeled in their quantile space (u = cdf(value), value = ppf(u)),
+so a log-uniform or integer prior needs no special casing; lists are categorical dimensions.
+
+Trials are evaluated asynchronously by a process pool: a new candidate is proposed as soon as
+any worker is free, with the trials still running counted as bad so that workers do not
+duplicate each other. Every trial is written to a SQLite TrialStore as it starts and finishes,
+so an interrupted search resumes where it stopped, and a new search on the same data and model
+(fingerprinted with hash_data), scored the same way, is warm-started from the trials recorded by
+earlier searches.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import cross_val_score
+from .._hashing import hash_data
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_U_EPSILON = 1e-6
+
+class TrialStore:
+    """
+    Records hyperparameter trials in a SQLite database.
+
+    Parameters:
+    - path (str): The database file. ':memory:' keeps the trials for the lifetime of the store only.
+    """
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS trials (id INTEGER PRIMARY KEY AUTOINCREMENT, study TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "model TEXT NOT NULL, params TEXT NOT NULL, score REAL, state TEXT NOT NULL, started REAL, finished REAL, evaluation TEXT)"
+        )
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(trials)")]
+        if 'evaluation' not in columns:
+            # Stores written before scores were tagged with their scoring and cv; their trials are never warm-started from.
+            self.connection.execute("ALTER TABLE trials ADD COLUMN evaluation TEXT")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS trials_fingerprint ON trials (fingerprint, model)")
+        self.connection.commit()
+
+    def start(self, study, fingerprint, model, params, evaluation=None):
+        cursor = self.connection.execute(
+            "INSERT INTO trials (study, fingerprint, model, params, state, started, evaluation) VALUES (?, ?, ?, ?, 'running', ?, ?)",
+            (study, fingerprint, model, json.dumps(params, sort_keys=True), time.time(), evaluation))
+        self.connection.commit()
+        return cursor.lastrowid
+
+    def finish(self, trial_id, score):
+        state = 'complete' if score is not None and math.isfinite(score) else 'failed'
+        self.connection.execute("UPDATE trials SET score = ?, state = ?, finished = ? WHERE id = ?",
+                                (score if state == 'complete' else None, state, time.time(), trial_id))
+        self.connection.commit()
+
+    def abandon_running(self, study):
+        """
+        Marks the trials an interrupted search left running as failed, so they are proposed again.
+        """
+        self.connection.execute("UPDATE trials SET state = 'failed' WHERE study = ? AND state = 'running'", (study,))
+        self.connection.commit()
+
+    def completed(self, study=None, fingerprint=None, model=None, evaluation=None, exclude_study=None):
+        """
+        Returns the completed trials matching the filters as a list of (params, score).
+        """
+        query, args = "SELECT params, score FROM trials WHERE state = 'complete'", []
+        for column, value in (('study', study), ('fingerprint', fingerprint), ('model', model), ('evaluation', evaluation)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                args.append(value)
+        if exclude_study is not None:
+            query += " AND study != ?"
+            args.append(exclude_study)
+        return [(json.loads(params), score) for params, score in self.connection.execute(query + " ORDER BY id", args)]
+
+    def close(self):
+        self.connection.close()
+
+def _describe_space(param_space):
+    description = {}
+    for name, values in sorted(param_space.items()):
+        if hasattr(values, 'ppf'):
+            description[name] = f"{values.dist.name}{values.args}{sorted(values.kwds.items())}"
+        else:
+            description[name] = repr(list(values))
+    return description
+
+class _Space:
+    """
+    Maps parameter settings to and from positions: a quantile u in (0, 1) for numeric dimensions
+    and a choice index for categorical ones.
+    """
+    def __init__(self, param_space):
+        self.names = sorted(param_space)
+        self.dimensions = [param_space[name] for name in self.names]
+        self.numeric = [hasattr(dimension, 'ppf') for dimension in self.dimensions]
+
+    def sample(self, rng):
+        return [rng.uniform(_U_EPSILON, 1 - _U_EPSILON) if numeric else int(rng.integers(len(dimension)))
+                for dimension, numeric in zip(self.dimensions, self.numeric)]
+
+    def params(self, position):
+        params = {}
+        for name, dimension, numeric, value in zip(self.names, self.dimensions, self.numeric, position):
+            if not numeric:
+                params[name] = dimension[value]
+            elif hasattr(dimension, 'pmf'):
+                params[name] = int(dimension.ppf(value))
+            else:
+                params[name] = float(dimension.ppf(value))
+        return params
+
+    def position(self, params):
+        """
+        Returns the position of a recorded setting, or None if it lies outside this space.
+        """
+        position = []
+        for name, dimension, numeric in zip(self.names, self.dimensions, self.numeric):
+            if name not in params:
+                return None
+            value = params[name]
+            if numeric:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    return None
+                if (dimension.pmf(value) if hasattr(dimension, 'pmf') else dimension.pdf(value)) == 0:
+                    return None
+                position.append(float(np.clip(dimension.cdf(value), _U_EPSILON, 1 - _U_EPSILON)))
+            else:
+                choices = [json.loads(json.dumps(choice)) for choice in dimension]
+                if value not in choices:
+                    return None
+                position.append(choices.index(value))
+        return position
+
+def _bandwidth(points):
+    n = len(points)
+    return max(1.06 * np.std(points) * n ** -0.2, 0.05) if n > 1 else 0.25
+
+def _numeric_log_density(points, candidates):
+    # A Parzen estimator in quantile space: Gaussian kernels on the observed points plus a uniform
+    # prior component that keeps every region reachable.
+    n = len(points)
+    if n == 0:
+        return np.zeros(len(candidates))
+    bandwidth = _bandwidth(points)
+    kernels = np.exp(-0.5 * ((candidates[:, None] - points[None, :]) / bandwidth) ** 2) / (bandwidth * math.sqrt(2 * math.pi))
+    return np.log((kernels.sum(axis=1) + 1.0) / (n + 1))
+
+def _sample_numeric(points, rng, size):
+    n = len(points)
+    bandwidth = _bandwidth(points)
+    component = rng.integers(n + 1, size=size)
+    samples = rng.uniform(0, 1, size=size)
+    from_kernel = component < n
+    samples[from_kernel] = points[component[from_kernel]] + bandwidth * rng.standard_normal(from_kernel.sum())
+    return np.clip(samples, _U_EPSILON, 1 - _U_EPSILON)
+
+def _propose(space, observations, pending, rng, gamma=0.25, n_startup_trials=10, n_candidates=24):
+    """
+    Proposes the next position to evaluate.
+
+    Parameters:
+    - space (_Space): The search space.
+    - observations (list): (position, score) pairs of the completed trials; higher scores are better.
+    - pending (list): Positions of trials still running. They are counted as bad trials.
+    - rng (numpy.random.Generator): The random generator.
+    - gamma (float): Fraction of the trials treated as good.
+    - n_startup_trials (int): Number of observations before the proposals stop being random.
+    - n_candidates (int): Number of candidates drawn from the good density per proposal.
+
+    Returns:
+    - list: The proposed position.
+    """
+    if len(observations) < n_startup_trials:
+        return space.sample(rng)
+    ranked = sorted(observations, key=lambda observation: -observation[1])
+    n_good = max(1, int(math.ceil(gamma * len(ranked))))
+    good = [position for position, _ in ranked[:n_good]]
+    bad = [position for position, _ in ranked[n_good:]] + list(pending)
+    columns = []
+    score = np.zeros(n_candidates)
+    for d, (dimension, numeric) in enumerate(zip(space.dimensions, space.numeric)):
+        good_values = np.array([position[d] for position in good], dtype=np.float64)
+        bad_values = np.array([position[d] for position in bad], dtype=np.float64)
+        if numeric:
+            candidates = _sample_numeric(good_values, rng, n_candidates)
+            score += _numeric_log_density(good_values, candidates) - _numeric_log_density(bad_values, candidates)
+        else:
+            k = len(dimension)
+            good_probabilities = (np.bincount(good_values.astype(np.int64), minlength=k) + 1.0) / (len(good_values) + k)
+            bad_probabilities = (np.bincount(bad_values.astype(np.int64), minlength=k) + 1.0) / (len(bad_values) + k)
+            candidates = rng.choice(k, size=n_candidates, p=good_probabilities)
+            score += np.log(good_probabilities[candidates]) - np.log(bad_probabilities[candidates])
+        columns.append(candidates)
+    best = int(np.argmax(score))
+    return [float(column[best]) if numeric else int(column[best]) for column, numeric in zip(columns, space.numeric)]
+
+_WORKER_TASK = None
+
+def _init_worker(model, X, y, cv, scoring):
+    global _WORKER_TASK
+    _WORKER_TASK = (model, X, y, cv, scoring)
+
+def _clear_worker():
+    global _WORKER_TASK
+    _WORKER_TASK = None
+
+def _evaluate(params):
+    model, X, y, cv, scoring = _WORKER_TASK
+    try:
+        return float(np.mean(cross_val_score(clone(model).set_params(**params), X, y, cv=cv, scoring=scoring)))
+    except Exception as e:
+        logging.warning(f"Trial {params} failed: {e}")
+        return None
+
+def bayesian_search(model, param_space, X, y, n_trials=50, cv=5, scoring=None, n_jobs=1, storage=None, warm_start=True,
+                    random_state=None, n_startup_trials=10, gamma=0.25):
+    """
+    Tunes a model with TPE, evaluating trials in parallel and recording them in a SQLite store.
+
+    Parameters:
+    - model: The model instance to tune.
+    - param_space (dict): Maps parameter names to a list of choices or a scipy.stats distribution, e.g.
+      {'max_depth': [2, 4, None], 'learning_rate': loguniform(1e-3, 1)}. Choices must be JSON serializable.
+    - X: Features dataset.
+    - y: Target dataset.
+    - n_trials (int): Number of trials of this search, including those recorded before an interruption.
+    - cv (int): Number of cross-validation folds per trial.
+    - scoring (str, optional): The scoring metric; higher is better.
+    - n_jobs (int): Number of trials evaluated at the same time. -1 uses all processors.
+    - storage (str or TrialStore, optional): The SQLite file (or store) of the trial history. Defaults to
+      an in-memory store, in which case nothing is resumed or warm-started.
+    - warm_start (bool): Whether completed trials of other searches on the same data and model, with the
+      same scoring and cv, that lie in param_space are used as observations. They do not count towards
+      n_trials and are not candidates for the returned best, which comes from this search's trials.
+    - random_state (int, optional): Seed for the proposals.
+    - n_startup_trials (int): Number of random trials before TPE takes over.
+    - gamma (float): Fraction of the trials treated as good.
+
+    Returns:
+    - The best estimator, refit on the full data.
+    - The best parameter set found.
+    """
+    try:
+        store = storage if isinstance(storage, TrialStore) else TrialStore(storage or ':memory:')
+        space = _Space(param_space)
+        model_name = type(model).__name__
+        fingerprint = hash_data(X) + hash_data(y)
+        # Scores are only comparable between trials with the same scoring and cross-validation.
+        evaluation = json.dumps({'cv': repr(cv), 'scoring': repr(scoring)}, sort_keys=True)
+        study = hashlib.blake2b(json.dumps({'model': repr(model), 'space': _describe_space(param_space), 'cv': repr(cv),
+                                            'scoring': repr(scoring), 'data': fingerprint}).encode(), digest_size=16).hexdigest()
+        store.abandon_running(study)
+        observations, history = [], []
+        recorded = store.completed(study=study)
+        done = len(recorded)
+        if warm_start:
+            recorded += store.completed(fingerprint=fingerprint, model=model_name, evaluation=evaluation, exclude_study=study)
+        for index, (params, score) in enumerate(recorded):
+            # Recorded settings are mapped back through the space, which restores choices JSON turned into lists.
+            position = space.position(params)
+            if position is not None:
+                observations.append((position, score))
+                if index < done:
+                    history.append((space.params(position), score))
+        logging.info(f"TPE search resumed {done} trial(s) and warm-started from {len(observations) - len(history)} earlier trial(s).")
+
+        rng = np.random.default_rng(random_state)
+        n_jobs = os.cpu_count() if n_jobs == -1 else max(n_jobs, 1)
+        remaining = max(n_trials - done, 0)
+
+        def record(trial_id, position, params, score):
+            store.finish(trial_id, score)
+            if score is not None and math.isfinite(score):
+                observations.append((position, score))
+                history.append((params, score))
+
+        if n_jobs == 1:
+            _init_worker(model, X, y, cv, scoring)
+            try:
+                for _ in range(remaining):
+                    position = _propose(space, observations, [], rng, gamma, n_startup_trials)
+                    params = space.params(position)
+                    trial_id = store.start(study, fingerprint, model_name, params, evaluation)
+                    record(trial_id, position, params, _evaluate(params))
+            finally:
+                # In-process trials share this module's global; drop the reference to the data once done.
+                _clear_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(model, X, y, cv, scoring)) as executor:
+                running = {}
+                while remaining or running:
+                    while remaining and len(running) < n_jobs:
+                        position = _propose(space, observations, [entry[1] for entry in running.values()], rng, gamma, n_startup_trials)
+                        params = space.params(position)
+                        trial_id = store.start(study, fingerprint, model_name, params, evaluation)
+                        running[executor.submit(_evaluate, params)] = (trial_id, position, params)
+                        remaining -= 1
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(*running.pop(future), future.result())
+        if not history:
+            raise ValueError("No trial completed successfully.")
+        best_params, best_score = max(history, key=lambda entry: entry[1])
+        logging.info(f"Best parameters found: {best_params}")
+        logging.info(f"Best score achieved: {best_score}")
+        best_estimator = clone(model).set_params(**best_params).fit(X, y)
+        if not isinstance(storage, TrialStore):
+            store.close()
+        return best_estimator, best_params
+    except Exception as e:
+        logging.error("An error occurred during the TPE search: %s", e, exc_info=True)
+        raise
@@ -0,0 +1,171 @@
+"""
+Streaming training for the Keras networks built by initialize_neural_network.
+
+The training rows are read chunk by chunk from in-memory arrays, memory-mapped arrays, .npy
+files or a chunk iterator, and fed to the network through a tf.data pipeline (shuffle buffer,
+batching, parallel map, prefetch). Only a few chunks are resident at a time, so the dataset can
+be larger than RAM. TensorFlow is imported when a pipeline is first built.
+"""
+
+import time
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TRAINING_CHUNK_SIZE = 8192
+
+def _open(array):
+    if isinstance(array, str):
+        return np.load(array, mmap_mode='r')
+    return array
+
+def _chunk_factory(X, y, chunk_size, shuffle, seed, dtype):
+    """
+    Returns a function that starts a new pass over the data and yields (X, y) chunks.
+
+    Arrays are sliced into chunks of chunk_size rows; when shuffling, the chunk order and the rows
+    within each chunk are permuted on every pass. A callable X is called once per pass and must
+    return an iterator of (X_chunk, y_chunk) pairs.
+    """
+    rng = np.random.default_rng(seed)
+    if callable(X):
+        def chunks():
+            for X_chunk, y_chunk in X():
+                yield np.asarray(X_chunk, dtype=dtype), np.asarray(y_chunk, dtype=dtype)
+        return chunks
+    X, y = _open(X), _open(y)
+    if len(X) != len(y):
+        raise ValueError("X and y must have the same number of rows.")
+
+    def chunks():
+        starts = np.arange(0, len(X), chunk_size)
+        if shuffle:
+            rng.shuffle(starts)
+        for start in starts:
+            X_chunk = np.asarray(X[start:start + chunk_size], dtype=dtype)
+            y_chunk = np.asarray(y[start:start + chunk_size], dtype=dtype)
+            if shuffle:
+                order = rng.permutation(len(X_chunk))
+                X_chunk, y_chunk = X_chunk[order], y_chunk[order]
+            yield X_chunk, y_chunk
+    return chunks
+
+def make_dataset(X, y=None, batch_size=256, shuffle=True, shuffle_buffer=None, map_fn=None, chunk_size=TRAINING_CHUNK_SIZE, seed=None, dtype='float32', counter=None):
+    """
+    Builds a tf.data pipeline that streams (features, labels) batches.
+
+    Parameters:
+    - X (numpy.ndarray, numpy.memmap, str or callable): The features, the path of a .npy file, or a
+      function returning an iterator of (X_chunk, y_chunk) pairs (called once per epoch).
+    - y (numpy.ndarray, numpy.memmap or str, optional): The labels. Not used when X is a callable.
+    - batch_size (int): Number of rows per batch.
+    - shuffle (bool): Whether to shuffle the chunk order, the rows within chunks and, through the
+      shuffle buffer, rows across neighbouring chunks.
+    - shuffle_buffer (int, optional): Size of the tf.data shuffle buffer in rows. Defaults to
+      chunk_size when shuffling; 0 disables it.
+    - map_fn (callable, optional): A function of (features, labels) applied to every batch with
+      parallel calls, e.g. for augmentation or feature scaling.
+    - chunk_size (int): Number of rows read from the source at a time.
+    - seed (int, optional): Seed for the shuffles.
+    - dtype (str): The dtype rows are converted to while reading.
+    - counter (list, optional): If given, counter[0] is incremented by the rows read.
+
+    Returns:
+    - tf.data.Dataset: The batched, prefetched dataset.
+    """
+    try:
+        import tensorflow as tf
+
+        chunks = _chunk_factory(X, y, chunk_size, shuffle, seed, dtype)
+        first_X, first_y = next(iter(chunks()))
+
+        def generator():
+            for X_chunk, y_chunk in chunks():
+                if counter is not None:
+                    counter[0] += len(X_chunk)
+                yield X_chunk, y_chunk
+
+        signature = (
+            tf.TensorSpec(shape=(None,) + first_X.shape[1:], dtype=dtype),
+            tf.TensorSpec(shape=(None,) + first_y.shape[1:], dtype=dtype),
+        )
+        dataset = tf.data.Dataset.from_generator(generator, output_signature=signature)
+        if shuffle_buffer is None:
+            shuffle_buffer = chunk_size if shuffle else 0
+        if shuffle_buffer:
+            dataset = dataset.unbatch().shuffle(shuffle_buffer, seed=seed).batch(batch_size)
+        else:
+            # Without a shuffle buffer the chunks are cut into batches without splitting them into rows.
+            dataset = dataset.rebatch(batch_size)
+        if not callable(X):
+            # With a known number of batches Keras does not have to discover the epoch end by exhausting the generator.
+            dataset = dataset.apply(tf.data.experimental.assert_cardinality(-(-len(_open(X)) // batch_size)))
+        if map_fn is not None:
+            dataset = dataset.map(map_fn, num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    except Exception as e:
+        logging.error("An error occurred while building the training dataset: %s", e, exc_info=True)
+        raise
+
+def _throughput_callback(counter, report):
+    from tensorflow import keras
+
+    class Throughput(keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+            self.samples = counter[0]
+
+        def on_epoch_end(self, epoch, logs=None):
+            seconds = time.perf_counter() - self.start
+            samples = counter[0] - self.samples
+            report['epochs'].append({'samples': samples, 'seconds': seconds, 'samples_per_second': samples / seconds if seconds else float('inf')})
+
+    return Throughput()
+
+def train_neural_network(model, X, y=None, epochs=1, batch_size=256, shuffle=True, shuffle_buffer=None, map_fn=None, chunk_size=TRAINING_CHUNK_SIZE,
+                         jit_compile=False, optimizer='adam', loss=None, metrics=None, validation_data=None, seed=None, verbose=0):
+    """
+    Trains a Keras model from a streaming tf.data pipeline and reports its throughput.
+
+    Parameters:
+    - model (keras.Model): The network, e.g. from initialize_neural_network. It is compiled here if it
+      was not compiled yet or if a loss is given.
+    - X, y: The training data, as accepted by make_dataset.
+    - epochs (int): Number of passes over the data.
+    - batch_size, shuffle, shuffle_buffer, map_fn, chunk_size, seed: Passed to make_dataset.
+    - jit_compile (bool): If True, the train step is compiled with XLA, which also applies on CPU.
+    - optimizer (str or keras.optimizers.Optimizer): The optimizer used when compiling.
+    - loss (str or callable, optional): The loss used when compiling. Defaults to binary cross-entropy,
+      matching the sigmoid output of initialize_neural_network.
+    - metrics (list, optional): Metrics used when compiling.
+    - validation_data (tuple, optional): (X_val, y_val) evaluated after each epoch, without shuffling.
+    - verbose (int): Keras verbosity.
+
+    Returns:
+    - keras.Model: The trained model.
+    - dict: The throughput report with the total 'samples', 'seconds' and 'samples_per_second', the
+      per-epoch figures under 'epochs' and the Keras history under 'history'.
+    """
+    try:
+        if loss is not None or getattr(model, 'optimizer', None) is None:
+            model.compile(optimizer=optimizer, loss=loss or 'binary_crossentropy', metrics=metrics, jit_compile=jit_compile)
+        elif jit_compile:
+            model.jit_compile = True
+        counter = [0]
+        dataset = make_dataset(X, y, batch_size, shuffle, shuffle_buffer, map_fn, chunk_size, seed, counter=counter)
+        validation = None
+        if validation_data is not None:
+            validation = make_dataset(validation_data[0], validation_data[1], batch_size, shuffle=False, chunk_size=chunk_size)
+        report = {'epochs': []}
+        start = time.perf_counter()
+        history = model.fit(dataset, epochs=epochs, validation_data=validation, callbacks=[_throughput_callback(counter, report)], shuffle=False, verbose=verbose)
+        report['seconds'] = time.perf_counter() - start
+        report['samples'] = sum(epoch['samples'] for epoch in report['epochs'])
+        report['samples_per_second'] = report['samples'] / report['seconds'] if report['seconds'] else float('inf')
+        report['history'] = history.history
+        logging.info(f"Trained {epochs} epoch(s) on {report['samples']} samples at {report['samples_per_second']:.0f} samples/s.")
+        return model, report
+    except Exception as e:
+        logging.error("An error occurred while training the neural network: %s", e, exc_info=True)
+        raise
@@ -1 +1,5 @@
-from .model_evaluation import calculate_metrics, plot_roc_curve, plot_confusion_matrix
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    'model_evaluation': ['calculate_metrics', 'plot_roc_curve', 'plot_confusion_matrix'],
+})
@@ -1,7 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_curve, auc, confusion_matrix
-import seaborn as sns
+from .._lazy import plotting
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -35,6 +34,7 @@ def plot_roc_curve(y_true, y_scores, save_path=None):
     - save_path: Optional path to save the plot image
     """
     try:
+        plt, sns = plotting()
         fpr, tpr, _ = roc_curve(y_true, y_scores)
         roc_auc = auc(fpr, tpr)
         
@@ -64,6 +64,7 @@ def plot_confusion_matrix(y_true, y_pred, save_path=None):
     - save_path: Optional path to save the plot image
     """
     try:
+        plt, sns = plotting()
         matrix = confusion_matrix(y_true, y_pred)
         sns.heatmap(matrix, annot=True, fmt='d', cmap=plt.cm.Blues)
         plt.xlabel('Predicted Label')
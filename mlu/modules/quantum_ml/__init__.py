@@ -1,2 +1,6 @@
-from .quantum_ml import QuantumML
-from .extensions import custom_quantum_algorithm
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    'quantum_ml': ['QuantumML'],
+    'extensions': ['custom_quantum_algorithm'],
+})
@@ -1,6 +1,5 @@
 # This file is for extending the QuantumML module with custom functions.
 import logging
-from qiskit import QuantumCircuit, execute, Aer
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -46,6 +45,7 @@ def custom_quantum_superposition():
     Demonstrates placing a qubit in superposition and measuring the outcome.
     """
     try:
+        from qiskit import QuantumCircuit, Aer, execute
         qc = QuantumCircuit(1, 1)
         qc.h(0)
         qc.measure([0], [0])
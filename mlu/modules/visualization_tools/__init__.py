@@ -1 +1,5 @@
-from .visualization_tools import plot_feature_importance, plot_decision_boundaries, plot_model_predictions
\ No newline at end of file
+from .._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    'visualization_tools': ['plot_feature_importance', 'plot_decision_boundaries', 'plot_model_predictions'],
+})
@@ -1,7 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.inspection import permutation_importance
+from .._lazy import plotting
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,6 +20,7 @@ def plot_feature_importance(model, feature_names, X=None, y=None, n_repeats=10,
     - save_path (str, optional): Path to save the plot image.
     """
     try:
+        plt, sns = plotting()
         importance_vals = model.feature_importances_
         sns.barplot(x=importance_vals, y=feature_names)
         plt.title('Feature Importance')
@@ -55,6 +55,7 @@ def plot_decision_boundaries(model, X, y, save_path=None):
     - save_path (str, optional): Path to save the plot image.
     """
     try:
+        plt, sns = plotting()
         x_min, x_max = X[:, 0].min() - 1, X[:, 0].max() + 1
         y_min, y_max = X[:, 1].min() - 1, X[:, 1].max() + 1
         xx, yy = np.meshgrid(np.arange(x_min, x_max, 0.1),
@@ -82,6 +83,7 @@ def plot_model_predictions(model, X, y, save_path=None):
     - save_path (str, optional): Path to save the plot image.
     """
     try:
+        plt, sns = plotting()
         predictions = model.predict(X)
         plt.figure(figsize=(10, 5))
         plt.plot(predictions, label='Predictions')
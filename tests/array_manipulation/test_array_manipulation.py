@@ -21,4 +21,121 @@ def test_summary():
     assert result['std'] != 0
     assert result['min'] == 1
     assert result['max'] == 4
-    assert '25%' in result and '50%' in result and '75%' in result
\ No newline at end of file
+    assert '25%' in result and '50%' in result and '75%' in result
+
+def test_summary_per_column_matches_numpy():
+    array = np.random.default_rng(0).normal(size=(200, 4))
+    result = summary(array, axis=0, percentiles=(10, 50, 90))
+    np.testing.assert_allclose(result['mean'], array.mean(axis=0))
+    np.testing.assert_allclose(result['std'], array.std(axis=0))
+    np.testing.assert_allclose(result['10%'], np.percentile(array, 10, axis=0))
+    np.testing.assert_allclose(result['max'], array.max(axis=0))
+
+def test_summary_skipna():
+    array = np.array([[1.0, np.nan], [3.0, 4.0], [np.nan, 8.0]])
+    result = summary(array, axis=0, skipna=True)
+    np.testing.assert_array_equal(result['count'], [2, 2])
+    np.testing.assert_allclose(result['50%'], np.nanmedian(array, axis=0))
+    assert np.isnan(summary(array)['mean'])
+    mixed = np.array([[1.0, np.nan, 5.0], [np.nan, np.nan, 2.0], [3.0, np.nan, 7.0], [9.0, 6.0, 4.0]])
+    result = summary(mixed, axis=0, skipna=True)
+    np.testing.assert_allclose(result['mean'], np.nanmean(mixed, axis=0))
+    np.testing.assert_allclose(result['std'], np.nanstd(mixed, axis=0))
+    np.testing.assert_allclose(result['25%'], np.nanpercentile(mixed, 25, axis=0))
+    with np.errstate(all='raise'):
+        assert np.isnan(summary(np.array([1.0, np.nan, np.nan, np.nan]))['50%'])
+
+def test_sketches_merge_and_serialize():
+    from modules.array_manipulation import SummarySketch
+    data = np.random.default_rng(1).normal(size=100000)
+    shards = [SummarySketch(seed=i).update(chunk) for i, chunk in enumerate(np.array_split(data, 4))]
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(SummarySketch.from_bytes(shard.to_bytes()))
+    result = merged.summary()
+    assert result['count'] == data.size
+    np.testing.assert_allclose([result['mean'], result['std']], [data.mean(), data.std()])
+    ranks = np.searchsorted(np.sort(data), [result['25%'], result['50%'], result['75%']]) / data.size
+    np.testing.assert_allclose(ranks, [0.25, 0.5, 0.75], atol=0.0165)
+    assert abs(result['distinct'] - data.size) / data.size < 0.03
+
+def test_grouped_multi_aggregate():
+    values = np.array([1.0, 5.0, 2.0, 8.0, 3.0])
+    keys = np.array([2, 0, 2, 0, 7])
+    result = aggregate(values, ops=['sum', 'mean', 'min', 'max', 'count'], by=keys)
+    np.testing.assert_array_equal(result['key'], [0, 2, 7])
+    np.testing.assert_array_equal(result['sum'], [13.0, 3.0, 3.0])
+    np.testing.assert_array_equal(result['mean'], [6.5, 1.5, 3.0])
+    np.testing.assert_array_equal(result['min'], [5.0, 1.0, 3.0])
+    np.testing.assert_array_equal(result['max'], [8.0, 2.0, 3.0])
+    np.testing.assert_array_equal(result['count'], [2, 2, 1])
+    dense = aggregate(values, ops=['sum', 'count'], by=np.array([1, 0, 1, 0, 2]))
+    np.testing.assert_array_equal(dense['sum'], [13.0, 3.0, 3.0])
+    flags = aggregate(values, ops=['sum', 'mean'], by=np.array([True, False, True, False, True]))
+    np.testing.assert_array_equal(flags['key'], [False, True])
+    np.testing.assert_array_equal(flags['sum'], [13.0, 6.0])
+    empty = aggregate(np.array([]), ops=['sum', 'mean', 'std', 'count'], by=np.array([], dtype=int))
+    assert all(isinstance(value, np.ndarray) and value.size == 0 for value in empty.values())
+
+def test_grouped_sums_keep_integer_dtype_and_join_nan_keys():
+    values = np.array([2 ** 53 + 1, 1, 2 ** 53 + 1, 5], dtype=np.int64)
+    dense = aggregate(values, ops=['sum'], by=np.array([0, 1, 0, 1]))
+    sorted_path = aggregate(values, ops=['sum', 'max'], by=np.array([0, 1, 0, 1]))
+    assert dense['sum'].dtype == sorted_path['sum'].dtype == np.int64
+    np.testing.assert_array_equal(dense['sum'], [2 ** 54 + 2, 6])
+    np.testing.assert_array_equal(sorted_path['sum'], dense['sum'])
+    result = aggregate(np.arange(5.0), ops=['sum', 'count'], by=np.array([np.nan, 1.0, np.nan, 0.0, np.nan]))
+    np.testing.assert_array_equal(result['key'], [0.0, 1.0, np.nan])
+    np.testing.assert_array_equal(result['sum'], [3.0, 1.0, 6.0])
+    np.testing.assert_array_equal(result['count'], [1, 1, 3])
+
+def test_filter_expression_outputs():
+    array = np.array([-1.0, 2.0, np.nan, 5.0, 12.0, 7.0, 0.5, 3.0, 9.0, -4.0])
+    expected = (array > 0) & (array < 10) & ~np.isnan(array)
+    np.testing.assert_array_equal(filter(array, "0 < x < 10 and not isnan(x)", block_size=8), array[expected])
+    np.testing.assert_array_equal(filter(array, "(x > 0) & (x < 10)", output='indices', block_size=8), np.flatnonzero(expected))
+    packed = filter(array, "(x > 0) & (x < 10)", output='mask', block_size=8)
+    np.testing.assert_array_equal(np.unpackbits(packed, count=array.size).astype(bool), expected)
+    matrix = np.arange(60.0).reshape(20, 3)
+    rows = filter(matrix, lambda block: block[:, 0] % 2 == 0, output='indices', block_size=8)
+    np.testing.assert_array_equal(rows, np.flatnonzero(matrix[:, 0] % 2 == 0))
+    elements = filter(matrix, "x > 40", output='indices', block_size=8)
+    np.testing.assert_array_equal(elements, np.flatnonzero(matrix > 40))
+
+def test_rolling_and_chunked_windows():
+    from modules.array_manipulation import rolling, expanding, ewm, RollingWindow, EWMWindow
+    series = np.array([4.0, 1.0, 3.0, 8.0, 2.0, 6.0, 5.0])
+    np.testing.assert_allclose(rolling(series, 3, 'mean')[2:], [8 / 3, 4.0, 13 / 3, 16 / 3, 13 / 3])
+    np.testing.assert_array_equal(rolling(series, 3, 'max', min_periods=1), [4, 4, 4, 8, 8, 8, 6])
+    np.testing.assert_array_equal(rolling(series, 3, 'median')[2:], [3, 3, 3, 6, 5])
+    assert np.isnan(rolling(series, 3, 'sum')[:2]).all()
+    np.testing.assert_allclose(expanding(series, 'var'), [np.var(series[:i + 1]) for i in range(7)])
+    chunks = [series[:2], series[2:3], series[3:]]
+    window = RollingWindow(3, 'std', min_periods=2)
+    np.testing.assert_allclose(np.concatenate([window.update(c) for c in chunks]), rolling(series, 3, 'std', min_periods=2))
+    smoother = EWMWindow(span=3)
+    np.testing.assert_allclose(np.concatenate([smoother.update(c) for c in chunks]), ewm(series, span=3))
+
+def test_windows_skip_missing_values():
+    import pandas as pd
+    from modules.array_manipulation import rolling, expanding, ewm, EWMWindow
+    series = np.array([4.0, np.nan, 3.0, 8.0, np.nan, np.nan, 5.0, 1.0])
+    frame = pd.Series(series)
+    np.testing.assert_allclose(rolling(series, 3, 'mean', min_periods=2), frame.rolling(3, min_periods=2).mean())
+    np.testing.assert_allclose(rolling(series, 3, 'std', min_periods=1, ddof=1), frame.rolling(3, min_periods=1).std())
+    np.testing.assert_allclose(rolling(series, 3, 'max', min_periods=1), frame.rolling(3, min_periods=1).max())
+    np.testing.assert_allclose(expanding(series, 'var', ddof=1), frame.expanding().var())
+    np.testing.assert_allclose(ewm(series, alpha=0.4, adjust=False), frame.ewm(alpha=0.4, adjust=False, ignore_na=True).mean())
+    smoother = EWMWindow(alpha=0.4, adjust=False)
+    chunks = [series[:0], series[1:2], series[:0], series]
+    np.testing.assert_allclose(np.concatenate([smoother.update(c) for c in chunks]),
+                               ewm(np.concatenate(chunks), alpha=0.4, adjust=False))
+
+def test_rolling_moments_do_not_cancel_across_a_level_shift():
+    from modules.array_manipulation import rolling
+    rng = np.random.default_rng(0)
+    series = np.concatenate([rng.normal(1e4, 50, size=1_000_000), np.full(1_000_000, 3.0)])
+    assert (rolling(series, 100, 'std')[-1000:] == 0).all()
+    np.testing.assert_array_equal(rolling(series, 100, 'mean')[-1000:], 3.0)
+    window = series[999_950:1_000_050]
+    np.testing.assert_allclose(rolling(series, 100, 'var', ddof=1)[1_000_049], window.var(ddof=1), rtol=1e-12)
@@ -1,4 +1,7 @@
 from modules.automl.automl import AutoML
+import os
+import subprocess
+import sys
 import unittest
 from sklearn.datasets import make_classification
 from sklearn.linear_model import LogisticRegression
@@ -27,5 +30,9 @@ class TestAutoML(unittest.TestCase):
         self.assertIsInstance(tuned_model, LogisticRegression, "The tuned model is not an instance of LogisticRegression.")
         self.assertIn(tuned_model.C, [0.1, 1.0, 10.0], "The tuned parameter C for LogisticRegression is not within the expected range.")
 
+    def test_imports_as_subpackage(self):
+        repository_root = os.path.dirname(os.path.dirname(os.path.dirname(sys.modules['modules'].__file__)))
+        subprocess.run([sys.executable, '-c', "import mlu.modules.automl"], cwd=repository_root, check=True)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
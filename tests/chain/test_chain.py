@@ -0,0 +1,227 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from modules.chain import Chain, ChainCache
+
+IMPORT_BUDGET_SECONDS = 5.0
+
+def test_lazy_chain_matches_eager():
+    data = np.arange(-50, 150)
+    eager = Chain(data).filter(lambda x: x > 0).map(lambda x: x * 2).normalize().value()
+    lazy = Chain(data, lazy=True, block_size=16).filter(lambda x: x > 0).map(lambda x: x * 2).normalize().value()
+    np.testing.assert_allclose(lazy, eager)
+
+def test_lazy_chain_records_plan_until_value():
+    chain = Chain(np.array([3.0, 1.0, 2.0]), lazy=True).normalize().map(lambda x: x + 1)
+    assert [node.name for node in chain._plan] == ['normalize', 'map']
+    np.testing.assert_array_equal(chain.data, np.array([3.0, 1.0, 2.0]))
+    np.testing.assert_allclose(chain.value(), np.array([2.0, 1.0, 1.5]))
+    assert chain._plan == []
+
+def test_lazy_chain_with_barrier_step():
+    data = np.array([1, 2, 3, 4, 5])
+    result = Chain(data, lazy=True, block_size=2).filter(lambda x: x > 2).aggregate('sum').value()
+    np.testing.assert_array_equal(result, np.array([12]))
+
+def test_map_reports_vectorized_and_elementwise_paths():
+    data = np.array([1.0, 4.0, 9.0])
+    chain = Chain(data).map(np.sqrt)
+    assert chain.map_path == 'vectorized'
+    np.testing.assert_array_equal(chain.value(), np.array([1.0, 2.0, 3.0]))
+    chain = Chain(data).map(lambda x: x if x > 2 else 0.0)
+    assert chain.map_path == 'elementwise'
+    np.testing.assert_array_equal(chain.value(), np.array([0.0, 4.0, 9.0]))
+
+def test_map_chunked_matches_elementwise():
+    data = np.arange(100).reshape(25, 4)
+    chunked = Chain(data).map(lambda row: row * 2 + 1, mode='chunked', chunk_size=7)
+    elementwise = Chain(data).map(lambda row: row * 2 + 1, mode='elementwise')
+    assert chunked.map_path == 'chunked'
+    np.testing.assert_array_equal(chunked.value(), elementwise.value())
+
+def test_streamed_chain_matches_in_memory(tmp_path):
+    data = np.random.default_rng(0).normal(size=5000)
+    path = tmp_path / 'data.npy'
+    np.save(path, data)
+    expected = Chain(data).filter(lambda x: x > -1).normalize().summary().value()[0]
+    streamed = Chain.from_source(str(path), chunk_size=300).filter(lambda x: x > -1).normalize().summary().value()[0]
+    for key in expected:
+        np.testing.assert_allclose(streamed[key], expected[key])
+
+def test_streamed_chain_over_chunk_iterator():
+    data = np.arange(100, dtype=float)
+    chunks = (data[i:i + 13] for i in range(0, len(data), 13))
+    result = Chain.from_source(chunks).map(lambda x: x * 2).normalize().value()
+    np.testing.assert_allclose(result, Chain(data).map(lambda x: x * 2).normalize().value())
+
+def test_streamed_chain_runs_other_steps_in_memory():
+    data = np.array([4.0, -3.0, np.nan, 1.0, 7.0, np.nan, 2.0])
+    chunks = [data[:3], data[3:5], data[5:]]
+    streamed = Chain.from_source(iter(chunks)).map(lambda x: x * 2).handle_missing_values().normalize().value()
+    expected = Chain(data).map(lambda x: x * 2).handle_missing_values().normalize().value()
+    assert streamed.shape == (7,)
+    np.testing.assert_allclose(streamed, expected)
+
+def test_streamed_iterator_spills_only_for_multi_pass_plans(tmp_path, monkeypatch):
+    import tempfile
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    data = np.arange(100, dtype=float)
+    chunks = lambda: (data[i:i + 13] for i in range(0, len(data), 13))
+    mapped = np.concatenate(list(Chain.from_source(chunks()).map(lambda x: x * 2).iter_chunks()))
+    np.testing.assert_allclose(mapped, data * 2)
+    assert not list(tmp_path.glob('mlu_chain_*.bin'))
+    stream = Chain.from_source(chunks()).normalize().iter_chunks()
+    next(stream)
+    assert list(tmp_path.glob('mlu_chain_*.bin'))
+    stream.close()
+    assert not list(tmp_path.glob('mlu_chain_*.bin'))
+
+def test_parallel_chain_matches_serial():
+    data = np.random.default_rng(1).normal(size=10000)
+    serial = Chain(data).filter(lambda x: x > -1).map(lambda x: x * 2).normalize().value()
+    parallel = Chain(data, parallel=3, block_size=512).filter(lambda x: x > -1).map(lambda x: x * 2).normalize().value()
+    np.testing.assert_allclose(parallel, serial)
+
+def test_eager_parallel_steps_share_one_dispatch(monkeypatch):
+    from modules.chain import chain as chain_module
+    calls = []
+    run_parallel = chain_module.run_parallel
+    monkeypatch.setattr(chain_module, 'run_parallel', lambda data, nodes, *args: calls.append(len(nodes)) or run_parallel(data, nodes, *args))
+    data = np.arange(-500, 1500, dtype=float)
+    chain = Chain(data, parallel=2).filter(lambda x: x > 0).map(lambda x: x * 2).normalize()
+    np.testing.assert_allclose(chain.data, Chain(data).filter(lambda x: x > 0).map(lambda x: x * 2).normalize().value())
+    assert calls == [3]
+    assert chain.aggregate('max').value() == 1.0 and calls == [3]
+
+def test_cached_prefix_is_a_lookup(tmp_path):
+    data = np.random.default_rng(2).normal(size=1000)
+    cache = ChainCache(max_entries=8, directory=str(tmp_path))
+    first = Chain(data, cache=cache).normalize().map(lambda x: x * 2)
+    assert (first.cache_hits, first.cache_misses) == (0, 2)
+    second = Chain(data.copy(), cache=cache).normalize().map(lambda x: x * 2).filter(lambda x: x > 1)
+    assert (second.cache_hits, second.cache_misses) == (2, 1)
+    from_disk = Chain(data.copy(), cache=ChainCache(directory=str(tmp_path))).normalize()
+    assert from_disk.cache_hits == 1
+    np.testing.assert_array_equal(from_disk.value(), Chain(data).normalize().value())
+
+def test_in_place_steps_are_cached():
+    data = np.random.default_rng(2).normal(size=1000)
+    cache = ChainCache()
+    first = Chain(data.copy(), copy=False, cache=cache).normalize()
+    assert first.cache_misses == 1 and len(cache) == 1
+    second = Chain(data.copy(), copy=False, cache=cache).normalize()
+    assert second.cache_hits == 1
+    np.testing.assert_array_equal(second.value(), first.value())
+
+SCALE = 3
+
+def test_cache_key_tracks_defaults_and_globals():
+    global SCALE
+    data = np.arange(10.0)
+    cache = ChainCache()
+    np.testing.assert_array_equal(Chain(data, cache=cache).filter(lambda v, t=2: v > t).value(), data[data > 2])
+    np.testing.assert_array_equal(Chain(data, cache=cache).filter(lambda v, t=7: v > t).value(), data[data > 7])
+    scale = lambda v: v * SCALE
+    np.testing.assert_array_equal(Chain(data, cache=cache).map(scale).value(), data * 3)
+    SCALE = 5
+    try:
+        np.testing.assert_array_equal(Chain(data, cache=cache).map(scale).value(), data * 5)
+    finally:
+        SCALE = 3
+
+def test_chain_without_copy_works_in_place():
+    data = np.array([4.0, -1.0, 2.0, 8.0], dtype=np.float32)
+    result = Chain(data, copy=False).normalize().value()
+    assert result is data and result.dtype == np.float32
+    np.testing.assert_allclose(data, np.array([5.0, 0.0, 3.0, 9.0]) / 9.0)
+
+def test_profile_and_explain():
+    chain = Chain(np.arange(1000.0), lazy=True, profiling=True).filter(lambda x: x > 10).map(np.sqrt).normalize().aggregate('sum')
+    plan = chain.explain()
+    assert 'fused' in plan and 'aggregate' in plan
+    chain.value()
+    profile = chain.profile()
+    assert list(profile['step']) == ['filter+map+normalize', 'aggregate']
+    assert list(profile['fused']) == [True, False]
+    assert profile.loc[0, 'input_shape'] == (1000,) and profile.loc[0, 'output_shape'] == (989,)
+    assert (profile['wall_time'] >= 0).all() and (profile['bytes_allocated'] >= 0).all()
+
+def test_columnar_backend_keeps_column_dtypes():
+    import pandas as pd
+    frame = pd.DataFrame({'a': [1.0, None, 3.0, 5.0], 'b': [10, 20, 30, 40], 'c': ['x', 'y', 'x', 'z']})
+    result = Chain(frame, backend='columnar').handle_missing_values().normalize().encode_categorical('label').value()
+    assert isinstance(result, pd.DataFrame)
+    np.testing.assert_allclose(result['a'], [0.0, 0.5, 0.5, 1.0])
+    np.testing.assert_allclose(result['b'], [0.0, 1 / 3, 2 / 3, 1.0])
+    assert result['c'].tolist() == [0, 1, 0, 2]
+    filtered = Chain(frame, backend='columnar').filter(lambda f: f['b'] > 15).value()
+    assert filtered['c'].tolist() == ['y', 'x', 'z'] and frame.shape == (4, 3)
+
+def test_index_split_serves_views():
+    data = np.column_stack([np.arange(20.0), np.arange(20) % 2])
+    chain = Chain(data, copy=False).split_data(test_size=0.25, mode='index', shuffle=False)
+    assert np.shares_memory(chain.X_train, data) and np.shares_memory(chain.y_test, data)
+    np.testing.assert_array_equal(chain.y_test, data[15:, -1])
+    stratified = Chain(data).split_data(test_size=0.5, mode='index', stratify=True)
+    assert stratified.y_test.sum() == 5 and len(stratified.X_train) == 10
+
+def test_repeated_group_folds_are_cached_and_trained():
+    rng = np.random.default_rng(3)
+    data = np.column_stack([rng.normal(size=(60, 2)), np.arange(60) % 2])
+    groups = np.repeat(np.arange(12), 5)
+    chain = Chain(data).split_data(n_splits=3, n_repeats=2, groups=groups)
+    assert len(chain.folds) == 6
+    for fold in chain.folds:
+        assert not set(groups[fold.train_index]) & set(groups[fold.test_index])
+    again = Chain(data).split_data(n_splits=3, n_repeats=2, groups=groups)
+    assert again.folds[0].train_index is chain.folds[0].train_index
+    chain.select_model('decision_tree', depth=2).train_model().evaluate_model()
+    assert len(chain.fold_models) == 6 and len(chain.fold_scores) == 6
+
+def test_unshuffled_group_folds_are_stable_and_cache_is_bounded():
+    from modules.chain import splitting
+    groups = np.repeat(np.arange(6), 3)
+    first = splitting.fold_indices(18, n_splits=3, shuffle=False, groups=groups)
+    splitting._FOLD_CACHE.clear()
+    second = splitting.fold_indices(18, n_splits=3, shuffle=False, groups=groups)
+    for (train_a, test_a), (train_b, test_b) in zip(first, second):
+        np.testing.assert_array_equal(test_a, test_b)
+    np.testing.assert_array_equal(first[0][1], np.arange(6))
+    for n_samples in range(10, 10 + splitting.FOLD_CACHE_SIZE + 5):
+        splitting.fold_indices(n_samples, n_splits=2)
+    assert len(splitting._FOLD_CACHE) == splitting.FOLD_CACHE_SIZE
+
+def test_neural_network_on_folds():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 3))
+    data = np.column_stack([X, (X[:, 0] > 0).astype(int)])
+    chain = Chain(data).split_data(n_splits=2).select_model('neural_network', input_shape=(3,), layers=[4])
+    chain.train_model(epochs=1, batch_size=32).evaluate_model()
+    assert len(chain.fold_models) == 2 and chain.fold_models[0] is not chain.fold_models[1]
+    assert len(chain.fold_scores) == 2 and len(chain.training_report) == 2
+
+def test_filter_expression_in_lazy_chain():
+    data = np.arange(-20.0, 20.0)
+    eager = Chain(data).filter(lambda x: (x > -5) & (x < 5)).value()
+    np.testing.assert_array_equal(Chain(data, lazy=True, block_size=8).filter("-5 < x < 5").value(), eager)
+
+def test_import_chain_within_budget():
+    code = (
+        "import sys, time; start = time.perf_counter(); import modules.chain; "
+        "elapsed = time.perf_counter() - start; "
+        "print(elapsed, *[m for m in ('tensorflow', 'matplotlib', 'seaborn', 'aif360', 'qiskit') if m in sys.modules])"
+    )
+    package_root = os.path.dirname(os.path.dirname(sys.modules['modules'].__file__))
+    output = subprocess.run([sys.executable, '-c', code], cwd=package_root, capture_output=True, text=True, check=True).stdout.split()
+    assert output[1:] == []
+    assert float(output[0]) < IMPORT_BUDGET_SECONDS
+    from modules.model_building import initialize_decision_tree
+    assert initialize_decision_tree(depth=2).max_depth == 2
+
+def test_gradient_boosting_model_on_folds():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3))
+    data = np.column_stack([X, (X[:, 0] > 0).astype(int)])
+    chain = Chain(data).split_data(n_splits=3).select_model('gradient_boosting', max_iter=20, random_state=0).train_model().evaluate_model()
+    assert len(chain.fold_scores) == 3 and min(chain.fold_scores) > 0.8
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 import sys
 import os
+import tracemalloc
 
 # Adjust system path to include the directory above this one, to find the modules package
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -26,6 +27,29 @@ def test_normalize():
     expected = np.array([0., 0.25, 0.5, 0.75, 1.])
     np.testing.assert_array_equal(result, expected), "Normalization failed."
 
+def test_normalize_in_place_bounded_peak():
+    array = np.random.default_rng(0).random(1_000_000).astype(np.float32)
+    expected = normalize(array.copy())
+    tracemalloc.start()
+    result = normalize(array, copy=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result is array and result.dtype == np.float32
+    assert peak < array.nbytes / 100, "In-place normalization allocated a temporary array."
+    np.testing.assert_array_equal(result, expected)
+
+def test_normalize_into_buffer():
+    array = np.array([1, 2, 3, 4, 5])
+    out = np.empty(5, dtype=np.float64)
+    result = normalize(array, out=out)
+    assert result is out
+    np.testing.assert_array_equal(out, np.array([0., 0.25, 0.5, 0.75, 1.]))
+
+def test_handle_missing_values_in_place():
+    df = pd.DataFrame({'A': [1, np.nan, 3]})
+    result = handle_missing_values(df, 'mean', copy=False)
+    assert result is df and df['A'].tolist() == [1, 2, 3]
+
 def test_encode_categorical():
     df = pd.DataFrame({'A': ['cat', 'dog', 'cat']})
     result = encode_categorical(df, 'label')
@@ -44,4 +68,113 @@ def test_apply_pca():
 def test_generate_polynomial_features():
     data = np.array([[1, 2], [3, 4]])
     result = generate_polynomial_features(data, degree=2)
-    assert result.shape == (2, 6), "Polynomial feature generation failed."  # Includes bias and original features
\ No newline at end of file
+    assert result.shape == (2, 6), "Polynomial feature generation failed."  # Includes bias and original features
+
+def test_fitted_transformers(tmp_path):
+    from modules.data_transformation import MissingValueImputer, MinMaxNormalizer
+    data = np.array([[1.0, 10.0], [np.nan, 30.0], [3.0, np.nan], [5.0, 20.0]])
+    imputer = MissingValueImputer('mean')
+    for chunk in (data[:2], data[2:]):
+        imputer.partial_fit(chunk)
+    np.testing.assert_allclose(imputer.statistics_, [3.0, 20.0])
+    imputer.save(tmp_path / 'imputer.json')
+    restored = MissingValueImputer.load(tmp_path / 'imputer.json')
+    np.testing.assert_array_equal(restored.transform(np.array([[np.nan, np.nan]])), [[3.0, 20.0]])
+    normalizer = MinMaxNormalizer(per_column=True).fit(imputer.transform(data))
+    np.testing.assert_allclose(normalizer.transform(np.array([[3.0, 20.0]])), [[0.5, 0.5]])
+
+def test_median_imputer_continues_from_fit_and_fills_by_label():
+    import pandas as pd
+    from modules.data_transformation import MissingValueImputer
+    frame = pd.DataFrame({'a': [1.0, np.nan, 3.0, 5.0], 'b': [10.0, 20.0, np.nan, 40.0]})
+    imputer = MissingValueImputer('median').fit(frame)
+    np.testing.assert_allclose(imputer.statistics_, [3.0, 20.0])
+    imputer.partial_fit(pd.DataFrame({'a': [7.0, 9.0, np.nan], 'b': [50.0, 60.0, 70.0]}))
+    np.testing.assert_allclose(imputer.statistics_, [5.0, 40.0])
+    filled = imputer.transform(frame[['b', 'a']])
+    assert filled.loc[1, 'a'] == 5.0 and filled.loc[2, 'b'] == 40.0
+
+def test_handle_missing_values_on_array_per_column():
+    data = np.array([[1.0, 2.0, np.nan], [np.nan, 2.0, 4.0], [3.0, np.nan, 8.0], [5.0, 7.0, np.nan]])
+    result = handle_missing_values(data, strategy={0: 'median', 1: 'mode', 2: 'constant'})
+    np.testing.assert_array_equal(result[:, 0], [1.0, 3.0, 3.0, 5.0])
+    np.testing.assert_array_equal(result[:, 1], [2.0, 2.0, 2.0, 7.0])
+    np.testing.assert_array_equal(result[:, 2], [0.0, 4.0, 8.0, 0.0])
+    assert np.isnan(data).sum() == 4
+    np.testing.assert_allclose(handle_missing_values(data)[1, 0], 3.0)
+
+def test_apply_pca_incremental_projector(tmp_path):
+    data = np.random.default_rng(0).normal(size=(400, 6)) @ np.diag([5.0, 3.0, 1.0, 0.5, 0.2, 0.1])
+    path = tmp_path / 'data.npy'
+    np.save(path, data)
+    result, projector = apply_pca(str(path), n_components=2, batch_size=64, return_projector=True)
+    assert result.shape == (400, 2) and projector.estimator.__class__.__name__ == 'IncrementalPCA'
+    np.testing.assert_allclose(projector.transform(data[:5]).to_numpy(), result.to_numpy()[:5])
+    assert apply_pca(pd.DataFrame(data)).shape == (400, 6)
+
+def test_apply_pca_wide_data_with_variance_fraction():
+    from modules.data_transformation.data_transformation import _pca_method
+    wide = np.random.default_rng(0).normal(size=(120, 600))
+    assert _pca_method(wide, 10, 1 << 30) == 'randomized'
+    assert _pca_method(wide, 0.5, 1 << 30) == 'full' and _pca_method(wide, 'mle', 1 << 30) == 'full'
+    assert apply_pca(pd.DataFrame(wide), n_components=0.5).shape[0] == 120
+
+def test_sparse_and_hashed_encoding(tmp_path):
+    from modules.data_transformation import CategoryEncoder
+    df = pd.DataFrame({'merchant': ['a', 'b', 'a', 'c'], 'amount': [1.0, 2.0, 3.0, 4.0]})
+    onehot = encode_categorical(df, 'onehot', sparse_output=True)
+    assert onehot.shape == (4, 5) and onehot.nnz == 8
+    encoder = CategoryEncoder().fit(df)
+    encoder.save(tmp_path / 'encoder.json')
+    restored = CategoryEncoder.load(tmp_path / 'encoder.json')
+    served = restored.transform(pd.DataFrame({'merchant': ['c', 'zzz'], 'amount': [5.0, 6.0]}))
+    assert served[0, 3] == 1 and served[1, 4] == 1 and restored.feature_names()[4] == 'merchant_<unknown>'
+    hashed = encode_categorical(df[['merchant']], 'hash', n_features=32)
+    assert hashed.shape == (4, 32) and hashed.nnz == 4
+    assert (hashed[0] != hashed[2]).nnz == 0
+
+def test_polynomial_features_size_topk_and_chunks():
+    from modules.data_transformation import polynomial_output_size, iter_polynomial_features
+    assert polynomial_output_size(500, degree=2) == 125750
+    data = np.random.default_rng(0).normal(size=(50, 4))
+    target = data[:, 0] * data[:, 3]
+    result = generate_polynomial_features(data, top_k=1, target=target)
+    assert result.shape == (50, 5)
+    np.testing.assert_allclose(result[:, -1], target)
+    blocks = list(iter_polynomial_features(data, degree=3, interaction_only=True, chunk_size=16))
+    assert [block.shape for block in blocks] == [(16, 14), (16, 14), (16, 14), (2, 14)]
+    assert generate_polynomial_features(data, sparse_output=True).shape == (50, 14)
+    dense = generate_polynomial_features(data, degree=3, chunk_size=7)
+    np.testing.assert_allclose(generate_polynomial_features(data.tolist(), degree=3), dense)
+    sparse_data = np.where(data > 0.5, data, 0.0)
+    stacked = generate_polynomial_features(sparse_data, degree=3, sparse_output=True, chunk_size=7)
+    np.testing.assert_allclose(stacked.toarray(), generate_polynomial_features(sparse_data, degree=3))
+
+def test_streaming_variance_selection(tmp_path):
+    from scipy import sparse
+    from modules.data_transformation import VarianceSelector
+    data = (np.random.default_rng(0).normal(size=(1000, 4)) * [0.0, 1.0, 0.05, 3.0] + 100).astype(np.float32)
+    path = tmp_path / 'data.npy'
+    np.save(path, data)
+    np.testing.assert_array_equal(remove_low_variance_features(str(path), threshold=0.01, chunk_size=128), [1, 3])
+    selector = VarianceSelector().fit(iter([data[:300], data[300:]]))
+    np.testing.assert_allclose(selector.variances_, data.astype(np.float64).var(axis=0), rtol=1e-6)
+    assert remove_low_variance_features(sparse.csr_matrix(data), chunk_size=100).shape == (1000, 3)
+
+def test_variance_selection_skips_missing_values():
+    from scipy import sparse
+    from sklearn.feature_selection import VarianceThreshold
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(300, 4))
+    data[rng.random(data.shape) < 0.2] = np.nan
+    data[:, 1] = np.where(np.arange(300) % 2, 5.0, np.nan)
+    data[:, 3] = np.nan
+    expected = VarianceThreshold().fit(data).get_support(indices=True)
+    np.testing.assert_array_equal(expected, [0, 2])
+    np.testing.assert_array_equal(remove_low_variance_features(data, chunk_size=70, return_indices=True), expected)
+    np.testing.assert_array_equal(remove_low_variance_features(sparse.csr_matrix(data), chunk_size=70, return_indices=True), expected)
+
+def test_imports_as_subpackage():
+    import subprocess
+    repository_root = os.path.dirname(os.path.dirname(os.path.dirname(sys.modules['modules'].__file__)))
+    subprocess.run([sys.executable, '-c', "import mlu.modules.data_transformation"], cwd=repository_root, check=True)
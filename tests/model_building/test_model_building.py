@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from modules.model_building import initialize_neural_network, train_neural_network, make_dataset, optimize_hyperparameters
+
+def test_make_dataset_streams_memmap_in_batches(tmp_path):
+    path = tmp_path / 'X.npy'
+    np.save(path, np.arange(1000, dtype=np.float64).reshape(500, 2))
+    batches = list(make_dataset(str(path), np.zeros(500), batch_size=64, shuffle=False, chunk_size=100))
+    assert [len(features) for features, _ in batches] == [64] * 7 + [52]
+    np.testing.assert_array_equal(np.concatenate([features.numpy() for features, _ in batches]), np.load(path))
+
+def test_train_neural_network_reports_throughput():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 3))
+    y = (X[:, 0] > 0).astype(np.float64)
+    model = initialize_neural_network(input_shape=(3,), layers=[4])
+    model, report = train_neural_network(model, X, y, epochs=2, batch_size=32, chunk_size=128, jit_compile=True, seed=0)
+    assert report['samples'] == 800
+    assert [epoch['samples'] for epoch in report['epochs']] == [400, 400]
+    assert report['samples_per_second'] > 0 and len(report['history']['loss']) == 2
+
+def test_halving_and_hyperband_search():
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+    X, y = make_classification(n_samples=600, n_features=8, random_state=0)
+    grid = {'max_depth': [1, 3, None], 'min_samples_leaf': [1, 10]}
+    model, params = optimize_hyperparameters(DecisionTreeClassifier(random_state=0), grid, X, y, cv=3, search_type='halving', random_state=0)
+    assert model.get_params()['max_depth'] == params['max_depth']
+    model, params = optimize_hyperparameters(RandomForestClassifier(random_state=0), {'max_depth': [2, None]}, X, y, cv=3, search_type='hyperband',
+                                             resource='n_estimators', min_resources=2, max_resources=8, factor=2, random_state=0)
+    assert params['n_estimators'] == 8 and len(model.estimators_) == 8
+    model, params = optimize_hyperparameters(DecisionTreeClassifier(random_state=0), grid, X, y, cv=None, search_type='hyperband', random_state=0)
+    assert model.get_params()['max_depth'] == params['max_depth']
+
+def test_bayesian_search_resumes_and_warm_starts(tmp_path):
+    import sqlite3
+    from scipy.stats import randint
+    from sklearn.datasets import make_classification
+    from sklearn.tree import DecisionTreeClassifier
+    from modules.model_building import bayesian_search
+    X, y = make_classification(n_samples=300, n_features=6, random_state=0)
+    space = {'max_depth': randint(1, 10), 'criterion': ['gini', 'entropy']}
+    storage = str(tmp_path / 'trials.db')
+    bayesian_search(DecisionTreeClassifier(random_state=0), space, X, y, n_trials=12, cv=3, n_jobs=2, storage=storage, random_state=0)
+    model, params = bayesian_search(DecisionTreeClassifier(random_state=0), space, X, y, n_trials=15, cv=3, storage=storage, random_state=0)
+    assert sqlite3.connect(storage).execute("SELECT COUNT(*) FROM trials").fetchone()[0] == 15
+    assert model.get_params()['max_depth'] == params['max_depth'] and isinstance(params['max_depth'], int)
+    _, params = bayesian_search(DecisionTreeClassifier(random_state=0), {'max_depth': randint(1, 10), 'criterion': ['gini']}, X, y,
+                                n_trials=1, cv=3, storage=storage, random_state=0)
+    assert params['criterion'] == 'gini'
+    # Trials scored differently are not comparable, so they neither warm-start nor win a later search.
+    from sklearn.tree import DecisionTreeRegressor
+    X, y = make_classification(n_samples=300, n_features=6, random_state=1)
+    y = X[:, 0] * 50 + X[:, 1] ** 2 * 30
+    bayesian_search(DecisionTreeRegressor(random_state=0), {'max_depth': [1]}, X, y, n_trials=1, cv=3, scoring='r2', storage=storage)
+    _, params = bayesian_search(DecisionTreeRegressor(random_state=0), {'max_depth': [1, 2, 4, 8, None]}, X, y, n_trials=5, cv=3,
+                                scoring='neg_mean_squared_error', storage=storage, random_state=0)
+    assert params['max_depth'] != 1
+    from modules.model_building import tpe
+    assert tpe._WORKER_TASK is None
+
+def test_gradient_boosting_reuses_cached_bins():
+    from sklearn.base import clone
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from modules.model_building import initialize_gradient_boosting, BinCache
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 5))
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int)
+    cache = BinCache()
+    first = initialize_gradient_boosting(max_iter=10, random_state=0, bin_cache=cache).fit(X, y)
+    second = clone(first).set_params(learning_rate=0.3).fit(X, y)
+    assert second.bin_cache is cache and (cache.misses, cache.hits) == (1, 1)
+    reference = HistGradientBoostingClassifier(max_iter=10, learning_rate=0.3, random_state=0).fit(X, y)
+    np.testing.assert_allclose(second.predict_proba(X), reference.predict_proba(X))
+    assert first.score(X, y) > 0.8
+    # With early stopping the bins come from the training split only, as in HistGradientBoostingClassifier,
+    # so seeded fits draw the same split and share them while unseeded fits do not.
+    X = rng.normal(size=(12000, 3))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = initialize_gradient_boosting(max_iter=20, max_bins=16, random_state=0)
+    for _ in range(3):
+        fitted = clone(model).fit(X, y)
+    assert (model.bin_cache.misses, model.bin_cache.hits) == (1, 2)
+    reference = HistGradientBoostingClassifier(max_iter=20, max_bins=16, random_state=0).fit(X, y)
+    np.testing.assert_allclose(fitted.predict_proba(X), reference.predict_proba(X))
+    model = initialize_gradient_boosting(max_iter=5)
+    for _ in range(3):
+        clone(model).fit(X, y)
+    assert (model.bin_cache.misses, model.bin_cache.hits) == (3, 0)
+
+def _fit_bin_counts(model, X, y):
+    model.fit(X, y)
+    return model.bin_cache.hits, model.bin_cache.misses
+
+def test_gradient_boosting_bins_are_shared_across_processes(tmp_path):
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from modules.model_building import initialize_gradient_boosting, BinCache
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 4))
+    y = (X[:, 0] > 0).astype(int)
+    model = initialize_gradient_boosting(max_iter=5, random_state=0, bin_cache=BinCache(directory=str(tmp_path)))
+    model.fit(X, y)
+    counts = Parallel(n_jobs=2)(delayed(_fit_bin_counts)(clone(model).set_params(learning_rate=rate), X, y) for rate in (0.1, 0.3))
+    assert counts == [(1, 0), (1, 0)]
+    assert model.bin_cache.misses == 1 and len(list(tmp_path.glob('*.npy'))) == 1
+
+def test_model_building_imports_in_fresh_interpreter():
+    package_root = os.path.dirname(os.path.dirname(sys.modules['modules'].__file__))
+    for name in ('initialize_gradient_boosting', 'bayesian_search'):
+        subprocess.run([sys.executable, '-c', f"from modules.model_building import {name}"], cwd=package_root, check=True)
+    subprocess.run([sys.executable, '-c', "import mlu.modules.model_building.boosting, mlu.modules.model_building.tpe"],
+                   cwd=os.path.dirname(package_root), check=True)